@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""Parse-once, include-resolved model of a Databricks Asset Bundle"""
+
+import os
+import sys
+from pathlib import Path
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scripts.repo_index import _signature, load_yaml
+
+BUNDLE_ROOT_FILE = 'databricks.yml'
+
+# root path -> (member signature, Bundle)
+_BUNDLE_CACHE = {}
+
+
+def deep_merge(base, override):
+    """Return base updated with override, merging nested mappings instead of replacing them"""
+    merged = dict(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = deep_merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def find_bundle_root(file_path):
+    """Return the databricks.yml governing file_path, or None if it is outside any bundle"""
+    for directory in Path(file_path).resolve().parents:
+        candidate = directory / BUNDLE_ROOT_FILE
+        if candidate.is_file():
+            return candidate
+        if (directory / '.git').exists():
+            break
+    return None
+
+
+class Bundle:
+    """A bundle root and its included files, each parsed exactly once.
+
+    files maps every member path (root first, then includes in order) to its
+    parsed data; files that failed to parse map to None with the message in
+    errors. config is the deep merge of all members and sources records which
+    file declared each (resource_type, key).
+    """
+
+    def __init__(self, root_file):
+        self.root_file = Path(root_file)
+        self.directory = self.root_file.parent
+        self.files = {}
+        self.errors = {}
+        self.sources = {}
+        self.config = {}
+        self._load()
+
+    @property
+    def name(self):
+        return (self.config.get('bundle') or {}).get('name', self.directory.name)
+
+    @property
+    def targets(self):
+        return self.config.get('targets') or {}
+
+    @property
+    def resources(self):
+        return self.config.get('resources') or {}
+
+    def _parse(self, path):
+        try:
+            data = load_yaml(path)
+        except yaml.YAMLError as e:
+            self.errors[path] = f"YAML syntax error: {e}"
+            data = None
+        self.files[path] = data
+        return data
+
+    def _load(self):
+        root = self._parse(self.root_file)
+        if not isinstance(root, dict):
+            return
+
+        for path in include_paths(self.root_file, root):
+            if path not in self.files:
+                self._parse(path)
+
+        for path, data in self.files.items():
+            if not isinstance(data, dict):
+                continue
+            self.config = deep_merge(self.config, data)
+            for resource_type, entries in (data.get('resources') or {}).items():
+                for key in entries or {}:
+                    self.sources.setdefault((resource_type, key), path)
+
+    def member_of(self, file_path):
+        """Return the member path matching file_path, or None if it is not included"""
+        target = Path(file_path).resolve()
+        for path in self.files:
+            if path.resolve() == target:
+                return path
+        return None
+
+
+def include_paths(root_file, root_config):
+    """Expand the root's include globs, relative to the bundle directory, in order"""
+    directory = Path(root_file).parent
+    seen = {Path(root_file).resolve()}
+    paths = []
+    for pattern in root_config.get('include') or []:
+        for path in sorted(directory.glob(pattern)):
+            resolved = path.resolve()
+            if resolved not in seen and path.is_file():
+                seen.add(resolved)
+                paths.append(Path(os.path.normpath(path)))
+    return paths
+
+
+def load_bundle(root_file):
+    """Return the Bundle for a databricks.yml, memoized until any member file changes"""
+    root_file = Path(os.path.normpath(root_file))
+    key = root_file.resolve()
+    cached = _BUNDLE_CACHE.get(key)
+    if cached:
+        signature, bundle = cached
+        try:
+            if signature == _member_signature(bundle):
+                return bundle
+        except OSError:
+            pass
+
+    bundle = Bundle(root_file)
+    _BUNDLE_CACHE[key] = (_member_signature(bundle), bundle)
+    return bundle
+
+
+def _member_signature(bundle):
+    root = bundle.files.get(bundle.root_file)
+    members = include_paths(bundle.root_file, root) if isinstance(root, dict) else []
+    return tuple((str(path), _signature(path)) for path in [bundle.root_file, *members])
+
+
+def discover_bundles(bundles_dir='bundles'):
+    """Return a Bundle for every databricks.yml directly under bundles_dir, sorted by directory"""
+    return [load_bundle(path) for path in sorted(Path(bundles_dir).glob(f'*/{BUNDLE_ROOT_FILE}'))]
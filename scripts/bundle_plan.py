@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""Offline plan: diff each bundle target's resources against the last deployed baseline"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scripts.bundle_model import discover_bundles
+from scripts.bundle_references import format_problem, resolve_target
+
+DEFAULT_BASELINE_PATH = Path('bundles') / 'plan-baseline.json'
+BASELINE_VERSION = 1
+
+# Resource types planned, in the order changes are listed
+PLANNED_RESOURCE_TYPES = ['schemas', 'volumes', 'jobs', 'pipelines']
+# Access-control keys split into their own graph nodes so grant changes are reported separately
+ACCESS_KEYS = ['grants', 'permissions']
+# Lists whose order carries no meaning; every other list (task parameters, args,
+# libraries, depends_on) is compared in order
+UNORDERED_FIELDS = {'privileges'}
+
+
+def _normalize(value, key=None):
+    """Drop empty values and order privilege lists so equivalent YAML compares equal"""
+    if isinstance(value, dict):
+        return {name: _normalize(item, name) for name, item in sorted(value.items())
+                if item not in (None, '', [], {})}
+    if isinstance(value, list):
+        items = [_normalize(item) for item in value]
+        if key in UNORDERED_FIELDS and all(isinstance(item, str) for item in items):
+            return sorted(items)
+        return items
+    return value
+
+
+def _normalize_access(entries):
+    entries = [_normalize(entry) for entry in entries or [] if isinstance(entry, dict)]
+    return sorted(entries, key=lambda entry: json.dumps(entry, sort_keys=True))
+
+
+def resource_graph(bundle, target):
+    """Return ({resource id: normalized definition}, unresolved references) for one bundle target"""
+    config, problems = resolve_target(bundle, target)
+    resources = config.get('resources') or {}
+    graph = {}
+
+    for resource_type in PLANNED_RESOURCE_TYPES:
+        for key, definition in sorted((resources.get(resource_type) or {}).items()):
+            definition = dict(definition or {})
+            access = {name: definition.pop(name) for name in ACCESS_KEYS if name in definition}
+            graph[f"{resource_type}.{key}"] = _normalize(definition)
+            for name, entries in access.items():
+                graph[f"{resource_type}.{key}.{name}"] = _normalize_access(entries)
+
+    if config.get('permissions'):
+        graph['bundle.permissions'] = _normalize_access(config['permissions'])
+    return graph, problems
+
+
+def build_state(bundles, targets=None):
+    """Return ({bundle name: {target: resource graph}}, unresolved references) for the bundles"""
+    state = {}
+    problems = []
+    for bundle in bundles:
+        for target in sorted(bundle.targets):
+            if targets and target not in targets:
+                continue
+            graph, target_problems = resource_graph(bundle, target)
+            state.setdefault(bundle.name, {})[target] = graph
+            problems.extend(target_problems)
+    return state, problems
+
+
+def diff_graphs(baseline, current):
+    """Return the minimal change set turning baseline into current"""
+    changes = []
+    for resource_id in sorted(current.keys() - baseline.keys()):
+        changes.append({'action': 'create', 'resource': resource_id})
+    for resource_id in sorted(current.keys() & baseline.keys()):
+        before, after = baseline[resource_id], current[resource_id]
+        if before == after:
+            continue
+        if isinstance(before, dict) and isinstance(after, dict):
+            fields = sorted(key for key in before.keys() | after.keys()
+                            if before.get(key) != after.get(key))
+        else:
+            fields = []
+        changes.append({'action': 'update', 'resource': resource_id, 'fields': fields})
+    for resource_id in sorted(baseline.keys() - current.keys()):
+        changes.append({'action': 'delete', 'resource': resource_id})
+    return changes
+
+
+def plan(state, baseline, targets=None, problems=()):
+    """Return [{bundle, target, changes}] for each target whose resources differ from baseline.
+
+    A target with unresolved references (from build_state) is always listed,
+    with them under 'unresolved': its planned values still hold the ${...}
+    text, so an empty change set would not mean it matches the deployment.
+    """
+    unresolved = {}
+    for problem in problems:
+        unresolved.setdefault((problem['bundle'], problem['target']), []).append(problem)
+    plans = []
+    for bundle_name in sorted(state.keys() | baseline.keys()):
+        current_targets = state.get(bundle_name, {})
+        baseline_targets = baseline.get(bundle_name, {})
+        for target in sorted(current_targets.keys() | baseline_targets.keys()):
+            if targets and target not in targets:
+                continue
+            changes = diff_graphs(baseline_targets.get(target, {}), current_targets.get(target, {}))
+            entry = {'bundle': bundle_name, 'target': target, 'changes': changes}
+            if (bundle_name, target) in unresolved:
+                entry['unresolved'] = unresolved[bundle_name, target]
+            if changes or 'unresolved' in entry:
+                plans.append(entry)
+    return plans
+
+
+def load_baseline(path):
+    try:
+        data = json.loads(Path(path).read_text())
+    except FileNotFoundError:
+        return {}
+    if data.get('version') != BASELINE_VERSION:
+        raise ValueError(f"{path}: unsupported baseline version {data.get('version')}")
+    return data['bundles']
+
+
+def save_baseline(path, state):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {'version': BASELINE_VERSION, 'bundles': state}
+    path.write_text(json.dumps(data, indent=2, sort_keys=True) + "\n")
+
+
+def format_plan(plans):
+    symbols = {'create': '+', 'update': '~', 'delete': '-'}
+    lines = []
+    for entry in plans:
+        lines.append(f"{entry['bundle']} [{entry['target']}]")
+        for change in entry['changes']:
+            fields = f" ({', '.join(change['fields'])})" if change.get('fields') else ""
+            lines.append(f"  {symbols[change['action']]} {change['action']} "
+                         f"{change['resource']}{fields}")
+        lines.extend(f"  ! {format_problem(problem)}" for problem in entry.get('unresolved', []))
+    return lines
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Plan bundle resource changes offline against a baseline")
+    parser.add_argument('--bundles-dir', default='bundles', help="Directory containing the bundles")
+    parser.add_argument('--baseline', default=str(DEFAULT_BASELINE_PATH),
+                        help="Baseline snapshot from the last deploy "
+                             f"(default: {DEFAULT_BASELINE_PATH})")
+    parser.add_argument('--target', action='append', dest='targets', metavar='TARGET',
+                        help="Only plan this target (repeatable)")
+    parser.add_argument('--format', choices=['text', 'json'], default='text', help="Output format")
+    parser.add_argument('--update-baseline', action='store_true',
+                        help="Record the current resources as the deployed baseline")
+    parser.add_argument('--detailed-exitcode', action='store_true',
+                        help="Exit with 2 when there are changes")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    state, problems = build_state(discover_bundles(args.bundles_dir), args.targets)
+    baseline = load_baseline(args.baseline)
+
+    if args.update_baseline:
+        if args.targets:
+            # Only the planned targets were deployed; keep the others as recorded
+            merged = {name: dict(targets) for name, targets in baseline.items()}
+            for name, targets in state.items():
+                merged.setdefault(name, {}).update(targets)
+            state = merged
+        save_baseline(args.baseline, state)
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    plans = plan(state, baseline, args.targets, problems)
+    if args.format == 'json':
+        print(json.dumps(plans, indent=2))
+    elif plans:
+        print("\n".join(format_plan(plans)))
+    else:
+        print("No changes. Bundles match the baseline.")
+
+    if plans and args.detailed_exitcode:
+        sys.exit(2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""Offline resolver for ${var.*}, ${bundle.*}, ${workspace.*} and ${resources.*} interpolations"""
+
+import argparse
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scripts.bundle_model import deep_merge, discover_bundles
+
+REFERENCE = re.compile(r'\$\{([^${}\s]+)\}')
+WHOLE_REFERENCE = re.compile(r'^\$\{([^${}\s]+)\}$')
+
+# Top-level sections the Databricks CLI interpolates; anchor-only blocks such
+# as `dev_variables` are ignored because the CLI never reads them directly
+INTERPOLATED_SECTIONS = ['bundle', 'variables', 'workspace', 'resources', 'permissions', 'run_as',
+                         'presets', 'sync', 'artifacts']
+
+# Target sections that override their top-level counterpart
+TARGET_OVERRIDES = ['bundle', 'workspace', 'resources', 'permissions', 'run_as', 'presets', 'sync',
+                    'artifacts']
+
+# Values only known once deployed; references to them are left in place
+RUNTIME_WORKSPACE_KEYS = {'current_user', 'host', 'root_path', 'file_path', 'artifact_path',
+                          'state_path', 'resource_path'}
+RUNTIME_RESOURCE_FIELDS = {'id', 'url', 'full_name', 'storage_location', 'pipeline_id', 'job_id'}
+
+
+class UnresolvedReference(Exception):
+    def __init__(self, kind, reference, detail=""):
+        super().__init__(detail or reference)
+        self.kind = kind
+        self.reference = reference
+        self.detail = detail
+
+
+class _Runtime:
+    """Marker for references resolved only at deploy time"""
+
+
+RUNTIME = _Runtime()
+
+
+def effective_config(bundle, target):
+    """Return the bundle config as seen by one target, before interpolation"""
+    config = {key: bundle.config[key] for key in INTERPOLATED_SECTIONS if key in bundle.config}
+    overrides = bundle.targets.get(target) or {}
+
+    for key in TARGET_OVERRIDES:
+        if key not in overrides:
+            continue
+        base, override = config.get(key), overrides[key]
+        if isinstance(base, dict) and isinstance(override, dict):
+            override = deep_merge(base, override)
+        config[key] = override
+
+    variables = dict(config.get('variables') or {})
+    for name, value in (overrides.get('variables') or {}).items():
+        declared = dict(variables.get(name) or {})
+        if isinstance(value, dict) and ('default' in value or 'lookup' in value):
+            declared.update(value)
+        else:
+            declared['default'] = value
+        variables[name] = declared
+    config['variables'] = variables
+    config['bundle'] = dict(config.get('bundle') or {}, target=target)
+    return config
+
+
+class TargetResolver:
+    """Resolve every interpolation of one bundle target in a single memoized pass"""
+
+    def __init__(self, bundle, target, variables=None):
+        self.bundle = bundle
+        self.target = target
+        self.config = effective_config(bundle, target)
+        for name, value in (variables or {}).items():
+            self.config['variables'][name] = dict(self.config['variables'].get(name) or {},
+                                                  default=value)
+        self.problems = []
+        self._memo = {}
+        self._stack = []
+
+    def lookup(self, reference):
+        """Return the resolved value of a reference, RUNTIME, or raise UnresolvedReference"""
+        if reference in self._memo:
+            value = self._memo[reference]
+            if isinstance(value, UnresolvedReference):
+                raise value
+            return value
+        if reference in self._stack:
+            cycle = self._stack[self._stack.index(reference):] + [reference]
+            raise UnresolvedReference('cycle', reference, " -> ".join(cycle))
+
+        self._stack.append(reference)
+        try:
+            value = self._lookup(reference.split('.'))
+        except UnresolvedReference as e:
+            self._memo[reference] = e
+            raise
+        finally:
+            self._stack.pop()
+        self._memo[reference] = value
+        return value
+
+    def _lookup(self, parts):
+        reference = '.'.join(parts)
+        namespace, rest = parts[0], parts[1:]
+
+        if namespace == 'var' and rest:
+            declared = self.config['variables'].get(rest[0])
+            if not isinstance(declared, dict):
+                raise UnresolvedReference('unresolved', reference,
+                                          f"variable '{rest[0]}' is not declared")
+            if 'lookup' in declared and 'default' not in declared:
+                return RUNTIME
+            return self._navigate(declared.get('default'), rest[1:], reference)
+
+        if namespace == 'bundle':
+            return self._navigate(self.config['bundle'], rest, reference)
+
+        if namespace == 'workspace':
+            workspace = self.config.get('workspace') or {}
+            if rest and rest[0] not in workspace and rest[0] in RUNTIME_WORKSPACE_KEYS:
+                return RUNTIME
+            return self._navigate(workspace, rest, reference)
+
+        if namespace == 'resources' and len(rest) >= 2:
+            resources = (self.config.get('resources') or {}).get(rest[0]) or {}
+            if rest[1] not in resources:
+                raise UnresolvedReference('unresolved', reference,
+                                          f"resource '{rest[0]}.{rest[1]}' is not declared")
+            resource = resources[rest[1]] or {}
+            if len(rest) == 3 and rest[2] not in resource and rest[2] in RUNTIME_RESOURCE_FIELDS:
+                return RUNTIME
+            return self._navigate(resource, rest[2:], reference)
+
+        raise UnresolvedReference('unresolved', reference, f"unknown namespace '{namespace}'")
+
+    def _navigate(self, value, path, reference):
+        for key in path:
+            whole = WHOLE_REFERENCE.match(value) if isinstance(value, str) else None
+            if whole:
+                value = self.lookup(whole.group(1))
+            if value is RUNTIME:
+                return RUNTIME
+            if not isinstance(value, dict) or key not in value:
+                raise UnresolvedReference('unresolved', reference, f"'{key}' not found")
+            value = value[key]
+        return self.materialize(value)
+
+    def materialize(self, value):
+        """Return value with every interpolation in it resolved"""
+        if isinstance(value, str):
+            return self.interpolate(value)
+        if isinstance(value, dict):
+            return {key: self.materialize(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self.materialize(item) for item in value]
+        return value
+
+    def interpolate(self, text):
+        whole = WHOLE_REFERENCE.match(text)
+        if whole:
+            value = self.lookup(whole.group(1))
+            return text if value is RUNTIME else value
+        if '${' not in text:
+            return text
+
+        def substitute(match):
+            value = self.lookup(match.group(1))
+            return match.group(0) if value is RUNTIME else str(value)
+
+        return REFERENCE.sub(substitute, text)
+
+    def resolve(self):
+        """Return the interpolated config, recording unresolved and cyclic references in problems"""
+        return {key: self._resolve_node(value, key) for key, value in self.config.items()}
+
+    def _resolve_node(self, value, location):
+        if isinstance(value, dict):
+            return {key: self._resolve_node(item, f"{location}.{key}")
+                    for key, item in value.items()}
+        if isinstance(value, list):
+            return [self._resolve_node(item, f"{location}[{i}]") for i, item in enumerate(value)]
+        if not isinstance(value, str):
+            return value
+
+        try:
+            return self.interpolate(value)
+        except UnresolvedReference as e:
+            self._record(e, location, value)
+            return value
+
+    def _record(self, error, location, text):
+        # Report the reference written at this location; name the inner one if that is what failed
+        written = error.reference
+        for match in REFERENCE.finditer(text):
+            try:
+                self.lookup(match.group(1))
+            except UnresolvedReference:
+                written = match.group(1)
+                break
+        detail = error.detail
+        if written != error.reference:
+            detail = f"${{{error.reference}}}: {detail}"
+
+        source = self.bundle.root_file
+        parts = location.split('.')
+        if parts[0] == 'resources' and len(parts) >= 3:
+            source = self.bundle.sources.get((parts[1], parts[2].split('[')[0]), source)
+        self.problems.append({
+            'bundle': self.bundle.name,
+            'target': self.target,
+            'file': str(source),
+            'location': location,
+            'reference': '${' + written + '}',
+            'kind': error.kind,
+            'detail': detail,
+        })
+
+
+def resolve_target(bundle, target, variables=None):
+    """Return (interpolated config, problems) for one bundle target.
+
+    variables ({name: value}) override declared defaults the way `--var` does for the CLI.
+    """
+    resolver = TargetResolver(bundle, target, variables)
+    return resolver.resolve(), resolver.problems
+
+
+def check_bundles(bundles, targets=None):
+    """Return every unresolved or cyclic reference across the given bundles and targets"""
+    problems = []
+    for bundle in bundles:
+        for target in bundle.targets or ['default']:
+            if targets and target not in targets:
+                continue
+            problems.extend(resolve_target(bundle, target)[1])
+    return problems
+
+
+def format_problem(problem):
+    return (f"{problem['file']} [{problem['target']}] {problem['location']}: "
+            f"{problem['kind']} reference {problem['reference']} ({problem['detail']})")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Check bundle interpolations offline")
+    parser.add_argument('--bundles-dir', default='bundles', help="Directory containing the bundles")
+    parser.add_argument('--target', action='append', dest='targets', metavar='TARGET',
+                        help="Only check this target (repeatable)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    problems = check_bundles(discover_bundles(args.bundles_dir), args.targets)
+
+    if problems:
+        print("BUNDLE REFERENCE ERRORS:")
+        for problem in problems:
+            print(f"  {format_problem(problem)}")
+        sys.exit(1)
+
+    print("All bundle references resolved")
+
+if __name__ == "__main__":
+    main()
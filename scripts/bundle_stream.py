@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""Check required fields of bundle YAML from the PyYAML event stream, with line and column"""
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as EventLoader
+except ImportError:
+    from yaml import SafeLoader as EventLoader
+
+WILDCARD = '*'
+MERGE_KEY = '<<'
+
+
+class _Node:
+    """An open mapping or sequence: its path, start position and, if a rule needs them, its keys"""
+
+    __slots__ = ('is_map', 'path', 'mark', 'anchor', 'keys', 'key', 'expecting_key', 'index',
+                 'rule')
+
+    def __init__(self, is_map, path, mark, anchor, rule):
+        self.is_map = is_map
+        self.path = path
+        self.mark = mark
+        self.anchor = anchor
+        self.rule = rule
+        # Only mappings a rule applies to, or that an alias may merge, keep their key names
+        self.keys = set() if is_map and (rule is not None or anchor is not None) else None
+        self.key = None
+        self.expecting_key = True
+        self.index = 0
+
+    def child_path(self):
+        if not self.is_map:
+            return self.path + (self.index,)
+        return self.path + ((None,) if self.expecting_key else (self.key,))
+
+    def completed(self, value=None):
+        """Advance past a complete key or value node"""
+        if not self.is_map:
+            self.index += 1
+        elif self.expecting_key:
+            self.key = value
+            self.expecting_key = False
+        else:
+            if self.keys is not None and self.key != MERGE_KEY:
+                self.keys.add(self.key)
+            self.expecting_key = True
+
+
+def _match(rules, path):
+    """Return (rule, wildcard captures) for the first rule whose pattern matches path"""
+    for rule in rules:
+        pattern = rule[0]
+        if len(pattern) != len(path):
+            continue
+        captures = []
+        for expected, actual in zip(pattern, path):
+            if expected == WILDCARD:
+                captures.append(actual)
+            elif expected != actual:
+                break
+        else:
+            return rule, captures
+    return None
+
+
+def _position(mark):
+    return mark.line + 1, mark.column + 1
+
+
+def _root_errors(rules, event):
+    """A document whose root is a sequence or non-null scalar lacks every root-rule field"""
+    if (isinstance(event, yaml.ScalarEvent) and event.implicit[0]
+            and event.value in ('', '~', 'null', 'Null', 'NULL')):
+        return
+    matched = _match(rules, ())
+    if matched is not None:
+        (_, fields, message), captures = matched
+        line, column = _position(event.start_mark)
+        for field in fields:
+            yield line, column, message.format(*captures, field=field)
+
+
+def iter_errors(file_path, rules):
+    """Yield (line, column, message) for each mapping missing a required field, in document order.
+
+    rules is a list of (path pattern, required fields, message format): the
+    pattern is a tuple of keys and list indexes with `*` wildcards, and the
+    message is formatted with the wildcard captures and `field`. Events are
+    consumed one at a time, so memory depends on nesting depth, not file
+    size; only mappings a rule applies to and anchored ones (for `<<`
+    merges) remember their keys. Stop iterating to stop reading the file.
+    """
+    stack = []
+    anchors = {}
+    documents = 0
+    with open(file_path, 'rb') as f:
+        events = yaml.parse(f, Loader=EventLoader)
+        try:
+            for event in events:
+                if isinstance(event, yaml.DocumentStartEvent):
+                    documents += 1
+                    if documents > 1:
+                        line, column = _position(event.start_mark)
+                        yield (line, column,
+                               "YAML syntax error: expected a single document in the stream")
+                        return
+                    continue
+
+                parent = stack[-1] if stack else None
+                if parent is None and isinstance(event, (yaml.SequenceStartEvent, yaml.ScalarEvent,
+                                                         yaml.AliasEvent)):
+                    yield from _root_errors(rules, event)
+                if isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+                    path = parent.child_path() if parent else ()
+                    is_map = isinstance(event, yaml.MappingStartEvent)
+                    stack.append(_Node(is_map, path, event.start_mark, event.anchor,
+                                       _match(rules, path) if is_map else None))
+                    continue
+
+                if isinstance(event, (yaml.MappingEndEvent, yaml.SequenceEndEvent)):
+                    node = stack.pop()
+                    if node.anchor is not None and node.keys is not None:
+                        anchors[node.anchor] = node.keys
+                    if node.rule is not None:
+                        (_, fields, message), captures = node.rule
+                        line, column = _position(node.mark)
+                        for field in fields:
+                            if field not in node.keys:
+                                yield line, column, message.format(*captures, field=field)
+                    if stack:
+                        stack[-1].completed()
+                    continue
+
+                if isinstance(event, yaml.AliasEvent) and parent is not None:
+                    # `<<: *anchor` or `<<: [*a, *b]` merge the anchored mapping's keys
+                    target = parent if parent.is_map else (stack[-2] if len(stack) > 1 else None)
+                    if (target is not None and target.is_map and not target.expecting_key
+                            and target.key == MERGE_KEY and target.keys is not None):
+                        target.keys |= anchors.get(event.anchor, set())
+                    elif not (parent.is_map and parent.expecting_key):
+                        # A resource written as `name: *anchor` is checked against the anchored keys
+                        matched = _match(rules, parent.child_path())
+                        if matched is not None and event.anchor in anchors:
+                            (_, fields, message), captures = matched
+                            line, column = _position(event.start_mark)
+                            for field in fields:
+                                if field not in anchors[event.anchor]:
+                                    yield line, column, message.format(*captures, field=field)
+                    parent.completed()
+                elif isinstance(event, yaml.ScalarEvent) and parent is not None:
+                    parent.completed(event.value)
+        except yaml.MarkedYAMLError as e:
+            mark = e.problem_mark or e.context_mark
+            line, column = _position(mark) if mark else (1, 1)
+            yield line, column, f"YAML syntax error: {e}"
+            return
+        except yaml.YAMLError as e:
+            yield 1, 1, f"YAML syntax error: {e}"
+            return
+        finally:
+            events.close()
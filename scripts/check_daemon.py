@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+"""Resident PII scan and bundle validation server for git hooks, with an in-process fallback"""
+
+import argparse
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import socket
+import socketserver
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_SOCKET_PATH = Path('.cache') / 'check-daemon.sock'
+DEFAULT_POLL_INTERVAL = 1.0
+# Seconds a hook client waits for the daemon before running the check itself
+CLIENT_TIMEOUT = 30.0
+# Memoized (path, notebook_outputs) findings kept before the least recently used are dropped
+FINDINGS_CACHE_MAX_ENTRIES = 4096
+
+# Directories never watched, matching the repository index
+WATCH_EXCLUDE_DIRS = {'.git', '__pycache__', '.cache', '.pytest_cache', 'node_modules',
+                      '.databricks'}
+
+# inotify(7) flags
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_IGNORED = 0x8000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_MODIFY
+_EVENT = struct.Struct('iIII')
+
+
+def _signature(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _walk_dirs(root):
+    """Yield root and every directory below it that is not excluded"""
+    yield root
+    try:
+        with os.scandir(root) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+    except OSError:
+        return
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False) and entry.name not in WATCH_EXCLUDE_DIRS:
+            yield from _walk_dirs(entry.path)
+
+
+class PollingWatcher:
+    """Report changed files by comparing (mtime, size) snapshots of the tree"""
+
+    def __init__(self, root, interval=DEFAULT_POLL_INTERVAL):
+        self.root = os.path.abspath(root)
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self):
+        snapshot = {}
+        for directory in _walk_dirs(self.root):
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        if entry.is_file(follow_symlinks=False):
+                            stat = entry.stat(follow_symlinks=False)
+                            snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                continue
+        return snapshot
+
+    def changes(self, timeout=None):
+        """Wait up to timeout seconds and return paths created, modified or deleted since then"""
+        time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+        snapshot = self._scan()
+        changed = {path for path, signature in snapshot.items()
+                   if self._snapshot.get(path) != signature}
+        changed |= self._snapshot.keys() - snapshot.keys()
+        self._snapshot = snapshot
+        return changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Report changed files from Linux inotify events, watching new directories as they appear"""
+
+    def __init__(self, root):
+        libc_name = ctypes.util.find_library('c')
+        if not libc_name or not sys.platform.startswith('linux'):
+            raise OSError("inotify is not available")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.root = os.path.abspath(root)
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs = {}
+        for directory in _walk_dirs(self.root):
+            self._add(directory)
+
+    def _add(self, directory):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd >= 0:
+            self._dirs[wd] = directory
+
+    def changes(self, timeout=None):
+        """Wait up to timeout seconds for events and return the paths they name"""
+        changed = set()
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        while readable:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                name = data[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b'\0')
+                offset += _EVENT.size + length
+                if mask & IN_IGNORED:
+                    # The directory is gone and the kernel dropped its watch
+                    self._dirs.pop(wd, None)
+                    continue
+                if wd not in self._dirs or not name:
+                    continue
+                path = os.path.join(self._dirs[wd], os.fsdecode(name))
+                if mask & IN_ISDIR:
+                    if mask & (IN_DELETE | IN_MOVED_FROM):
+                        # Report the directory itself so state for the files below it is dropped
+                        changed.add(path)
+                    if (mask & (IN_CREATE | IN_MOVED_TO)
+                            and os.path.basename(path) not in WATCH_EXCLUDE_DIRS):
+                        for directory in _walk_dirs(path):
+                            self._add(directory)
+                    continue
+                changed.add(path)
+            # Coalesce the burst of events an editor save produces
+            readable, _, _ = select.select([self.fd], [], [], 0.05)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+def make_watcher(root, poll_interval=DEFAULT_POLL_INTERVAL, polling=False):
+    """Return an inotify watcher where the platform supports it, otherwise a polling one"""
+    if not polling:
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(root, poll_interval)
+
+
+class CheckDaemon:
+    """Warm state for PII scans and bundle validation.
+
+    Imports, compiled rules and parsed bundles stay in memory, and PII
+    findings are memoized per (path, mtime, size) for at most max_findings
+    files; the watcher refreshes changed files in the background, and drops
+    deleted ones, so a hook request only pays for files it has not seen
+    since their last edit. An edit to the source of a loaded check marks the
+    daemon stale, and serve() then exits so the process can restart.
+    """
+
+    def __init__(self, root='.', max_findings=FINDINGS_CACHE_MAX_ENTRIES):
+        from scripts import pii_scanner, validate_bundles
+        from scripts.repo_index import LRUCache
+
+        self.root = os.path.abspath(root)
+        self.pii_scanner = pii_scanner
+        self.validate_bundles = validate_bundles
+        self.lock = threading.Lock()
+        # (absolute path, notebook_outputs) -> (signature, findings)
+        self._findings = LRUCache(max_findings)
+        # absolute baseline path -> (signature, fingerprints)
+        self._baselines = {}
+        self.refreshed = 0
+        # Rules, compiled patterns and module-level caches all come from these files
+        self.sources = {os.path.abspath(__file__)} | {
+            os.path.abspath(module.__file__) for name, module in list(sys.modules.items())
+            if name.startswith('scripts.') and getattr(module, '__file__', None)}
+        self.stale = False
+
+    def findings(self, path, notebook_outputs=False):
+        key = (os.path.abspath(path), notebook_outputs)
+        signature = _signature(key[0])
+        cached = self._findings.get(key)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        if signature is None:
+            self._findings.pop(key, None)
+            return None
+        findings = self.pii_scanner.find_pii(path, notebook_outputs)
+        self._findings[key] = (signature, findings)
+        return findings
+
+    def forget(self, path):
+        """Drop memoized findings for a deleted file, or for every file below a deleted directory"""
+        prefix = os.path.join(path, '')
+        for key in [key for key in self._findings if key[0] == path or key[0].startswith(prefix)]:
+            del self._findings[key]
+
+    def baseline(self, baseline_path):
+        baseline_path = os.path.abspath(baseline_path)
+        signature = _signature(baseline_path)
+        cached = self._baselines.get(baseline_path)
+        if cached is None or cached[0] != signature:
+            cached = (signature, self.pii_scanner.load_baseline(baseline_path))
+            self._baselines[baseline_path] = cached
+        return cached[1]
+
+    def pii(self, paths, cwd, notebook_outputs=False):
+        """Return (output lines, exit code) as `pii_scanner.py PATHS` would print them"""
+        baseline_path = os.path.join(cwd, self.pii_scanner.DEFAULT_BASELINE_PATH)
+        baseline = self.baseline(baseline_path)
+        base_dir = os.path.dirname(baseline_path)
+        violations = []
+        for path in paths:
+            findings = self.findings(os.path.join(cwd, path), notebook_outputs) or []
+            if baseline:
+                path_key = self.pii_scanner.baseline_path_key(os.path.join(cwd, path), base_dir)
+                fingerprint = self.pii_scanner.finding_fingerprint
+                findings = [finding for finding in findings
+                            if fingerprint(path_key, finding[0], finding[2]) not in baseline]
+            violations.extend(f"  {self.pii_scanner.format_violation(path, finding)}"
+                              for finding in findings)
+        if violations:
+            return ["PII VIOLATIONS FOUND:"] + violations, 1
+        return ["No PII violations found"], 0
+
+    def bundles(self, paths, cwd):
+        """Return (output lines, exit code) as `validate_bundles.py PATHS` would print them"""
+        validate = self.validate_bundles
+        bundle_paths = [path for path in paths if validate.is_bundle_file(path)]
+        errors = []
+        for path in bundle_paths:
+            errors.extend(f"  {path}: {error}"
+                          for error in validate.validate_file(os.path.join(cwd, path)))
+        located = [os.path.join(cwd, path) for path in bundle_paths]
+        errors.extend(f"  {os.path.relpath(file_path, cwd)}: {error}"
+                      for file_path, error in validate.location_errors(located))
+        if errors:
+            return ["BUNDLE VALIDATION ERRORS:"] + errors, 1
+        return ["All bundles validated successfully"], 0
+
+    def refresh(self, changed):
+        """Recompute memoized findings and bundle models for changed files ahead of requests"""
+        if self.sources & {os.path.abspath(path) for path in changed}:
+            self.stale = True
+            return
+        for path in sorted(changed):
+            if not os.path.isfile(path):
+                self.forget(path)
+                continue
+            rel_path = os.path.relpath(path, self.root)
+            if self.pii_scanner.is_excluded(rel_path):
+                continue
+            modes = {outputs for cached_path, outputs in list(self._findings)
+                     if cached_path == path}
+            for notebook_outputs in modes or {False}:
+                self.findings(path, notebook_outputs)
+            if self.validate_bundles.is_bundle_file(path):
+                self.validate_bundles.validate_file(path)
+            self.refreshed += 1
+
+    def handle(self, request):
+        command = request.get('command')
+        cwd = request.get('cwd') or self.root
+        with self.lock:
+            if self.stale and command in ('pii', 'bundles'):
+                # Answering would apply outdated rules; the client checks in-process instead
+                return {'lines': ["check daemon is restarting"], 'exit': 2, 'stale': True}
+            if command == 'pii':
+                lines, code = self.pii(request.get('paths', []), cwd,
+                                       request.get('notebook_outputs', False))
+            elif command == 'bundles':
+                lines, code = self.bundles(request.get('paths', []), cwd)
+            elif command == 'status':
+                lines, code = [f"check daemon for {self.root}: {len(self._findings)} files warm, "
+                               f"{self.refreshed} refreshed after edits"], 0
+            else:
+                lines, code = [f"unknown command: {command}"], 2
+        return {'lines': lines, 'exit': code}
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        try:
+            request = json.loads(line)
+        except ValueError:
+            response = {'lines': ["invalid request"], 'exit': 2}
+        else:
+            if request.get('command') == 'stop':
+                response = {'lines': ["check daemon stopped"], 'exit': 0}
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+            else:
+                response = self.server.daemon.handle(request)
+        self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path, daemon):
+        self.daemon = daemon
+        super().__init__(str(socket_path), _Handler)
+
+
+def _watch(daemon, watcher, stopped, server):
+    while not stopped.is_set():
+        changed = watcher.changes(timeout=0.5)
+        if changed:
+            with daemon.lock:
+                daemon.refresh(changed)
+            if daemon.stale:
+                server.shutdown()
+                return
+
+
+def serve(root='.', socket_path=DEFAULT_SOCKET_PATH, poll_interval=DEFAULT_POLL_INTERVAL,
+          polling=False, ready=None):
+    """Run the daemon until asked to stop or its sources change, returning True in that case.
+
+    ready, if given, is set once clients can connect.
+    """
+    socket_path = Path(socket_path)
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    if socket_path.exists():
+        try:
+            request(socket_path, {'command': 'status'}, timeout=1)
+        except OSError:
+            socket_path.unlink()
+        else:
+            raise RuntimeError(f"a check daemon is already listening on {socket_path}")
+
+    daemon = CheckDaemon(root)
+    watcher = make_watcher(root, poll_interval, polling)
+    stopped = threading.Event()
+    server = DaemonServer(socket_path, daemon)
+    watch_thread = threading.Thread(target=_watch, args=(daemon, watcher, stopped, server),
+                                    daemon=True)
+    try:
+        watch_thread.start()
+        if ready is not None:
+            ready.set()
+        server.serve_forever()
+    finally:
+        stopped.set()
+        watch_thread.join()
+        watcher.close()
+        server.server_close()
+        try:
+            socket_path.unlink()
+        except FileNotFoundError:
+            pass
+    return daemon.stale
+
+
+def request(socket_path, message, timeout=CLIENT_TIMEOUT):
+    """Send one request to the daemon and return its response; raises OSError if none is running"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(str(socket_path))
+        client.sendall(json.dumps(message).encode('utf-8') + b'\n')
+        data = b''
+        while not data.endswith(b'\n'):
+            chunk = client.recv(64 * 1024)
+            if not chunk:
+                raise ConnectionError("check daemon closed the connection")
+            data += chunk
+    return json.loads(data)
+
+
+def _run_in_process(command, paths, notebook_outputs):
+    """No daemon: run the check the way the hook did before, in this interpreter"""
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    if command == 'pii':
+        from scripts import pii_scanner
+        pii_scanner.main(paths + (['--notebook-outputs'] if notebook_outputs else []))
+    else:
+        from scripts import validate_bundles
+        validate_bundles.main(paths)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Keep PII scanning and bundle validation warm for git hooks")
+    parser.add_argument('--socket', default=str(DEFAULT_SOCKET_PATH), metavar='PATH',
+                        help=f"Unix socket of the daemon (default: {DEFAULT_SOCKET_PATH})")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = subparsers.add_parser('serve', help="Run the daemon in the foreground")
+    serve_parser.add_argument('--root', default='.', help="Directory to watch")
+    serve_parser.add_argument('--poll-interval', type=float, default=DEFAULT_POLL_INTERVAL,
+                              metavar='SECONDS',
+                              help=f"Polling fallback interval (default: {DEFAULT_POLL_INTERVAL})")
+    serve_parser.add_argument('--polling', action='store_true',
+                              help="Poll even where inotify is available")
+
+    pii_parser = subparsers.add_parser('pii', help="Scan files for PII through the daemon")
+    pii_parser.add_argument('paths', nargs='*', help="Files to scan")
+    pii_parser.add_argument('--notebook-outputs', action='store_true',
+                            help="Also scan notebook text outputs")
+
+    bundles_parser = subparsers.add_parser('bundles',
+                                           help="Validate bundle files through the daemon")
+    bundles_parser.add_argument('paths', nargs='*', help="Bundle files to validate")
+
+    subparsers.add_parser('status', help="Report whether a daemon is running")
+    subparsers.add_parser('stop', help="Stop the running daemon")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    args = parse_args(argv)
+    if args.command == 'serve':
+        sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+        print(f"Check daemon listening on {args.socket}", file=sys.stderr)
+        try:
+            stale = serve(args.root, args.socket, args.poll_interval, args.polling)
+        except RuntimeError as e:
+            print(e, file=sys.stderr)
+            sys.exit(1)
+        if stale:
+            # A fresh interpreter is the only way to drop every rule and cache loaded so far
+            print("Check sources changed; restarting the daemon", file=sys.stderr)
+            os.execv(sys.executable, [sys.executable, os.path.abspath(__file__), *argv])
+        return
+
+    message = {'command': args.command, 'cwd': os.getcwd(), 'paths': getattr(args, 'paths', []),
+               'notebook_outputs': getattr(args, 'notebook_outputs', False)}
+    try:
+        response = request(args.socket, message)
+    except OSError:
+        response = None
+    if response is None or response.get('stale'):
+        if args.command in ('pii', 'bundles'):
+            _run_in_process(args.command, args.paths, getattr(args, 'notebook_outputs', False))
+            return
+        print("No check daemon running")
+        sys.exit(0 if args.command == 'stop' else 1)
+
+    for line in response['lines']:
+        print(line)
+    if response['exit']:
+        sys.exit(response['exit'])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""Validate and deploy every bundle target and sub-environment concurrently"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scripts.bundle_model import discover_bundles
+from scripts.bundle_references import resolve_target
+from scripts.parameter_loader import ParameterLoader
+from scripts.workspace_client import DEFAULT_TOKEN_CACHE_PATH, TokenCache, token_credentials
+
+DEFAULT_JOBS = 4
+# Bundle variable set from each sub-environment (e.g. deva, devb under dev)
+SUB_ENVIRONMENT_VARIABLE = 'amic_environment'
+# Credential keys from ParameterLoader.get_databricks_config -> CLI environment variables
+CREDENTIAL_ENV = {
+    'host': 'DATABRICKS_HOST',
+    'client_id': 'DATABRICKS_CLIENT_ID',
+    'client_secret': 'DATABRICKS_CLIENT_SECRET',
+    'auth_type': 'DATABRICKS_AUTH_TYPE',
+    'token': 'DATABRICKS_TOKEN',
+}
+# Markers ParameterLoader leaves in place of secrets it could not fetch
+UNRESOLVED_SECRET_PREFIXES = ('SECRET_ERROR:', 'SECRET_NOT_FOUND:', 'FALLBACK_NOT_FOUND:')
+# Lines of CLI output shown for a failed node
+FAILURE_OUTPUT_LINES = 20
+
+
+class DeployNode:
+    """One `databricks bundle` run: a bundle, a target and an optional sub-environment"""
+
+    def __init__(self, bundle, target, sub_environment=None):
+        self.bundle = bundle
+        self.target = target
+        self.sub_environment = sub_environment
+        self.depends_on = []
+        self.status = 'pending'
+        self.duration = 0.0
+        self.output = ''
+
+    @property
+    def name(self):
+        label = f"{self.target}/{self.sub_environment}" if self.sub_environment else self.target
+        return f"{self.bundle.name} [{label}]"
+
+    @property
+    def variables(self):
+        return {SUB_ENVIRONMENT_VARIABLE: self.sub_environment} if self.sub_environment else {}
+
+    def command(self, databricks, action):
+        args = [databricks, 'bundle', action, '--target', self.target]
+        for name, value in self.variables.items():
+            args += ['--var', f"{name}={value}"]
+        return args
+
+
+def _state_key(node, credentials):
+    """Nodes sharing a workspace root path share deployment state and its lock"""
+    config, _ = resolve_target(node.bundle, node.target, node.variables)
+    root_path = ((config.get('workspace') or {}).get('root_path')
+                 or f"~/.bundle/{node.bundle.name}/{node.target}")
+    return (credentials.get(node.target) or {}).get('host'), root_path
+
+
+def build_graph(bundles, loader, targets=None, credentials=None):
+    """Return deploy nodes for every bundle x target x sub-environment.
+
+    Each node must resolve to its own workspace root path, and so its own
+    deployment state; two nodes sharing one would overwrite each other's
+    resources, so that raises ValueError rather than deploying either.
+    """
+    credentials = credentials or {}
+    nodes = []
+    by_state = {}
+    for bundle in bundles:
+        declared = (bundle.config.get('variables') or {})
+        for target in sorted(bundle.targets):
+            if targets and target not in targets:
+                continue
+            sub_environments = []
+            if SUB_ENVIRONMENT_VARIABLE in declared:
+                sub_environments = loader.get_sub_environments(target)
+            for sub_environment in sub_environments or [None]:
+                node = DeployNode(bundle, target, sub_environment)
+                key = _state_key(node, credentials)
+                if key in by_state:
+                    raise ValueError(f"{by_state[key].name} and {node.name} share the deployment "
+                                     f"state at {key[1]}; key workspace.root_path on "
+                                     f"${{var.{SUB_ENVIRONMENT_VARIABLE}}}")
+                by_state[key] = node
+                nodes.append(node)
+    return nodes
+
+
+def resolve_credentials(loader, targets):
+    """Resolve each target's Databricks credentials once; None marks a target with failed secrets"""
+    credentials = {}
+    for target in sorted(set(targets)):
+        try:
+            config = loader.get_databricks_config(target)
+        except (KeyError, ValueError):
+            # Targets without an environment config fall back to the caller's environment
+            config = {}
+        values = {key: config[key] for key in CREDENTIAL_ENV if config.get(key)}
+        unresolved = any(str(value).startswith(UNRESOLVED_SECRET_PREFIXES)
+                         for value in values.values())
+        credentials[target] = None if unresolved else values
+    return credentials
+
+
+def _run_node(node, actions, databricks, env):
+    started = time.perf_counter()
+    output = []
+    status = 'succeeded'
+    for action in actions:
+        try:
+            result = subprocess.run(node.command(databricks, action), cwd=node.bundle.directory,
+                                    env=env, capture_output=True, text=True)
+        except OSError as e:
+            output.append(f"{databricks}: {e}")
+            status = 'failed'
+            break
+        output.append(result.stdout + result.stderr)
+        if result.returncode != 0:
+            status = 'failed'
+            break
+    return status, time.perf_counter() - started, ''.join(output)
+
+
+def run_graph(nodes, credentials, actions=('validate', 'deploy'), jobs=DEFAULT_JOBS,
+              on_failure='fail-fast', databricks='databricks', report=None):
+    """Run nodes in a bounded pool as their dependencies succeed; returns the wall-clock seconds.
+
+    With fail-fast no new node starts after the first failure; with continue
+    only the dependents of a failed node are skipped.
+    """
+    base_env = dict(os.environ)
+    jobs = max(1, jobs)
+    pending = list(nodes)
+    running = {}
+    failed = False
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        while pending or running:
+            for node in list(pending):
+                if any(dep.status in ('failed', 'skipped') for dep in node.depends_on) or (
+                        failed and on_failure == 'fail-fast'):
+                    node.status = 'skipped'
+                    pending.remove(node)
+                    if report:
+                        report(node)
+                elif credentials.get(node.target, {}) is None:
+                    node.status = 'failed'
+                    node.output = f"credentials for target '{node.target}' could not be resolved"
+                    failed = True
+                    pending.remove(node)
+                    if report:
+                        report(node)
+                elif len(running) < jobs and all(dep.status == 'succeeded'
+                                                 for dep in node.depends_on):
+                    # Only as many nodes as workers are submitted so fail-fast stops queued work
+                    env = dict(base_env)
+                    env.update({CREDENTIAL_ENV[key]: value
+                                for key, value in credentials.get(node.target, {}).items()})
+                    node.status = 'running'
+                    pending.remove(node)
+                    running[executor.submit(_run_node, node, actions, databricks, env)] = node
+
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                node = running.pop(future)
+                node.status, node.duration, node.output = future.result()
+                failed = failed or node.status == 'failed'
+                if report:
+                    report(node)
+
+    return time.perf_counter() - started
+
+
+def _report(node):
+    if node.status == 'skipped':
+        print(f"  SKIPPED {node.name}")
+        return
+    status = 'OK' if node.status == 'succeeded' else 'FAILED'
+    print(f"  {status} {node.name} ({node.duration:.1f}s)")
+    if node.status == 'failed':
+        for line in node.output.strip().splitlines()[-FAILURE_OUTPUT_LINES:]:
+            print(f"      {line}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Validate and deploy bundles to every target concurrently")
+    parser.add_argument('--bundles-dir', default='bundles', help="Directory containing the bundles")
+    parser.add_argument('--bundle', action='append', dest='bundles', metavar='NAME',
+                        help="Only deploy this bundle directory (repeatable)")
+    parser.add_argument('--target', action='append', dest='targets', metavar='TARGET',
+                        help="Only deploy this target (repeatable)")
+    parser.add_argument('--validate-only', action='store_true',
+                        help="Run `bundle validate` without deploying")
+    parser.add_argument('--jobs', '-j', type=int, default=DEFAULT_JOBS,
+                        help=f"Concurrent CLI runs (default: {DEFAULT_JOBS})")
+    parser.add_argument('--on-failure', choices=['fail-fast', 'continue'], default='fail-fast',
+                        help="Stop starting new deploys after a failure, "
+                             "or only skip its dependents")
+    parser.add_argument('--config', default='parameters.yml', help="Path to parameters.yml")
+    parser.add_argument('--environments-dir', default='environments',
+                        help="Environment configs directory")
+    parser.add_argument('--databricks', default='databricks', help="Databricks CLI executable")
+    parser.add_argument('--share-token', action='store_true',
+                        help="Exchange OAuth credentials once per service principal and pass the "
+                             "token to every CLI run")
+    parser.add_argument('--token-cache', default=str(DEFAULT_TOKEN_CACHE_PATH), metavar='PATH',
+                        help="Shared OAuth token cache for --share-token "
+                             f"(default: {DEFAULT_TOKEN_CACHE_PATH})")
+    return parser.parse_args(argv)
+
+
+def main(argv=None, loader=None):
+    args = parse_args(argv)
+    loader = loader or ParameterLoader(args.config, args.environments_dir)
+
+    bundles = [bundle for bundle in discover_bundles(args.bundles_dir)
+               if not args.bundles or bundle.directory.name in args.bundles]
+    targets = {target for bundle in bundles for target in bundle.targets
+               if not args.targets or target in args.targets}
+    credentials = resolve_credentials(loader, targets)
+    if args.share_token:
+        credentials = token_credentials(credentials, TokenCache(args.token_cache))
+    try:
+        nodes = build_graph(bundles, loader, args.targets, credentials)
+    except ValueError as e:
+        print(f"DEPLOY ERRORS:\n  {e}")
+        sys.exit(1)
+    actions = ['validate'] if args.validate_only else ['validate', 'deploy']
+
+    print(f"Running {' + '.join(actions)} for {len(nodes)} bundle targets "
+          f"with {args.jobs} workers:")
+    wall_clock = run_graph(nodes, credentials, actions, args.jobs, args.on_failure,
+                           args.databricks, _report)
+    sequential = sum(node.duration for node in nodes)
+    print(f"Wall clock {wall_clock:.1f}s vs {sequential:.1f}s sequential "
+          f"({sequential / wall_clock if wall_clock else 1:.1f}x)")
+
+    failed = [node for node in nodes if node.status != 'succeeded']
+    if failed:
+        print("DEPLOY ERRORS:")
+        for node in failed:
+            print(f"  {node.name}: {node.status}")
+        sys.exit(1)
+
+    print("All bundle targets validated" if args.validate_only else "All bundle targets deployed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+"""Compare declared raw-layer schemas, volumes and grants with the live Unity Catalog state"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlencode
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scripts.bundle_model import discover_bundles
+from scripts.bundle_references import resolve_target
+from scripts.scan_report import json_report, write_report
+from scripts.validate_bundles import normalize_location
+from scripts.workspace_client import (DEFAULT_TOKEN_CACHE_PATH, TokenCache, WorkspaceError,
+                                      shared_clients)
+
+DEFAULT_PAGE_CACHE_PATH = Path('.cache') / 'catalog-pages.json'
+DEFAULT_JOBS = 8
+DEFAULT_PAGE_SIZE = 100
+SCHEMAS_ENDPOINT = '/api/2.1/unity-catalog/schemas'
+VOLUMES_ENDPOINT = '/api/2.1/unity-catalog/volumes'
+PERMISSIONS_ENDPOINT = '/api/2.1/unity-catalog/permissions'
+# Schemas every catalog has that no bundle declares
+IGNORED_SCHEMAS = {'information_schema', 'default'}
+# Declared fields compared with the catalog, per resource kind
+COMPARED_FIELDS = {
+    'schema': ['comment'],
+    'volume': ['volume_type', 'storage_location', 'comment'],
+}
+
+# Rule ids for json reports
+DRIFT_RULES = {
+    'missing-resource': 'Declared resource does not exist in the catalog',
+    'extra-resource': 'Catalog resource is not declared by any bundle',
+    'drifted-resource': 'Catalog resource differs from its declaration',
+}
+
+Declared = namedtuple('Declared', ['kind', 'full_name', 'fields', 'grants', 'file'])
+
+
+class CatalogError(Exception):
+    """A catalog listing that could not be fetched or replayed"""
+
+
+def request_key(path, params=None):
+    return f"{path}?{urlencode(sorted((params or {}).items()))}"
+
+
+def _normalize(field, value):
+    if field == 'storage_location':
+        return normalize_location(value)
+    if field == 'volume_type':
+        return value.upper()
+    return value.strip()
+
+
+def _declared_grants(grants):
+    """Return {principal: privileges} for a `grants` list, None if absent or not fully resolved.
+
+    An unresolved principal stands for someone the catalog does grant to, so
+    comparing the rest would report that principal's real grants as drift.
+    """
+    if grants is None:
+        return None
+    declared = {}
+    for entry in grants or []:
+        principal = str((entry or {}).get('principal') or '')
+        if '${' in principal:
+            return None
+        if principal:
+            declared.setdefault(principal, set()).update(
+                str(p).upper() for p in entry.get('privileges') or [])
+    return declared
+
+
+def declared_state(bundles, targets=None):
+    """Return {target: {(kind, full name): Declared}} for every bundle target's schemas and volumes.
+
+    Resources whose name still holds a ${...} reference are skipped (they
+    are reported by bundle_references), as are unresolved fields and the
+    grants of a resource with any unresolved principal, so only what the
+    bundle pins down is compared.
+    """
+    state = {}
+    for bundle in bundles:
+        for target in sorted(bundle.targets) or ['default']:
+            if targets and target not in targets:
+                continue
+            config, _ = resolve_target(bundle, target)
+            resources = config.get('resources') or {}
+            for kind, section, name_fields in (
+                    ('schema', 'schemas', ('catalog_name', 'name')),
+                    ('volume', 'volumes', ('catalog_name', 'schema_name', 'name'))):
+                for key, resource in sorted((resources.get(section) or {}).items()):
+                    if not isinstance(resource, dict):
+                        continue
+                    parts = [str(resource.get(field) or '') for field in name_fields]
+                    if not all(parts) or any('${' in part for part in parts):
+                        continue
+                    fields = {field: _normalize(field, str(resource[field]))
+                              for field in COMPARED_FIELDS[kind]
+                              if resource.get(field) is not None
+                              and '${' not in str(resource[field])}
+                    full_name = '.'.join(parts).lower()
+                    state.setdefault(target, {})[kind, full_name] = Declared(
+                        kind, full_name, fields, _declared_grants(resource.get('grants')),
+                        str(bundle.sources.get((section, key), bundle.root_file)))
+    return state
+
+
+class PageCache:
+    """Listing pages from earlier runs with their ETag or Last-Modified, for revalidation"""
+
+    def __init__(self, path=DEFAULT_PAGE_CACHE_PATH):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        try:
+            self.pages = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            self.pages = {}
+        self.dirty = False
+
+    def get(self, key):
+        with self.lock:
+            return self.pages.get(key)
+
+    def put(self, key, page):
+        with self.lock:
+            self.pages[key] = page
+            self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self.pages, f, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self.dirty = False
+
+
+class HttpCatalog:
+    """Catalog pages from the Unity Catalog REST API through a shared WorkspaceClient"""
+
+    def __init__(self, client):
+        self.client = client
+        self.name = client.host
+
+    def get_page(self, path, params, etag=None, last_modified=None):
+        """Return (body or None if not modified, etag, last_modified); a missing parent is empty"""
+        try:
+            return self.client.conditional_get(path, params, etag, last_modified)
+        except WorkspaceError as e:
+            if e.status == 404:
+                return {}, None, None
+            raise CatalogError(str(e)) from e
+        except OSError as e:
+            raise CatalogError(f"{self.name}: {e}") from e
+
+
+class FixtureCatalog:
+    """Catalog pages replayed from a recording: {"pages": {key: {"etag": ..., "body": ...}}}"""
+
+    def __init__(self, path):
+        self.name = str(path)
+        try:
+            self.pages = json.loads(Path(path).read_text())['pages']
+        except (OSError, ValueError, KeyError) as e:
+            raise CatalogError(f"cannot read catalog fixture {path}: {e}") from e
+
+    def get_page(self, path, params, etag=None, last_modified=None):
+        page = self.pages.get(request_key(path, params))
+        if page is None:
+            raise CatalogError(f"no recorded response for {request_key(path, params)}")
+        if etag and page.get('etag') == etag:
+            return None, etag, last_modified
+        return page.get('body') or {}, page.get('etag'), page.get('last_modified')
+
+
+class CatalogReader:
+    """Paginated listings over a backend, revalidating pages held in a PageCache"""
+
+    def __init__(self, backend, cache=None, page_size=DEFAULT_PAGE_SIZE, recording=None):
+        self.backend = backend
+        self.cache = cache
+        self.page_size = page_size
+        self.recording = recording
+        self.fetched = 0
+        self.revalidated = 0
+        self._lock = threading.Lock()
+
+    def _page(self, path, params):
+        key = f"{self.backend.name} {request_key(path, params)}"
+        cached = self.cache.get(key) if self.cache else None
+        validators = (cached.get('etag'), cached.get('last_modified')) if cached else (None, None)
+        body, etag, last_modified = self.backend.get_page(path, params, *validators)
+        with self._lock:
+            if body is None:
+                self.revalidated += 1
+            else:
+                self.fetched += 1
+        if body is None:
+            body = cached['body']
+        elif self.cache and (etag or last_modified):
+            self.cache.put(key, {'etag': etag, 'last_modified': last_modified, 'body': body})
+        if self.recording is not None:
+            with self._lock:
+                self.recording[request_key(path, params)] = {'etag': etag, 'body': body}
+        return body
+
+    def list_all(self, path, params, items_key):
+        """Follow next_page_token through every page of a listing"""
+        items = []
+        params = dict(params, max_results=self.page_size)
+        while True:
+            body = self._page(path, params)
+            items.extend(body.get(items_key) or [])
+            token = body.get('next_page_token')
+            if not token:
+                return items
+            params = dict(params, page_token=token)
+
+    def grants(self, kind, full_name):
+        body = self._page(f"{PERMISSIONS_ENDPOINT}/{kind}/{full_name}", {})
+        grants = {}
+        for assignment in body.get('privilege_assignments') or []:
+            privileges = {str(p.get('privilege') if isinstance(p, dict) else p).upper()
+                          for p in assignment.get('privileges') or []}
+            grants.setdefault(assignment.get('principal'), set()).update(privileges)
+        return grants
+
+
+def fetch_state(reader, declared, jobs=DEFAULT_JOBS):
+    """List the catalogs and schemas the declarations live in, then the declared resources' grants.
+
+    Returns ({(kind, full name): catalog object}, {(kind, full name): grants},
+    listed containers). Independent listings run concurrently in one
+    bounded pool; pages within a listing follow each other's tokens.
+    """
+    catalogs = sorted({full_name.split('.')[0] for _, full_name in declared})
+    schemas = sorted({tuple(full_name.split('.')[:2])
+                      for kind, full_name in declared if kind == 'volume'}
+                     | {tuple(full_name.split('.'))
+                        for kind, full_name in declared if kind == 'schema'})
+
+    def schema_listing(catalog):
+        return [('schema', item) for item in
+                reader.list_all(SCHEMAS_ENDPOINT, {'catalog_name': catalog}, 'schemas')]
+
+    def volume_listing(schema):
+        catalog, schema_name = schema
+        return [('volume', item) for item in reader.list_all(
+            VOLUMES_ENDPOINT, {'catalog_name': catalog, 'schema_name': schema_name}, 'volumes')]
+
+    actual = {}
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        listings = [executor.submit(schema_listing, catalog) for catalog in catalogs]
+        listings += [executor.submit(volume_listing, schema) for schema in schemas]
+        for listing in listings:
+            for kind, item in listing.result():
+                full_name = str(item.get('full_name') or '.'.join(
+                    str(item.get(field)) for field in ('catalog_name', 'schema_name', 'name')
+                    if item.get(field)))
+                actual[kind, full_name.lower()] = item
+
+        wanted = sorted(key for key, resource in declared.items()
+                        if resource.grants is not None and key in actual)
+        grants = dict(zip(wanted, executor.map(lambda key: reader.grants(*key), wanted)))
+    return actual, grants, (set(catalogs), {'.'.join(schema) for schema in schemas})
+
+
+def _field_drift(resource, item):
+    details = []
+    for field, expected in sorted(resource.fields.items()):
+        actual = item.get(field)
+        actual = _normalize(field, str(actual)) if actual is not None else None
+        if actual != expected:
+            details.append(f"{field} {actual!r} != declared {expected!r}")
+    return details
+
+
+def _grant_drift(declared, actual):
+    details = []
+    for principal in sorted(set(declared) | set(actual)):
+        missing = sorted(declared.get(principal, set()) - actual.get(principal, set()))
+        extra = sorted(actual.get(principal, set()) - declared.get(principal, set()))
+        if missing:
+            details.append(f"grants: {principal} lacks {', '.join(missing)}")
+        if extra:
+            details.append(f"grants: {principal} also has {', '.join(extra)}")
+    return details
+
+
+def reconcile(declared_by_target, states):
+    """Return drift entries {target, status, kind, full_name, file, details}.
+
+    states maps target -> fetch_state result. Extra resources are judged
+    against the declarations of every target reading the same catalog, so
+    two targets sharing a catalog do not flag each other's schemas.
+    """
+    drift = []
+    declared_anywhere = {}
+    for target, declared in declared_by_target.items():
+        for key, resource in declared.items():
+            declared_anywhere.setdefault(key, resource)
+
+    for target, declared in sorted(declared_by_target.items()):
+        actual, grants, _ = states[target]
+        for key, resource in sorted(declared.items()):
+            entry = {'target': target, 'kind': resource.kind, 'full_name': resource.full_name,
+                     'file': resource.file}
+            item = actual.get(key)
+            if item is None:
+                drift.append(dict(entry, status='missing', details=[]))
+                continue
+            details = _field_drift(resource, item)
+            if resource.grants is not None:
+                details += _grant_drift(resource.grants, grants.get(key, {}))
+            if details:
+                drift.append(dict(entry, status='drifted', details=details))
+
+    reported = set()
+    for target, declared in sorted(declared_by_target.items()):
+        actual, _, (catalogs, schemas) = states[target]
+        for (kind, full_name), item in sorted(actual.items()):
+            parts = full_name.split('.')
+            container = parts[0] if kind == 'schema' else '.'.join(parts[:2])
+            if (kind, full_name) in declared_anywhere or (kind, full_name) in reported:
+                continue
+            if kind == 'schema' and (parts[-1] in IGNORED_SCHEMAS or container not in catalogs):
+                continue
+            if kind == 'volume' and container not in schemas:
+                continue
+            reported.add((kind, full_name))
+            drift.append({'target': target, 'kind': kind, 'full_name': full_name, 'file': None,
+                          'status': 'extra', 'details': []})
+    return drift
+
+
+def format_drift(entry):
+    line = f"[{entry['target']}] {entry['status']} {entry['kind']} {entry['full_name']}"
+    if entry['file']:
+        line += f" ({entry['file']})"
+    return [line] + [f"    {detail}" for detail in entry['details']]
+
+
+def drift_result(entry):
+    """Report result for one drift entry"""
+    message = ' '.join([entry['status'], entry['kind'], entry['full_name']] + entry['details'])
+    return {'path': entry['file'] or entry['full_name'], 'rule': f"{entry['status']}-resource",
+            'message': f"[{entry['target']}] {message}"}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Report drift between declared raw-layer resources and the catalog")
+    parser.add_argument('--bundles-dir', default='bundles', help="Directory containing the bundles")
+    parser.add_argument('--target', action='append', dest='targets', metavar='TARGET',
+                        help="Only reconcile this target (repeatable)")
+    parser.add_argument('--fixture', metavar='FILE',
+                        help="Replay catalog responses recorded in FILE")
+    parser.add_argument('--record', metavar='FILE',
+                        help="Record every catalog response to FILE for --fixture")
+    parser.add_argument('--jobs', '-j', type=int, default=DEFAULT_JOBS,
+                        help=f"Concurrent catalog requests (default: {DEFAULT_JOBS})")
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE, metavar='N',
+                        help=f"Results per listing page (default: {DEFAULT_PAGE_SIZE})")
+    parser.add_argument('--cache', default=str(DEFAULT_PAGE_CACHE_PATH), metavar='PATH',
+                        help=f"Listing page cache (default: {DEFAULT_PAGE_CACHE_PATH})")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Fetch every page without revalidation")
+    parser.add_argument('--token-cache', default=str(DEFAULT_TOKEN_CACHE_PATH), metavar='PATH',
+                        help=f"Shared OAuth token cache (default: {DEFAULT_TOKEN_CACHE_PATH})")
+    parser.add_argument('--config', default='parameters.yml', help="Path to parameters.yml")
+    parser.add_argument('--environments-dir', default='environments',
+                        help="Environment configs directory")
+    parser.add_argument('--format', choices=['text', 'json'], default='text',
+                        help="Report format (default: text)")
+    parser.add_argument('--output', metavar='FILE',
+                        help="Write the json report to FILE instead of stdout")
+    args = parser.parse_args(argv)
+    if args.fixture and args.record:
+        parser.error("--record cannot be combined with --fixture")
+    return args
+
+
+def _backends(args, targets, loader):
+    """Return {target: backend}; targets sharing a workspace client share one backend"""
+    if args.fixture:
+        backend = FixtureCatalog(args.fixture)
+        return {target: backend for target in targets}
+    from scripts.deploy_orchestrator import resolve_credentials
+    from scripts.parameter_loader import ParameterLoader
+
+    loader = loader or ParameterLoader(args.config, args.environments_dir)
+    clients = shared_clients(resolve_credentials(loader, targets), TokenCache(args.token_cache))
+    backends = {}
+    by_client = {}
+    for target in targets:
+        if clients[target] is None:
+            raise CatalogError(f"credentials for target '{target}' could not be resolved")
+        backends[target] = by_client.setdefault(id(clients[target]), HttpCatalog(clients[target]))
+    return backends
+
+
+def main(argv=None, loader=None):
+    args = parse_args(argv)
+    declared_by_target = declared_state(discover_bundles(args.bundles_dir), args.targets)
+    if not declared_by_target:
+        print("No declared schemas or volumes to reconcile")
+        return
+
+    cache = None if args.no_cache else PageCache(args.cache)
+    recording = {} if args.record else None
+    readers = {}
+    states = {}
+    try:
+        backends = _backends(args, sorted(declared_by_target), loader)
+    except CatalogError as e:
+        print(f"CATALOG ERRORS:\n  {e}")
+        sys.exit(1)
+    try:
+        # One fetch per backend covering every target that reads through it
+        for backend in {id(backend): backend for backend in backends.values()}.values():
+            group = [target for target, other in backends.items() if other is backend]
+            declared = {key: resource for target in group
+                        for key, resource in declared_by_target[target].items()}
+            reader = readers[id(backend)] = CatalogReader(backend, cache, args.page_size, recording)
+            state = fetch_state(reader, declared, args.jobs)
+            states.update({target: state for target in group})
+    except CatalogError as e:
+        print(f"CATALOG ERRORS:\n  {e}")
+        sys.exit(1)
+    finally:
+        if cache is not None:
+            cache.save()
+        for backend in set(backends.values()):
+            if isinstance(backend, HttpCatalog):
+                backend.client.close()
+
+    if recording is not None:
+        Path(args.record).write_text(
+            json.dumps({'pages': recording}, indent=2, sort_keys=True) + "\n")
+    fetched = sum(reader.fetched for reader in readers.values())
+    revalidated = sum(reader.revalidated for reader in readers.values())
+    print(f"{fetched} catalog pages fetched, {revalidated} unchanged since the last run",
+          file=sys.stderr)
+
+    drift = reconcile(declared_by_target, states)
+    if args.format == 'json':
+        results = [drift_result(entry) for entry in drift]
+        write_report(json_report('drift-reconciler', results), args.output)
+    if drift:
+        if args.format == 'text':
+            print("CATALOG DRIFT FOUND:")
+            for entry in drift:
+                for line in format_drift(entry):
+                    print(f"  {line}")
+        sys.exit(1)
+
+    if args.format == 'text':
+        print("Catalog matches the bundle declarations")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Changed paths and added lines from plain `git diff`"""
+
+import re
+import subprocess
+
+HUNK_HEADER = re.compile(r'^@@ -\d+(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+
+
+def _diff_args(since=None, staged=False):
+    args = ['git', 'diff', '--no-color', '--no-ext-diff', '--diff-filter=ACMR']
+    if staged:
+        args.append('--cached')
+    if since:
+        args.append(since)
+    return args
+
+
+def _git(args, cwd=None):
+    result = subprocess.run(args, cwd=cwd, capture_output=True, text=True, encoding='utf-8',
+                            errors='replace')
+    if result.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} failed: {result.stderr.strip()}")
+    return result.stdout
+
+
+def changed_files(since=None, staged=False, cwd=None):
+    """Return paths added, copied, modified or renamed since a ref, or in the index with staged"""
+    output = _git(_diff_args(since, staged) + ['--name-only'], cwd)
+    return [line for line in output.splitlines() if line]
+
+
+def parse_added_lines(diff_text):
+    """Parse unified diff output into {path: [(first_line, [added lines])]} hunks"""
+    hunks = {}
+    path = None
+    current = None
+    next_line = 0
+    old_left = new_left = 0
+
+    for line in diff_text.splitlines():
+        if old_left or new_left:
+            # Inside a hunk every line is content, even one that looks like a header
+            if line.startswith('+'):
+                if current is None:
+                    # Consecutive added lines form one block so multi-line context is kept
+                    current = (next_line, [])
+                    hunks.setdefault(path, []).append(current)
+                current[1].append(line[1:])
+                next_line += 1
+                new_left -= 1
+            elif line.startswith('-'):
+                current = None
+                old_left -= 1
+            elif line.startswith(' '):
+                current = None
+                next_line += 1
+                old_left -= 1
+                new_left -= 1
+            continue
+
+        if line.startswith('+++ '):
+            target = line[4:]
+            path = target[2:] if target.startswith('b/') else None
+            continue
+        match = HUNK_HEADER.match(line)
+        if match and path is not None:
+            old_left = int(match.group(1) or 1)
+            next_line = int(match.group(2))
+            new_left = int(match.group(3) or 1)
+            current = None
+
+    return hunks
+
+
+def added_lines(since=None, staged=False, cwd=None):
+    """Return {path: [(first_line, [added lines])]} for the requested diff"""
+    return parse_added_lines(_git(_diff_args(since, staged) + ['--unified=0'], cwd))
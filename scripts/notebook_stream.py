@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""Stream cell text out of .ipynb notebooks without loading outputs or metadata"""
+
+import json
+import re
+
+NOTEBOOK_PATTERNS = ('*.ipynb',)
+
+# Characters read from the notebook per refill; strings that are skipped
+# (metadata, base64 images) are never held beyond one chunk
+READ_SIZE = 64 * 1024
+
+_STRING_SPECIAL = re.compile(r'["\\]')
+_SCALAR_END = re.compile(r'[,\]}\s]')
+_WHITESPACE = ' \t\r\n'
+
+
+def _wanted(path, outputs):
+    """Return True if the string at this JSON path is cell text to scan"""
+    if len(path) < 3 or path[0] != 'cells' or not isinstance(path[1], int):
+        return False
+    rest = path[2:]
+    if rest[0] == 'source':
+        return len(rest) == 1 or (len(rest) == 2 and isinstance(rest[1], int))
+    if not outputs or rest[0] != 'outputs' or len(rest) < 3:
+        return False
+    # Stream output text, or the text/plain rendering of execute results
+    if rest[2] == 'text':
+        return len(rest) == 3 or (len(rest) == 4 and isinstance(rest[3], int))
+    if rest[2] == 'data' and len(rest) >= 4 and rest[3] == 'text/plain':
+        return len(rest) == 4 or (len(rest) == 5 and isinstance(rest[4], int))
+    return False
+
+
+class _Reader:
+    """Minimal incremental JSON reader over a text file"""
+
+    def __init__(self, f, read_size=READ_SIZE):
+        self.f = f
+        self.read_size = read_size
+        self.buffer = ''
+        self.pos = 0
+
+    def _fill(self):
+        chunk = self.f.read(self.read_size)
+        if not chunk:
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Return the next non-whitespace character without consuming it"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                raise ValueError("unexpected end of notebook JSON")
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"expected {char!r} in notebook JSON, found {self.buffer[self.pos]!r}")
+        self.pos += 1
+
+    def string(self, keep=True):
+        """Consume a JSON string, returning its value, or None when keep is False"""
+        self.expect('"')
+        pieces = [] if keep else None
+        while True:
+            match = _STRING_SPECIAL.search(self.buffer, self.pos)
+            if match is None:
+                if keep:
+                    pieces.append(self.buffer[self.pos:])
+                self.pos = len(self.buffer)
+                if not self._fill():
+                    raise ValueError("unterminated string in notebook JSON")
+                continue
+
+            end = match.start()
+            if self.buffer[end] == '"':
+                if keep:
+                    pieces.append(self.buffer[self.pos:end])
+                self.pos = end + 1
+                return json.loads('"' + ''.join(pieces) + '"') if keep else None
+
+            # Backslash escape: keep it with the character after it
+            # (\uXXXX digits follow as plain text)
+            while end + 1 >= len(self.buffer):
+                if keep:
+                    pieces.append(self.buffer[self.pos:end])
+                self.pos = end
+                if not self._fill():
+                    raise ValueError("unterminated string in notebook JSON")
+                end = self.pos
+            if keep:
+                pieces.append(self.buffer[self.pos:end + 2])
+            self.pos = end + 2
+
+    def scalar(self):
+        """Consume a number, true, false or null"""
+        self.peek()
+        while True:
+            match = _SCALAR_END.search(self.buffer, self.pos)
+            if match:
+                self.pos = match.start()
+                return
+            self.pos = len(self.buffer)
+            if not self._fill():
+                return
+
+
+def _walk(reader, path, outputs):
+    """Yield (path, text) for every wanted string in the value at the reader's position"""
+    char = reader.peek()
+    if char == '{':
+        reader.pos += 1
+        if reader.peek() == '}':
+            reader.pos += 1
+            return
+        while True:
+            key = reader.string()
+            reader.expect(':')
+            yield from _walk(reader, path + (key,), outputs)
+            if reader.peek() == ',':
+                reader.pos += 1
+                continue
+            reader.expect('}')
+            return
+    elif char == '[':
+        reader.pos += 1
+        if reader.peek() == ']':
+            reader.pos += 1
+            return
+        index = 0
+        while True:
+            yield from _walk(reader, path + (index,), outputs)
+            index += 1
+            if reader.peek() == ',':
+                reader.pos += 1
+                continue
+            reader.expect(']')
+            return
+    elif char == '"':
+        if _wanted(path, outputs):
+            yield path, reader.string()
+        else:
+            reader.string(keep=False)
+    else:
+        reader.scalar()
+
+
+def iter_cells(file_path, outputs=False, read_size=READ_SIZE):
+    """Yield (cell_index, kind, text) for each cell's source, and text outputs when outputs is True.
+
+    kind is 'source' or 'output'. Multi-part sources and outputs are joined
+    exactly as Jupyter does, so line numbers match the rendered cell.
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        reader = _Reader(f, read_size)
+        current = None
+        parts = []
+        for path, text in _walk(reader, (), outputs):
+            # Everything under one source or one output field shares the same key
+            key = path[:3] if path[2] == 'source' else path[:5] if path[4] == 'text' else path[:6]
+            if key != current and parts:
+                yield current[1], 'source' if current[2] == 'source' else 'output', ''.join(parts)
+                parts = []
+            current = key
+            parts.append(text)
+        if parts:
+            yield current[1], 'source' if current[2] == 'source' else 'output', ''.join(parts)
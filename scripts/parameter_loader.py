@@ -1,43 +1,337 @@
 #!/usr/bin/env python3
 """Utility to load and resolve parameters from parameters.yml"""
 
+import argparse
+import hashlib
 import os
-import yaml
+import sys
 import re
-import boto3
 import json
+import threading
+import time
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scripts.bundle_model import load_yaml
+
+SECRET_PATTERN = re.compile(r'\$\{SECRET:([^:]+):([^}]+)\}')
+# ${SECRET:secret_name:key} or ${VAR_NAME}, resolved in a single re.sub pass
+PLACEHOLDER_PATTERN = re.compile(r'\$\{(?:SECRET:([^:]+):([^}]+)|([^}]+))\}')
+
+# How long fetched secrets are reused before Secrets Manager is asked again
+SECRET_CACHE_TTL = 300
+# How long a failed lookup is remembered: long enough that one config
+# resolution does not retry per value, short enough to ride out a transient error
+SECRET_FAILURE_TTL = 5
+# BatchGetSecretValue accepts at most 20 ids per call
+SECRET_BATCH_SIZE = 20
+
+# Compiled, pre-validated copy of parameters.yml and environments/*/config.yml,
+# kept in .cache/ beside parameters.yml under a name keyed on both sources
+SNAPSHOT_DIR = '.cache'
+SNAPSHOT_VERSION = 1
+REQUIRED_DATABRICKS_KEYS = ['host', 'client_id', 'client_secret', 'auth_type']
+
+_MISSING = object()
+
+class SecretCache:
+    """Thread-safe, TTL-bounded cache of parsed secret payloads by secret name.
+
+    Failed lookups are stored as None under the much shorter failure_ttl.
+    """
+
+    def __init__(self, ttl=SECRET_CACHE_TTL, clock=time.monotonic, failure_ttl=SECRET_FAILURE_TTL):
+        self.ttl = ttl
+        self.failure_ttl = failure_ttl
+        self.clock = clock
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, secret_name, default=None):
+        with self._lock:
+            entry = self._entries.get(secret_name)
+            if entry is None:
+                return default
+            expires, value = entry
+            if expires <= self.clock():
+                del self._entries[secret_name]
+                return default
+            return value
+
+    def put(self, secret_name, value):
+        ttl = self.ttl if value is not None else self.failure_ttl
+        with self._lock:
+            self._entries[secret_name] = (self.clock() + ttl, value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+# Shared by every ParameterLoader in the process
+_SECRET_CACHE = SecretCache()
+
+def _environment_config_files(environments_dir):
+    environments_dir = Path(environments_dir)
+    if not environments_dir.is_dir():
+        return {}
+    return {d.name: d / "config.yml" for d in sorted(environments_dir.iterdir())
+            if (d / "config.yml").is_file()}
+
+def default_snapshot_path(config_path="parameters.yml", environments_dir="environments"):
+    """Return the snapshot path for one pair of config sources, so loaders over other
+    sources never read or overwrite it"""
+    return _keyed_snapshot_path(os.fspath(config_path), os.fspath(environments_dir), os.getcwd())
+
+@lru_cache(maxsize=256)
+def _keyed_snapshot_path(config_path, environments_dir, cwd):
+    # cwd is part of the key because relative sources resolve against it
+    config_path = Path(cwd, config_path).resolve()
+    sources = f"{config_path}\0{Path(cwd, environments_dir).resolve()}"
+    digest = hashlib.sha256(sources.encode('utf-8')).hexdigest()[:12]
+    return config_path.parent / SNAPSHOT_DIR / f"parameters.{digest}.snapshot.json"
+
+def source_manifest(config_path, environments_dir):
+    """Return {path: [mtime_ns, size]} for parameters.yml and every environment config"""
+    manifest = {}
+    for path in [Path(config_path), *_environment_config_files(environments_dir).values()]:
+        stat = path.stat()
+        manifest[str(path.resolve())] = [stat.st_mtime_ns, stat.st_size]
+    return manifest
+
+def validate_sources(parameters, environments):
+    """Return a list of problems that would make the loader fail at lookup time"""
+    errors = []
+    if not isinstance(parameters, dict) or not isinstance(parameters.get("databricks"), dict):
+        errors.append("parameters.yml: missing 'databricks' section")
+    for name, env_config in environments.items():
+        databricks = (env_config or {}).get("databricks") if isinstance(env_config, dict) else None
+        if not isinstance(databricks, dict):
+            errors.append(f"environments/{name}/config.yml: missing 'databricks' section")
+            continue
+        for key in REQUIRED_DATABRICKS_KEYS:
+            if key not in databricks:
+                errors.append(
+                    f"environments/{name}/config.yml: databricks missing required key: {key}")
+    return errors
+
+def compile_snapshot(config_path="parameters.yml", environments_dir="environments",
+                     snapshot_path=_MISSING):
+    """Parse and validate every config source, then write them as one JSON snapshot.
+
+    The snapshot goes to default_snapshot_path() unless snapshot_path is
+    given; None compiles in memory only. Secret placeholders are stored
+    unresolved; secrets never reach the snapshot.
+    """
+    manifest = source_manifest(config_path, environments_dir)
+    parameters = load_yaml(config_path)
+    environments = {name: load_yaml(path)
+                    for name, path in _environment_config_files(environments_dir).items()}
+
+    errors = validate_sources(parameters, environments)
+    if errors:
+        raise ValueError("Invalid configuration:\n  " + "\n  ".join(errors))
+
+    snapshot = {
+        "version": SNAPSHOT_VERSION,
+        "manifest": manifest,
+        "parameters": parameters,
+        "environments": environments,
+    }
+    if snapshot_path is _MISSING:
+        snapshot_path = default_snapshot_path(config_path, environments_dir)
+    if snapshot_path is None:
+        return snapshot
+    snapshot_path = Path(snapshot_path)
+    snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = snapshot_path.with_name(f"{snapshot_path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(snapshot, separators=(",", ":")))
+    os.replace(tmp_path, snapshot_path)
+    return snapshot
+
+def load_snapshot(config_path="parameters.yml", environments_dir="environments",
+                  snapshot_path=_MISSING):
+    """Return the compiled snapshot, rebuilding it if any source changed, or None if there is none.
+
+    A snapshot compiled from other sources is treated as a miss: the
+    configs are compiled in memory and the file is left alone.
+    """
+    if snapshot_path is _MISSING:
+        snapshot_path = default_snapshot_path(config_path, environments_dir)
+    try:
+        snapshot = json.loads(Path(snapshot_path).read_text())
+    except FileNotFoundError:
+        return None
+    except ValueError:
+        snapshot = None
+
+    try:
+        manifest = source_manifest(config_path, environments_dir)
+        if (snapshot and snapshot.get("version") == SNAPSHOT_VERSION
+                and snapshot.get("manifest") == manifest):
+            return snapshot
+        own_sources = not isinstance(snapshot, dict) or str(Path(config_path).resolve()) in (
+            snapshot.get("manifest") or {})
+        return compile_snapshot(config_path, environments_dir,
+                                snapshot_path if own_sources else None)
+    except (OSError, ValueError):
+        # Unreadable or invalid sources: let the YAML path report the problem
+        return None
+
+class EnvironmentConfigs(Mapping):
+    """Environment name -> config.yml contents, parsing each config only on first access"""
+
+    def __init__(self, environments_dir, snapshot=None):
+        self.environments_dir = Path(environments_dir)
+        # Callable returning the compiled snapshot or None, consulted on first access
+        self._snapshot = snapshot or (lambda: None)
+
+    def _snapshot_environments(self):
+        snapshot = self._snapshot()
+        return snapshot["environments"] if snapshot else None
+
+    def _config_file(self, environment):
+        if not isinstance(environment, str) or not environment or os.sep in environment:
+            return None
+        config_file = self.environments_dir / environment / "config.yml"
+        return config_file if config_file.is_file() else None
+
+    def __getitem__(self, environment):
+        environments = self._snapshot_environments()
+        if environments is not None:
+            return environments[environment]
+
+        config_file = self._config_file(environment)
+        if config_file is None:
+            raise KeyError(environment)
+        # load_yaml memoizes by path and mtime, so loaders share one parse per file
+        return load_yaml(config_file)
+
+    def __contains__(self, environment):
+        environments = self._snapshot_environments()
+        if environments is not None:
+            return environment in environments
+        return self._config_file(environment) is not None
+
+    def __iter__(self):
+        environments = self._snapshot_environments()
+        if environments is not None:
+            return iter(sorted(environments))
+        return iter(_environment_config_files(self.environments_dir))
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
 class ParameterLoader:
-    def __init__(self, config_path="parameters.yml", environments_dir="environments"):
+    def __init__(self, config_path="parameters.yml", environments_dir="environments",
+                 secrets_client=None, secret_cache=None, snapshot_path=_MISSING):
         self.config_path = Path(config_path)
         self.environments_dir = Path(environments_dir)
-        self.config = self._load_config()
+        if not self.config_path.exists():
+            raise FileNotFoundError(f"Configuration file not found: {self.config_path}")
+        self._snapshot_path = snapshot_path
+        self._snapshot = _MISSING
+        self._config = None
         self.env_configs = self._load_environment_configs()
+        self._secrets_client = secrets_client
+        self._secret_cache = secret_cache if secret_cache is not None else _SECRET_CACHE
+
+    @property
+    def config(self):
+        """parameters.yml contents, parsed on first access"""
+        if self._config is None:
+            snapshot = self._get_snapshot()
+            self._config = snapshot["parameters"] if snapshot else self._load_config()
+        return self._config
+
+    @property
+    def snapshot_path(self):
+        """Snapshot location, derived from the config sources on first access"""
+        if self._snapshot_path is _MISSING:
+            self._snapshot_path = default_snapshot_path(self.config_path, self.environments_dir)
+        return Path(self._snapshot_path) if self._snapshot_path else None
+
+    def _get_snapshot(self):
+        """Snapshot from `parameter_loader.py compile`, if present, checked once per loader"""
+        if self._snapshot is _MISSING:
+            self._snapshot = None
+            if self.snapshot_path is not None:
+                self._snapshot = load_snapshot(self.config_path, self.environments_dir,
+                                               self.snapshot_path)
+        return self._snapshot
 
     def _load_config(self):
         """Load YAML configuration file"""
         if not self.config_path.exists():
             raise FileNotFoundError(f"Configuration file not found: {self.config_path}")
 
-        with open(self.config_path, 'r') as f:
-            return yaml.safe_load(f)
+        return load_yaml(self.config_path)
 
     def _load_environment_configs(self):
         """Load environment-specific configurations from environments folder"""
-        env_configs = {}
-        
-        if not self.environments_dir.exists():
-            return env_configs
-            
-        for env_dir in self.environments_dir.iterdir():
-            if env_dir.is_dir():
-                config_file = env_dir / "config.yml"
-                if config_file.exists():
-                    with open(config_file, 'r') as f:
-                        env_configs[env_dir.name] = yaml.safe_load(f)
-                        
-        return env_configs
+        return EnvironmentConfigs(self.environments_dir, snapshot=self._get_snapshot)
+
+    def _get_secrets_client(self):
+        """Create the Secrets Manager client once and reuse it for every fetch"""
+        if self._secrets_client is None:
+            # Imported here so runs that never fetch a secret skip the boto3 import cost
+            import boto3
+            self._secrets_client = boto3.Session().client('secretsmanager')
+        return self._secrets_client
+
+    def _fetch_secrets(self, secret_names):
+        """Fetch uncached secrets with BatchGetSecretValue, or concurrent GetSecretValue calls"""
+        missing = sorted({name for name in secret_names
+                          if self._secret_cache.get(name, _MISSING) is _MISSING})
+        if not missing:
+            return
+
+        try:
+            client = self._get_secrets_client()
+        except Exception:
+            for name in missing:
+                self._secret_cache.put(name, None)
+            return
+
+        fetched = {}
+        try:
+            for start in range(0, len(missing), SECRET_BATCH_SIZE):
+                request = {'SecretIdList': missing[start:start + SECRET_BATCH_SIZE]}
+                while True:
+                    response = client.batch_get_secret_value(**request)
+                    for secret in response.get('SecretValues', []):
+                        fetched[secret['Name']] = json.loads(secret['SecretString'])
+                    if not response.get('NextToken'):
+                        break
+                    request['NextToken'] = response['NextToken']
+        except Exception:
+            # Older botocore or no batch permission: fetch the rest one by one
+            pass
+
+        remaining = [name for name in missing if name not in fetched]
+        if remaining:
+            def fetch_one(name):
+                try:
+                    response = client.get_secret_value(SecretId=name)
+                    return name, json.loads(response['SecretString'])
+                except Exception:
+                    return name, None
+
+            with ThreadPoolExecutor(max_workers=min(8, len(remaining))) as executor:
+                fetched.update(executor.map(fetch_one, remaining))
+
+        for name in missing:
+            # Failures are cached briefly so an unreachable Secrets Manager is not retried per value
+            self._secret_cache.put(name, fetched.get(name))
+
+    def _prefetch_secrets(self, values):
+        """Fetch every secret referenced by the given values in one batch"""
+        names = {name for value in values if isinstance(value, str)
+                 for name, _ in SECRET_PATTERN.findall(value)}
+        self._fetch_secrets(names)
 
     def _get_secret(self, secret_name, key):
         """Retrieve secret from AWS Secrets Manager with fallback to hardcoded values"""
@@ -46,48 +340,44 @@ def _get_secret(self, secret_name, key):
             'databricks-sandbox-credentials': {
                 'host': 'https://dbc-0c2248b3-6656.cloud.databricks.com',
                 'client_id': '111986ad-4fc6-45b4-9469-e7c7c581cbb6',
-                'client_secret': 'dose9b72dea76c379efe05c765be4c9bde18',
+                # Never hardcoded: local runs export it from .env (see .env.template)
+                'client_secret': os.getenv('DATABRICKS_CLIENT_SECRET_SANDBOX'),
                 'service_principal_id': '111986ad-4fc6-45b4-9469-e7c7c581cbb6'
             }
         }
-        
-        try:
-            session = boto3.Session()
-            client = session.client('secretsmanager')
-            
-            response = client.get_secret_value(SecretId=secret_name)
-            secret_dict = json.loads(response['SecretString'])
-            
+
+        self._fetch_secrets([secret_name])
+        secret_dict = self._secret_cache.get(secret_name)
+        if secret_dict is not None:
             return secret_dict.get(key, f"SECRET_NOT_FOUND:{key}")
-        except Exception:
-            # Use fallback for sandbox
-            if secret_name in fallback_secrets:
-                return fallback_secrets[secret_name].get(key, f"FALLBACK_NOT_FOUND:{key}")
-            return f"SECRET_ERROR:{key}"
+
+        # Use fallback for sandbox
+        if secret_name in fallback_secrets:
+            value = fallback_secrets[secret_name].get(key)
+            return value if value is not None else f"FALLBACK_NOT_FOUND:{key}"
+        return f"SECRET_ERROR:{key}"
 
     def _resolve_env_vars(self, value):
         """Resolve environment variables and secrets in string values"""
-        if isinstance(value, str):
-            # Replace ${SECRET:secret_name:key} with AWS Secrets Manager values
-            secret_pattern = r'\$\{SECRET:([^:]+):([^}]+)\}'
-            secret_matches = re.findall(secret_pattern, value)
-            
-            for secret_name, key in secret_matches:
-                secret_value = self._get_secret(secret_name, key)
-                value = value.replace(f"${{SECRET:{secret_name}:{key}}}", secret_value)
-            
-            # Replace ${VAR_NAME} with environment variable values
-            env_pattern = r'\$\{([^}]+)\}'
-            env_matches = re.findall(env_pattern, value)
-
-            for match in env_matches:
-                env_value = os.getenv(match, f"${{{match}}}")  # Keep placeholder if not found
-                value = value.replace(f"${{{match}}}", env_value)
+        if isinstance(value, str) and '${' in value:
+            value = PLACEHOLDER_PATTERN.sub(self._substitute_placeholder, value)
 
         return value
 
+    def _substitute_placeholder(self, match):
+        secret_name, key, env_name = match.groups()
+        if secret_name is not None:
+            # Replace ${SECRET:secret_name:key} with AWS Secrets Manager values
+            return self._get_secret(secret_name, key)
+        # Replace ${VAR_NAME} with environment variable values, keeping the placeholder if not found
+        return os.getenv(env_name, match.group(0))
+
     def get_databricks_config(self, environment="sandbox"):
-        """Get Databricks configuration for specified environment"""
+        """Get Databricks configuration for specified environment.
+
+        Not memoized: secrets come from the shared SecretCache on every call,
+        so a rotated secret is picked up once its TTL passes.
+        """
         # Try environment-specific folder first
         if environment in self.env_configs:
             env_config = self.env_configs[environment]["databricks"]
@@ -96,7 +386,8 @@ def get_databricks_config(self, environment="sandbox"):
         else:
             raise ValueError(f"Environment '{environment}' not found in configuration")
 
-        # Resolve environment variables
+        # Resolve environment variables, fetching all referenced secrets up front
+        self._prefetch_secrets(env_config.values())
         resolved_config = {}
         for key, value in env_config.items():
             resolved_config[key] = self._resolve_env_vars(value)
@@ -146,8 +437,33 @@ def get_sub_environments(self, environment):
             return self.env_configs[environment].get("sub_environments", [])
         return []
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load and resolve parameters")
+    subparsers = parser.add_subparsers(dest="command")
+    compile_parser = subparsers.add_parser("compile", help="Write a pre-validated config snapshot")
+    compile_parser.add_argument("--config", default="parameters.yml", help="Path to parameters.yml")
+    compile_parser.add_argument("--environments-dir", default="environments",
+                                help="Environment configs directory")
+    compile_parser.add_argument("--output",
+                                help=f"Snapshot path (default: {SNAPSHOT_DIR}/"
+                                     "parameters.<hash>.snapshot.json beside --config, "
+                                     "keyed on both sources)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """Example usage"""
+    args = parse_args(argv)
+
+    if args.command == "compile":
+        output = args.output or default_snapshot_path(args.config, args.environments_dir)
+        try:
+            snapshot = compile_snapshot(args.config, args.environments_dir, output)
+        except ValueError as e:
+            print(e)
+            sys.exit(1)
+        print(f"Wrote {output} ({len(snapshot['environments'])} environments)")
+        return
+
     loader = ParameterLoader()
 
     # Get Databricks config for sandbox
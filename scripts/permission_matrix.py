@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""Compile bundle grants and bundle and environment permissions into an indexed permission matrix"""
+
+import argparse
+import sys
+from collections import namedtuple
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scripts.bundle_model import discover_bundles
+from scripts.bundle_references import resolve_target
+
+# Keys naming the principal of a `permissions` entry
+PRINCIPAL_KEYS = ('group_name', 'user_name', 'service_principal_name')
+# Securable of the permissions in environments/*/config.yml, applied to every deployment in the
+# environment
+ENVIRONMENT_SECURABLE = 'environment'
+
+Grant = namedtuple('Grant', ['principal', 'target', 'securable', 'privilege'])
+
+
+def _permission_principal(entry):
+    for key in PRINCIPAL_KEYS:
+        if entry.get(key):
+            return str(entry[key])
+    return None
+
+
+def _resource_name(resource):
+    parts = [resource.get(field) for field in ('catalog_name', 'schema_name', 'name')]
+    return '.'.join(str(part) for part in parts if part) or None
+
+
+def bundle_grants(bundle, target):
+    """Yield (Grant, securable display name) for one interpolated bundle target.
+
+    Bundle-level `permissions` apply to every resource the bundle deploys and
+    are recorded against the bundle itself; resource `permissions` levels and
+    Unity Catalog `grants` privileges are recorded against the resource, as
+    `<bundle>.<resource type>.<key>` so the same resource lines up across targets.
+    """
+    config, _ = resolve_target(bundle, target)
+    for entry in config.get('permissions') or []:
+        principal = _permission_principal(entry or {})
+        if principal and entry.get('level'):
+            yield Grant(principal, target, bundle.name, str(entry['level'])), bundle.name
+
+    for resource_type, resources in sorted((config.get('resources') or {}).items()):
+        for key, resource in sorted((resources or {}).items()):
+            if not isinstance(resource, dict):
+                continue
+            securable = f"{bundle.name}.{resource_type}.{key}"
+            name = _resource_name(resource) if 'grants' in resource else resource.get('name')
+            for entry in resource.get('permissions') or []:
+                principal = _permission_principal(entry or {})
+                if principal and entry.get('level'):
+                    yield Grant(principal, target, securable, str(entry['level'])), name
+            for entry in resource.get('grants') or []:
+                principal = (entry or {}).get('principal')
+                if not principal:
+                    continue
+                for privilege in entry.get('privileges') or []:
+                    yield Grant(str(principal), target, securable, str(privilege)), name
+
+
+def environment_grants(loader, environments=None):
+    """Yield the Grant for each permission in environments/*/config.yml"""
+    for environment in sorted(loader.env_configs if environments is None else environments):
+        for entry in loader.get_environment_permissions(environment) or []:
+            principal = _permission_principal(entry or {})
+            if principal and entry.get('level'):
+                yield Grant(principal, environment, ENVIRONMENT_SECURABLE, str(entry['level']))
+
+
+class PermissionMatrix:
+    """Inverted indexes over (principal, target, securable, privilege) grants.
+
+    Every lookup is a dict or set probe: principal -> target -> grants,
+    (target, securable) -> privilege -> principals, and the grant set itself
+    for membership checks, so query cost does not grow with the matrix.
+    """
+
+    def __init__(self, grants=(), names=None):
+        self.grants = set()
+        self.names = dict(names or {})
+        self.by_principal = {}
+        self.by_securable = {}
+        self.by_target = {}
+        for grant in grants:
+            self.add(grant)
+
+    def add(self, grant, name=None):
+        if name and (grant.target, grant.securable) not in self.names:
+            self.names[grant.target, grant.securable] = name
+        if grant in self.grants:
+            return
+        self.grants.add(grant)
+        principal, target, securable, privilege = grant
+        self.by_principal.setdefault(principal, {}).setdefault(target, set()).add(
+            (securable, privilege))
+        self.by_securable.setdefault((target, securable), {}).setdefault(privilege, set()).add(
+            principal)
+        self.by_target.setdefault(target, set()).add(grant)
+
+    def __len__(self):
+        return len(self.grants)
+
+    @property
+    def targets(self):
+        return sorted(self.by_target)
+
+    def has(self, principal, target, securable, privilege):
+        return Grant(principal, target, securable, privilege) in self.grants
+
+    def grants_for(self, principal, target=None):
+        """Return {target: {(securable, privilege)}} for a principal, or one target's set"""
+        targets = self.by_principal.get(principal, {})
+        if target is not None:
+            return targets.get(target, set())
+        return targets
+
+    def principals_for(self, target, securable, privilege=None):
+        """Return the principals holding privilege (any privilege when None) on a securable"""
+        privileges = self.by_securable.get((target, securable), {})
+        if privilege is not None:
+            return privileges.get(privilege, set())
+        return set().union(*privileges.values())
+
+    def bulk_grants(self, principals, targets=None):
+        """Return {principal: {target: {(securable, privilege)}}} for many principals in one call"""
+        return {principal: {target: grants for target, grants in self.grants_for(principal).items()
+                            if not targets or target in targets}
+                for principal in principals}
+
+    def bulk_has(self, queries):
+        """Return a bool for each (principal, target, securable, privilege) query"""
+        grants = self.grants
+        return [Grant(*query) in grants for query in queries]
+
+    def diff(self, target, other):
+        """Return ({(principal, securable, privilege)} only in target, same only in other)"""
+        left, right = ({(grant.principal, grant.securable, grant.privilege)
+                        for grant in self.by_target.get(name, ())}
+                       for name in (target, other))
+        return left - right, right - left
+
+
+def compile_matrix(bundles, loader=None, targets=None):
+    """Build the matrix from every bundle target and, given a ParameterLoader, every environment"""
+    matrix = PermissionMatrix()
+    for bundle in bundles:
+        for target in sorted(bundle.targets) or ['default']:
+            if targets and target not in targets:
+                continue
+            for grant, name in bundle_grants(bundle, target):
+                matrix.add(grant, name)
+    if loader is not None:
+        environments = [environment for environment in loader.env_configs
+                        if not targets or environment in targets]
+        for grant in environment_grants(loader, environments):
+            matrix.add(grant)
+    return matrix
+
+
+def format_grant(matrix, target, securable, privilege):
+    name = matrix.names.get((target, securable))
+    label = f"{securable} ({name})" if name and name != securable else securable
+    return f"{target}: {label} {privilege}"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Query effective permissions across bundles and environments")
+    parser.add_argument('--bundles-dir', default='bundles', help="Directory containing the bundles")
+    parser.add_argument('--config', default='parameters.yml', help="Path to parameters.yml")
+    parser.add_argument('--environments-dir', default='environments',
+                        help="Environment configs directory")
+    parser.add_argument('--target', action='append', dest='targets', metavar='TARGET',
+                        help="Only include this target (repeatable)")
+    query = parser.add_mutually_exclusive_group(required=True)
+    query.add_argument('--principal', action='append', dest='principals', metavar='NAME',
+                       help="List what this principal can do (repeatable)")
+    query.add_argument('--securable', metavar='NAME',
+                       help="List who holds privileges on this securable, "
+                            "e.g. drs__infra.schemas.raw_schema")
+    query.add_argument('--diff', nargs=2, metavar=('TARGET', 'OTHER'),
+                       help="Compare the grants of two targets")
+    return parser.parse_args(argv)
+
+
+def main(argv=None, loader=None):
+    args = parse_args(argv)
+    if loader is None:
+        from scripts.parameter_loader import ParameterLoader
+        loader = ParameterLoader(args.config, args.environments_dir)
+    targets = set(args.diff) if args.diff else args.targets
+    matrix = compile_matrix(discover_bundles(args.bundles_dir), loader, targets)
+
+    if args.principals:
+        for principal, by_target in matrix.bulk_grants(args.principals, args.targets).items():
+            print(f"{principal}:")
+            for target, grants in sorted(by_target.items()):
+                for securable, privilege in sorted(grants):
+                    print(f"  {format_grant(matrix, target, securable, privilege)}")
+            if not by_target:
+                print("  no grants")
+    elif args.securable:
+        for target in matrix.targets:
+            privileges = matrix.by_securable.get((target, args.securable), {})
+            for privilege, principals in sorted(privileges.items()):
+                print(f"{target}: {privilege} {', '.join(sorted(principals))}")
+    else:
+        target, other = args.diff
+        only_target, only_other = matrix.diff(target, other)
+        for marker, grants in (('-', only_target), ('+', only_other)):
+            for principal, securable, privilege in sorted(grants):
+                print(f"{marker} {principal} {securable} {privilege}")
+        if only_target or only_other:
+            sys.exit(1)
+        print(f"No permission differences between {target} and {other}")
+
+if __name__ == "__main__":
+    main()
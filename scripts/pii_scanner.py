@@ -1,52 +1,627 @@
 #!/usr/bin/env python3
 """PII Scanner for Databricks Asset Bundles"""
 
+import argparse
+import hashlib
+import json
+import math
+import os
 import re
 import sys
-import yaml
+import time
+from bisect import bisect_left
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from fnmatch import fnmatch
+from itertools import chain
+from functools import lru_cache, partial
 from pathlib import Path
 
+# Declared in requirements.txt and the pii-scan hook; the Counter fallback
+# only covers running the script outside those environments
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scripts.git_diff import added_lines, changed_files
+from scripts.notebook_stream import NOTEBOOK_PATTERNS, iter_cells
+from scripts.repo_index import get_index, walk
+from scripts.scan_cache import DEFAULT_CACHE_PATH, ScanCache, rules_fingerprint
+from scripts.scan_report import (DEFAULT_SLOWEST, REPORT_FORMATS, Profiler, cprofile_to,
+                                 json_report, sarif_report, write_report)
+
 PII_PATTERNS = {
     'email': r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
     'ssn': r'\b\d{3}-\d{2}-\d{4}\b',
     'phone': r'\b\d{3}-\d{3}-\d{4}\b',
     'credit_card': r'\b\d{4}[\s-]?\d{4}[\s-]?\d{4}[\s-]?\d{4}\b',
     'aws_key': r'AKIA[0-9A-Z]{16}',
-    'private_key': r'-----BEGIN (RSA )?PRIVATE KEY-----'
+    'private_key': r'-----BEGIN (RSA )?PRIVATE KEY-----',
+    # Databricks OAuth secrets are `dose` and 32 lowercase hex digits, too
+    # regular for the entropy rule
+    'databricks_secret': r'\bdose[0-9a-f]{32}\b',
 }
 
-def scan_file(file_path):
-    """Scan file for PII patterns"""
-    violations = []
+# Literals a file must contain before the matching rule can fire. Rules
+# without an entry are always part of the combined pattern.
+PII_PREFILTERS = {
+    'email': '@',
+    'ssn': '-',
+    'phone': '-',
+    'aws_key': 'AKIA',
+    'private_key': '-----BEGIN',
+    'databricks_secret': 'dose',
+}
+
+# Candidate tokens for the high-entropy secret rule. Kept out of PII_PATTERNS
+# because a candidate is only reported once its entropy clears the threshold
+# for its character set; absolute paths and dotted names are not candidates,
+# and `_` and `-` end a candidate so snake_case and kebab-case names split
+# into short words.
+ENTROPY_RULE = 'high_entropy'
+ENTROPY_CANDIDATE = r'(?<![A-Za-z0-9+/.])(?!/)[A-Za-z0-9+/]{20,}={0,2}(?![A-Za-z0-9+/.=])'
+# Bits per character, as detect-secrets uses for its hex and base64 detectors
+ENTROPY_THRESHOLDS = {'hex': 3.0, 'base64': 4.5}
+# Findings reported redacted, which the allowlist pragma can suppress
+SECRET_RULES = {ENTROPY_RULE, 'databricks_secret'}
+ALLOWLIST_PRAGMA = 'pragma: allowlist secret'
+
+RULE_PATTERNS = {**PII_PATTERNS, ENTROPY_RULE: ENTROPY_CANDIDATE}
+
+# Accepted findings, stored as fingerprints so the baseline never repeats the matched text
+DEFAULT_BASELINE_PATH = Path('.pii-baseline.json')
+BASELINE_VERSION = 1
+
+# Paths skipped when walking a tree with --root
+EXCLUDE_DIRS = {'.git', 'node_modules', 'tests', 'fixtures', '__pycache__', '.databricks', '.cache'}
+EXCLUDE_FILES = {'*.lock', '*.lock.hcl', 'uv.lock', '*.parquet', '*.exe', '*.dll', '*.bin',
+                 '*.png', '*.jpg', '*.jpeg', '*.gif', '*.whl', '*.zip', '.secrets.baseline',
+                 DEFAULT_BASELINE_PATH.name}
+
+# Files are read CHUNK_SIZE characters at a time; the last CHUNK_OVERLAP
+# characters are carried into the next chunk so boundary-spanning hits are found
+CHUNK_SIZE = 4 * 1024 * 1024
+CHUNK_OVERLAP = 4096
+
+# Files whose changes alter the findings of unchanged files (rules, notebook cell extraction,
+# accepted findings) and so force a full scan in --since/--staged mode
+RULE_FILES = {'scripts/pii_scanner.py', 'scripts/notebook_stream.py',
+              DEFAULT_BASELINE_PATH.as_posix()}
+
+# SARIF rule descriptions
+PII_RULE_DESCRIPTIONS = {
+    'email': 'Email address',
+    'ssn': 'US Social Security number',
+    'phone': 'US phone number',
+    'credit_card': 'Payment card number',
+    'aws_key': 'AWS access key id',
+    'private_key': 'PEM private key',
+    'databricks_secret': 'Databricks OAuth client secret',
+    ENTROPY_RULE: 'High-entropy string that looks like a secret',
+}
+NOTEBOOK_LOCATION = re.compile(r'^cell (\d+):(?:output:)?(\d+)$')
+
+_PREFILTERS = {name: re.compile(re.escape(literal), re.IGNORECASE)
+               for name, literal in PII_PREFILTERS.items()}
+_ENTROPY = re.compile(f'(?P<{ENTROPY_RULE}>{ENTROPY_CANDIDATE})')
+_NEWLINE = re.compile('\n')
+_HEX_TOKEN = re.compile(r'^[0-9a-fA-F]+$')
+_HAS_DIGIT = re.compile(r'\d')
+_HAS_LETTER = re.compile(r'[A-Za-z]')
+_HAS_UPPER = re.compile(r'[A-Z]')
+_HAS_LOWER = re.compile(r'[a-z]')
+
+
+@lru_cache(maxsize=None)
+def compile_rules(rule_names=tuple(PII_PATTERNS)):
+    """Compile the given PII rules into one alternation of named groups"""
+    alternation = '|'.join(f'(?P<{name}>{PII_PATTERNS[name]})' for name in rule_names)
+    return re.compile(alternation, re.IGNORECASE)
+
+
+def active_rules(content):
+    """Return the rules whose literal anchors occur in content"""
+    return tuple(name for name in RULE_PATTERNS
+                 if name not in _PREFILTERS or _PREFILTERS[name].search(content))
+
+
+def shannon_entropy(tokens):
+    """Return the Shannon entropy in bits per character of each ASCII token, in one batch"""
+    if not tokens:
+        return []
+    if numpy is None:
+        entropies = []
+        for token in tokens:
+            length = len(token)
+            entropies.append(-sum(count / length * math.log2(count / length)
+                                  for count in Counter(token).values()))
+        return entropies
+
+    # One byte histogram per token: bincount over (token index * 256 + byte)
+    lengths = numpy.fromiter(map(len, tokens), dtype=numpy.int64, count=len(tokens))
+    data = numpy.frombuffer(''.join(tokens).encode('ascii'), dtype=numpy.uint8)
+    owners = numpy.repeat(numpy.arange(len(tokens), dtype=numpy.int64), lengths)
+    counts = numpy.bincount(owners * 256 + data, minlength=len(tokens) * 256)
+    # Only the non-zero histogram cells contribute; sum them back per token
+    cells = counts.nonzero()[0]
+    rows = cells // 256
+    probabilities = counts[cells] / lengths[rows]
+    terms = probabilities * numpy.log2(probabilities)
+    return (-numpy.bincount(rows, weights=terms, minlength=len(tokens))).tolist()
+
+
+def token_charset(token):
+    """Return 'hex' or 'base64' for a secret candidate, or None if it cannot be a secret"""
+    # Identifiers and plain numbers lack the character mix of generated secrets
+    if _HEX_TOKEN.match(token):
+        return 'hex' if _HAS_DIGIT.search(token) and _HAS_LETTER.search(token) else None
+    if _HAS_DIGIT.search(token) and _HAS_UPPER.search(token) and _HAS_LOWER.search(token):
+        return 'base64'
+    return None
+
+
+def _allowlisted(content, offset):
+    start = content.rfind('\n', 0, offset) + 1
+    end = content.find('\n', offset)
+    return ALLOWLIST_PRAGMA in content[start:end if end != -1 else len(content)]
+
+
+def filter_secrets(candidates, content):
+    """Return the high-entropy candidates above their charset threshold and not allowlisted"""
+    scored = []
+    for match in candidates:
+        token = match.group().rstrip('=')
+        charset = token_charset(token)
+        if charset:
+            scored.append((match, token, charset))
+    entropies = shannon_entropy([token for _, token, _ in scored])
+    return [match for (match, _, charset), entropy in zip(scored, entropies)
+            if entropy >= ENTROPY_THRESHOLDS[charset] and not _allowlisted(content, match.start())]
+
+
+def _outside(matches, candidates):
+    """Drop candidates overlapping a PII match; matches are sorted and do not overlap each other"""
+    starts = [match.start() for match in matches]
+    kept = []
+    for candidate in candidates:
+        i = bisect_left(starts, candidate.end()) - 1
+        if i < 0 or matches[i].end() <= candidate.start():
+            kept.append(candidate)
+    return kept
+
+
+def finding_text(match):
+    """Return the reported text of a match; secrets are redacted to a prefix and a short hash"""
+    text = match.group()
+    if match.lastgroup not in SECRET_RULES:
+        return text
+    return f"{text[:4]}... (sha256 {hashlib.sha256(text.encode('utf-8')).hexdigest()[:12]})"
+
+
+def _scan(content, rules, pos=0, limit=None):
+    """Return (kept matches starting in [pos, limit), end of the last PII match seen).
+
+    The PII rules share one alternation; secret candidates are found in a
+    separate pass so a long token cannot swallow a PII match inside it, and
+    candidates overlapping a PII match are dropped in its favour.
+    """
+    limit = len(content) if limit is None else limit
+    matches = []
+    last_end = pos
+    pii_rules = tuple(name for name in rules if name != ENTROPY_RULE)
+    if pii_rules:
+        for match in compile_rules(pii_rules).finditer(content, pos):
+            if match.start() >= limit:
+                break
+            matches.append(match)
+            last_end = match.end()
+        matches = [match for match in matches if match.lastgroup not in SECRET_RULES
+                   or not _allowlisted(content, match.start())]
+    if ENTROPY_RULE in rules:
+        candidates = []
+        for match in _ENTROPY.finditer(content, pos):
+            if match.start() >= limit:
+                break
+            candidates.append(match)
+        secrets = filter_secrets(_outside(matches, candidates), content) if candidates else []
+        if secrets:
+            matches = sorted(matches + secrets, key=lambda match: match.start())
+    return matches, last_end
+
+
+class LineIndex:
+    """Map string offsets to 1-based line numbers with a precomputed newline index"""
+
+    def __init__(self, content):
+        self.newlines = [m.start() for m in _NEWLINE.finditer(content)]
+
+    def line_of(self, offset):
+        return bisect_left(self.newlines, offset) + 1
+
+
+def iter_findings(content):
+    """Yield (pii_type, line_num, match) for every PII hit in content, in offset order"""
+    rules = active_rules(content)
+    if not rules:
+        return
+
+    matches, _ = _scan(content, rules)
+    if not matches:
+        return
+    lines = LineIndex(content)
+    for match in matches:
+        yield match.lastgroup, lines.line_of(match.start()), finding_text(match)
+
+
+def iter_file_findings(file_path, chunk_size=CHUNK_SIZE, overlap=CHUNK_OVERLAP):
+    """Yield (pii_type, line_num, match) for a file read in overlapping chunks"""
+    if chunk_size <= overlap:
+        raise ValueError("chunk_size must be larger than overlap")
+
+    with open(file_path, 'r', encoding='utf-8') as f:
+        buffer = ''
+        pos = 0
+        line_base = 0
+
+        while True:
+            chunk = f.read(chunk_size)
+            buffer += chunk
+            eof = len(chunk) < chunk_size
+            # Hits starting at or after limit may run past the buffer; defer them
+            limit = len(buffer) if eof else len(buffer) - overlap
+            last_end = pos
+
+            rules = active_rules(buffer)
+            if rules:
+                matches, last_end = _scan(buffer, rules, pos, limit)
+                lines = LineIndex(buffer) if matches else None
+                for match in matches:
+                    line_num = line_base + lines.line_of(match.start())
+                    yield match.lastgroup, line_num, finding_text(match)
+
+            if eof:
+                return
+
+            # Keep one character before the carried region so \b sees its real neighbour
+            cut = limit - 1
+            line_base += buffer.count('\n', 0, cut)
+            pos = max(limit, last_end) - cut
+            buffer = buffer[cut:]
+
+
+def is_notebook(file_path):
+    return any(fnmatch(Path(file_path).name, pattern) for pattern in NOTEBOOK_PATTERNS)
+
+
+def iter_notebook_findings(file_path, outputs=False):
+    """Yield (pii_type, location, match) for notebook cell text, located as 'cell N:line'.
 
+    Only cell sources (and text outputs when outputs is True) are read;
+    metadata and image outputs are skipped while streaming.
+    """
+    for cell_index, kind, text in iter_cells(file_path, outputs):
+        prefix = f"cell {cell_index}:" if kind == 'source' else f"cell {cell_index}:output:"
+        for pii_type, line_num, match in iter_findings(text):
+            yield pii_type, f"{prefix}{line_num}", match
+
+
+def find_pii(file_path, notebook_outputs=False):
+    """Return [(pii_type, line_num, match)] for a file, or None if it could not be scanned"""
     try:
+        if is_notebook(file_path):
+            return list(iter_notebook_findings(file_path, notebook_outputs))
+        return list(iter_file_findings(file_path))
+    except Exception as e:
+        print(f"Error scanning {file_path}: {e}", file=sys.stderr)
+        return None
+
+
+def profile_pii(file_path, notebook_outputs=False):
+    """Return (findings, stats) for a file, timing the scan and then each rule on its own"""
+    started = time.perf_counter()
+    findings = find_pii(file_path, notebook_outputs)
+    seconds = time.perf_counter() - started
+    if findings is None:
+        return None, None
+
+    if is_notebook(file_path):
+        content = '\n'.join(text for _, _, text in iter_cells(file_path, notebook_outputs))
+    else:
         with open(file_path, 'r', encoding='utf-8') as f:
             content = f.read()
 
-        for pii_type, pattern in PII_PATTERNS.items():
-            matches = re.finditer(pattern, content, re.IGNORECASE)
-            for match in matches:
-                line_num = content[:match.start()].count('\n') + 1
-                violations.append(f"{file_path}:{line_num} - {pii_type}: {match.group()}")
+    rules = {}
+    for name in RULE_PATTERNS:
+        rule_started = time.perf_counter()
+        # A rejected prefilter is the whole cost of a rule on this file
+        if name in _PREFILTERS and not _PREFILTERS[name].search(content):
+            matches = 0
+        else:
+            matches = len(_scan(content, (name,))[0])
+        rules[name] = (time.perf_counter() - rule_started, matches)
 
-    except Exception as e:
-        print(f"Error scanning {file_path}: {e}")
+    stats = {'path': str(file_path), 'bytes': os.path.getsize(file_path), 'seconds': seconds,
+             'rules': rules}
+    return findings, stats
+
+
+def format_violation(file_path, finding):
+    pii_type, line_num, text = finding
+    return f"{file_path}:{line_num} - {pii_type}: {text}"
+
+
+def scan_file(file_path):
+    """Scan file for PII patterns"""
+    return [format_violation(file_path, finding) for finding in find_pii(file_path) or []]
+
+
+def is_excluded(file_path, exclude_dirs=EXCLUDE_DIRS, exclude_files=EXCLUDE_FILES):
+    """Return True if any directory of a relative path or its name is excluded"""
+    *dirs, name = Path(file_path).parts
+    return (any(fnmatch(part, pattern) for part in dirs for pattern in exclude_dirs)
+            or any(fnmatch(name, pattern) for pattern in exclude_files))
+
+
+def iter_files(root, exclude_dirs=EXCLUDE_DIRS, exclude_files=EXCLUDE_FILES):
+    """Walk root with os.scandir, yielding non-excluded file paths in sorted order"""
+    return walk(root, exclude_dirs, exclude_files)
+
+
+def _map_find_pii(paths, jobs, notebook_outputs=False, profile=False):
+    scan = partial(profile_pii if profile else find_pii, notebook_outputs=notebook_outputs)
+    if jobs <= 1 or len(paths) <= 1:
+        yield from map(scan, paths)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        yield from executor.map(scan, paths, chunksize=8)
+
+
+def scan_paths(paths, jobs=1, cache=None, notebook_outputs=False, profiler=None):
+    """Yield (file_path, findings) in input order, replaying cached results and
+    scanning the rest in a process pool when jobs > 1. With a profiler, per-file
+    and per-rule timings are added to it as files are scanned."""
+    paths = list(paths)
+    cached = {}
+    if cache is not None:
+        for file_path in paths:
+            findings = cache.get(file_path)
+            if findings is not None:
+                cached[file_path] = [tuple(finding) for finding in findings]
+
+    fresh = _map_find_pii([p for p in paths if p not in cached], jobs, notebook_outputs,
+                          profiler is not None)
+    for file_path in paths:
+        if file_path in cached:
+            yield file_path, cached[file_path]
+            continue
+
+        findings = next(fresh)
+        if profiler is not None:
+            findings, stats = findings
+            if stats:
+                profiler.merge(stats)
+        if findings is None:
+            continue
+        if cache is not None:
+            cache.put(file_path, findings)
+        yield file_path, findings
+
+
+def scan_added_lines(hunks):
+    """Yield (file_path, findings) for only the added lines of each changed file"""
+    for file_path, blocks in sorted(hunks.items()):
+        findings = []
+        for first_line, lines in blocks:
+            for pii_type, line_num, text in iter_findings('\n'.join(lines)):
+                findings.append((pii_type, first_line + line_num - 1, text))
+        yield file_path, findings
+
+
+def open_cache(cache_path=DEFAULT_CACHE_PATH, notebook_outputs=False):
+    """Open the PII namespace of the scan cache, invalidated whenever the rules change"""
+    namespace = 'pii+outputs' if notebook_outputs else 'pii'
+    fingerprint = rules_fingerprint(RULE_PATTERNS, PII_PREFILTERS, ENTROPY_THRESHOLDS,
+                                    ALLOWLIST_PRAGMA, SECRET_RULES)
+    return ScanCache(namespace, fingerprint, cache_path)
+
+
+def baseline_path_key(file_path, base_dir):
+    """Return file_path relative to the baseline's directory, so fingerprints ignore the cwd"""
+    return Path(os.path.relpath(os.path.abspath(file_path), base_dir)).as_posix()
+
+
+def finding_fingerprint(path_key, pii_type, text):
+    """Fingerprint a finding by rule, normalized match and path; the line number is left out
+    so accepted findings stay suppressed when the file is edited around them"""
+    normalized = ''.join(text.split()).lower()
+    return hashlib.sha256(f"{pii_type}\0{normalized}\0{path_key}".encode('utf-8')).hexdigest()
+
+
+def load_baseline(baseline_path=DEFAULT_BASELINE_PATH):
+    """Return the set of accepted fingerprints; a missing baseline accepts nothing"""
+    try:
+        with open(baseline_path, encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return set()
+    if data.get('version') != BASELINE_VERSION:
+        raise ValueError(f"{baseline_path}: unsupported baseline version {data.get('version')!r}")
+    return {entry['fingerprint'] for entry in data['findings']}
+
+
+def write_baseline(baseline_path, entries):
+    """Write (fingerprint, path_key, pii_type) entries sorted by path so diffs stay reviewable"""
+    findings = [{'path': path_key, 'rule': pii_type, 'fingerprint': fingerprint}
+                for fingerprint, path_key, pii_type
+                in sorted(set(entries), key=lambda e: (e[1], e[2], e[0]))]
+    data = {'version': BASELINE_VERSION, 'findings': findings}
+    Path(baseline_path).write_text(json.dumps(data, indent=2) + "\n")
+    return len(findings)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Scan files for PII patterns")
+    parser.add_argument('paths', nargs='*', help="Files to scan")
+    parser.add_argument('--root', metavar='DIR',
+                        help="Walk DIR and scan every file that is not excluded")
+    parser.add_argument('--exclude', action='append', default=[], metavar='PATTERN',
+                        help="Extra directory or file name pattern to skip with --root")
+    parser.add_argument('--jobs', '-j', type=int, default=1, metavar='N',
+                        help="Number of worker processes (default: 1)")
+    parser.add_argument('--since', metavar='REF',
+                        help="Only scan lines added since the git ref REF")
+    parser.add_argument('--staged', action='store_true',
+                        help="Only scan lines added in the git index")
+    parser.add_argument('--cache', default=str(DEFAULT_CACHE_PATH), metavar='PATH',
+                        help=f"Result cache location (default: {DEFAULT_CACHE_PATH})")
+    parser.add_argument('--no-cache', action='store_true', help="Rescan every file")
+    parser.add_argument('--notebook-outputs', action='store_true',
+                        help="Also scan text outputs of .ipynb notebooks, not just cell sources")
+    parser.add_argument('--format', choices=REPORT_FORMATS, default='text',
+                        help="Report format (default: text)")
+    parser.add_argument('--output', metavar='FILE',
+                        help="Write the json/sarif report to FILE instead of stdout")
+    parser.add_argument('--profile', action='store_true',
+                        help="Report time and matches per rule and the slowest files on stderr "
+                             "(bypasses the cache)")
+    parser.add_argument('--slowest', type=int, default=DEFAULT_SLOWEST, metavar='N',
+                        help=f"Files listed by --profile (default: {DEFAULT_SLOWEST})")
+    parser.add_argument('--cprofile', metavar='FILE',
+                        help="Write cProfile stats for the run to FILE")
+    parser.add_argument('--baseline', default=str(DEFAULT_BASELINE_PATH), metavar='PATH',
+                        help="Fingerprints of accepted findings to suppress "
+                             f"(default: {DEFAULT_BASELINE_PATH})")
+    parser.add_argument('--update-baseline', action='store_true',
+                        help="Accept every current finding by rewriting the baseline, then exit 0")
+    args = parser.parse_args(argv)
+    if args.update_baseline and (args.since or args.staged):
+        parser.error("--update-baseline needs a full scan; "
+                     "it cannot be combined with --since or --staged")
+    return args
+
+
+def _diff_results(args, exclude_dirs, exclude_files):
+    """Return (file_path, findings) pairs for --since/--staged, or None if a full scan is due"""
+    # Any change counts, including one that only deletes lines
+    if RULE_FILES & set(changed_files(args.since, args.staged)):
+        print("PII rules changed; scanning the full tree", file=sys.stderr)
+        return None
+
+    hunks = added_lines(args.since, args.staged)
+
+    if args.paths:
+        wanted = {Path(p).as_posix() for p in args.paths}
+        hunks = {path: blocks for path, blocks in hunks.items() if path in wanted}
+    hunks = {path: blocks for path, blocks in hunks.items()
+             if not is_excluded(path, exclude_dirs, exclude_files)}
+    # Added JSON lines say nothing about cells, so changed notebooks are rescanned whole
+    notebooks = [path for path in hunks if is_notebook(path)]
+    text_hunks = {path: blocks for path, blocks in hunks.items() if path not in notebooks}
+    return chain(scan_paths(notebooks, notebook_outputs=args.notebook_outputs),
+                 scan_added_lines(text_hunks))
+
+
+def finding_result(file_path, finding):
+    """Return a finding as a report result dict; notebook findings carry their cell index and are
+    located by cell, since their line counts from the top of the cell"""
+    pii_type, line_num, text = finding
+    result = {'path': str(file_path), 'line': line_num, 'rule': pii_type,
+              'message': f"Possible {PII_RULE_DESCRIPTIONS.get(pii_type, pii_type)}", 'match': text}
+    notebook = NOTEBOOK_LOCATION.match(line_num) if isinstance(line_num, str) else None
+    if notebook:
+        result['line'] = int(notebook.group(2))
+        result['properties'] = {'cell': int(notebook.group(1)), 'location': line_num}
+        result['logical_location'] = {'name': f"cell {notebook.group(1)}",
+                                      'fullyQualifiedName': line_num}
+    return result
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    with cprofile_to(args.cprofile):
+        _run(args)
+
+
+def _run(args):
+    exclude_dirs = EXCLUDE_DIRS | set(args.exclude)
+    exclude_files = EXCLUDE_FILES | set(args.exclude)
+    profiler = Profiler() if args.profile else None
+
+    paths = list(args.paths)
+    root = args.root
+    results = None
+    if args.since or args.staged:
+        results = _diff_results(args, exclude_dirs, exclude_files)
+        if results is None:
+            paths, root = [], '.'
+
+    cache = None
+    if results is None:
+        if root:
+            paths.extend(get_index(root).paths(exclude_dirs=exclude_dirs,
+                                               exclude_files=exclude_files))
+        cache = None if args.no_cache or profiler else open_cache(args.cache, args.notebook_outputs)
+        results = scan_paths(paths, args.jobs, cache, args.notebook_outputs, profiler)
+
+    base_dir = os.path.dirname(os.path.abspath(args.baseline))
+    baseline = set() if args.update_baseline else load_baseline(args.baseline)
+    accepted = []
+    suppressed = 0
+    found = False
+    report = []
+    try:
+        for file_path, findings in results:
+            if args.update_baseline or baseline:
+                path_key = baseline_path_key(file_path, base_dir)
+                fingerprints = [finding_fingerprint(path_key, pii_type, text)
+                                for pii_type, _, text in findings]
+                if args.update_baseline:
+                    accepted.extend((fingerprint, path_key, finding[0])
+                                    for fingerprint, finding in zip(fingerprints, findings))
+                    continue
+                kept = [finding for fingerprint, finding in zip(fingerprints, findings)
+                        if fingerprint not in baseline]
+                suppressed += len(findings) - len(kept)
+                findings = kept
+            if args.format != 'text':
+                report.extend(finding_result(file_path, finding) for finding in findings)
+                found = found or bool(findings)
+                continue
+            for finding in findings:
+                if not found:
+                    print("PII VIOLATIONS FOUND:")
+                    found = True
+                print(f"  {format_violation(file_path, finding)}")
+            if findings:
+                sys.stdout.flush()
+    finally:
+        if cache is not None:
+            cache.close()
 
-    return violations
+    if profiler is not None:
+        print("\n".join(profiler.format(args.slowest)), file=sys.stderr)
 
-def main():
-    violations = []
+    if args.update_baseline:
+        count = write_baseline(args.baseline, accepted)
+        print(f"Wrote {count} accepted findings to {args.baseline}")
+        return
+    if suppressed:
+        print(f"{suppressed} findings suppressed by {args.baseline}", file=sys.stderr)
 
-    for file_path in sys.argv[1:]:
-        violations.extend(scan_file(file_path))
+    if args.format == 'json':
+        write_report(json_report('pii-scanner', report), args.output)
+    elif args.format == 'sarif':
+        write_report(sarif_report('pii-scanner', PII_RULE_DESCRIPTIONS, report), args.output)
 
-    if violations:
-        print("PII VIOLATIONS FOUND:")
-        for violation in violations:
-            print(f"  {violation}")
+    if found:
         sys.exit(1)
 
-    print("No PII violations found")
+    if args.format == 'text':
+        print("No PII violations found")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""One-walk index of the repository: classified paths plus cached bytes and parsed YAML"""
+
+import argparse
+import os
+import threading
+from collections import OrderedDict
+from fnmatch import fnmatch
+from pathlib import Path
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+# Directories never worth indexing
+INDEX_EXCLUDE_DIRS = {'.git', '__pycache__', '.cache', '.pytest_cache', 'node_modules',
+                      '.databricks'}
+
+# (kind, patterns on the root-relative posix path); the first match wins. In
+# fnmatch `*` also matches `/`, so `bundles/*.yml` covers nested files.
+FILE_KINDS = [
+    ('bundle_root', ['databricks.yml', '*/databricks.yml']),
+    ('schema', ['*.schema.yml', '*.schema.yaml']),
+    ('volume', ['*.volume.yml', '*.volume.yaml']),
+    ('job', ['*.job.yml', '*.job.yaml', '*/jobs/*.yml', '*/jobs/*.yaml']),
+    ('environment_config', ['environments/*/config.yml']),
+    ('parameters', ['parameters.yml']),
+    ('notebook', ['*.ipynb']),
+    ('bundle_config', ['bundles/*.yml', 'bundles/*.yaml']),
+    ('yaml', ['*.yml', '*.yaml']),
+    ('python', ['*.py']),
+]
+
+# Kinds parsed as Databricks bundle YAML
+BUNDLE_KINDS = ('bundle_root', 'schema', 'volume', 'job', 'bundle_config')
+
+# Bounds of the shared caches, so a resident process (check_daemon.py) does
+# not keep every file it has ever read
+BYTES_CACHE_MAX_ENTRIES = 2048
+BYTES_CACHE_MAX_BYTES = 64 * 1024 * 1024
+YAML_CACHE_MAX_ENTRIES = 2048
+
+
+class LRUCache(OrderedDict):
+    """Mapping that drops its least recently used entries beyond max_entries or, when size
+    (a function of a value) is given, beyond max_bytes in total"""
+
+    def __init__(self, max_entries, max_bytes=None, size=None):
+        super().__init__()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = size or (lambda value: 0)
+        self.total = 0
+        self._lock = threading.RLock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self:
+                return default
+            self.move_to_end(key)
+            return self[key]
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            if key in self:
+                self.total -= self.size(self[key])
+            super().__setitem__(key, value)
+            self.move_to_end(key)
+            self.total += self.size(value)
+            while len(self) > self.max_entries or (
+                    self.max_bytes is not None and self.total > self.max_bytes and len(self) > 1):
+                _, evicted = self.popitem(last=False)
+                self.total -= self.size(evicted)
+
+    def clear(self):
+        with self._lock:
+            super().clear()
+            self.total = 0
+
+
+# path -> ((mtime_ns, size), bytes)
+_BYTES_CACHE = LRUCache(BYTES_CACHE_MAX_ENTRIES, BYTES_CACHE_MAX_BYTES,
+                        size=lambda entry: len(entry[1]))
+# path -> ((mtime_ns, size), parsed data)
+_YAML_CACHE = LRUCache(YAML_CACHE_MAX_ENTRIES)
+# absolute root -> RepoIndex
+_INDEXES = {}
+
+
+def _signature(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def read_bytes(path):
+    """Return a file's bytes, read once per (path, mtime, size) and shared across callers"""
+    key = os.path.abspath(path)
+    signature = _signature(key)
+    cached = _BYTES_CACHE.get(key)
+    if cached and cached[0] == signature:
+        return cached[1]
+
+    with open(key, 'rb') as f:
+        data = f.read()
+    _BYTES_CACHE[key] = (signature, data)
+    return data
+
+
+def _copy(data):
+    """Copy the containers of safe-loaded YAML; scalars are immutable and shared"""
+    if isinstance(data, dict):
+        return {key: _copy(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [_copy(value) for value in data]
+    if isinstance(data, set):
+        return set(data)
+    return data
+
+
+def load_yaml(path):
+    """Parse a YAML file once per (path, mtime), using the C loader when available.
+
+    Each caller gets its own copy of the parsed data, so mutating it cannot
+    corrupt the process-wide cache; copying costs a fraction of a parse.
+    """
+    key = os.path.abspath(path)
+    signature = _signature(key)
+    cached = _YAML_CACHE.get(key)
+    if cached and cached[0] == signature:
+        return _copy(cached[1])
+
+    data = yaml.load(read_bytes(key), Loader=SafeLoader)
+    _YAML_CACHE[key] = (signature, data)
+    return _copy(data)
+
+
+def classify(rel_path):
+    """Return the kind of a root-relative path"""
+    rel_path = Path(rel_path).as_posix()
+    for kind, patterns in FILE_KINDS:
+        if any(fnmatch(rel_path, pattern) for pattern in patterns):
+            return kind
+    return 'other'
+
+
+def walk(root, exclude_dirs=INDEX_EXCLUDE_DIRS, exclude_files=()):
+    """Walk root with os.scandir, yielding non-excluded file paths in sorted order"""
+    with os.scandir(root) as it:
+        entries = sorted(it, key=lambda entry: entry.name)
+
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            if not any(fnmatch(entry.name, pattern) for pattern in exclude_dirs):
+                yield from walk(entry.path, exclude_dirs, exclude_files)
+        elif entry.is_file(follow_symlinks=False):
+            if not any(fnmatch(entry.name, pattern) for pattern in exclude_files):
+                yield entry.path
+
+
+class RepoIndex:
+    """Every file under root, walked once and classified by kind.
+
+    Paths are reported as the walk produced them (root joined with the
+    relative path), so output matches a plain os.scandir walk of root.
+    """
+
+    def __init__(self, root='.', exclude_dirs=INDEX_EXCLUDE_DIRS):
+        self.root = str(root)
+        self.entries = []
+        for path in walk(self.root, exclude_dirs):
+            rel_path = Path(os.path.relpath(path, self.root)).as_posix()
+            self.entries.append((path, rel_path, classify(rel_path)))
+
+    def paths(self, kinds=None, exclude_dirs=(), exclude_files=(), under=None):
+        """Return indexed paths, filtered by kind, by relative directory and by excludes"""
+        if isinstance(kinds, str):
+            kinds = (kinds,)
+        prefix = f"{Path(under).as_posix().rstrip('/')}/" if under else ''
+        selected = []
+        for path, rel_path, kind in self.entries:
+            if kinds and kind not in kinds:
+                continue
+            if prefix and not rel_path.startswith(prefix):
+                continue
+            *dirs, name = rel_path.split('/')
+            if any(fnmatch(part, pattern) for part in dirs for pattern in exclude_dirs):
+                continue
+            if any(fnmatch(name, pattern) for pattern in exclude_files):
+                continue
+            selected.append(path)
+        return selected
+
+    def kinds(self):
+        """Return {kind: count} for the indexed files"""
+        counts = {}
+        for _, _, kind in self.entries:
+            counts[kind] = counts.get(kind, 0) + 1
+        return counts
+
+    def read_bytes(self, path):
+        return read_bytes(path)
+
+    def read_text(self, path, errors='strict'):
+        return read_bytes(path).decode('utf-8', errors)
+
+    def load_yaml(self, path):
+        return load_yaml(path)
+
+
+def get_index(root='.', refresh=False):
+    """Return the process-wide index of root, walking it only on first use or when refresh is set"""
+    key = os.path.abspath(root)
+    if refresh or key not in _INDEXES:
+        _INDEXES[key] = RepoIndex(root)
+    return _INDEXES[key]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="List repository files by kind")
+    parser.add_argument('--root', default='.', help="Directory to index")
+    parser.add_argument('--kind', action='append', dest='kinds', metavar='KIND',
+                        help="Only list files of this kind (repeatable)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    index = get_index(args.root)
+    if args.kinds:
+        for path in index.paths(args.kinds):
+            print(path)
+        return
+
+    for kind, count in sorted(index.kinds().items()):
+        print(f"{kind}: {count}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""Content-hash cache for scanner and validator results"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+DEFAULT_CACHE_PATH = Path('.cache') / 'scan-cache.sqlite3'
+DEFAULT_MAX_ENTRIES = 20000
+
+# Bump when the stored payload format changes
+CACHE_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    namespace TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    namespace TEXT NOT NULL,
+    path TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    PRIMARY KEY (namespace, path)
+);
+CREATE TABLE IF NOT EXISTS results (
+    namespace TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    accessed INTEGER NOT NULL,
+    PRIMARY KEY (namespace, digest)
+);
+"""
+
+
+def rules_fingerprint(*rules):
+    """Return a stable hash of the rule definitions a cached result depends on"""
+    blob = json.dumps([CACHE_VERSION, rules], sort_keys=True, default=sorted)
+    return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+
+def file_digest(file_path):
+    """Return the sha256 of a file's content"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ScanCache:
+    """Per-file results keyed on content hash and a rule-set fingerprint.
+
+    Files whose (mtime, size) match the last run are looked up without being
+    read; otherwise the content is hashed, so touched-but-unchanged files still
+    hit. A changed fingerprint drops every entry in the namespace, and the
+    least recently used results are evicted beyond max_entries.
+    """
+
+    def __init__(self, namespace, fingerprint, path=DEFAULT_CACHE_PATH,
+                 max_entries=DEFAULT_MAX_ENTRIES):
+        self.namespace = namespace
+        self.fingerprint = fingerprint
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(path), timeout=30)
+        self.db.executescript(_SCHEMA)
+        self._invalidate_if_rules_changed()
+
+        self._files = {
+            row[0]: row[1:]
+            for row in self.db.execute(
+                "SELECT path, mtime_ns, size, digest FROM files WHERE namespace = ?", (namespace,))
+        }
+        self._results = dict(self.db.execute(
+            "SELECT digest, payload FROM results WHERE namespace = ?", (namespace,)))
+        self._digests = {}
+        self._touched = set()
+        self._new_files = []
+        self._new_results = []
+
+    def _invalidate_if_rules_changed(self):
+        row = self.db.execute("SELECT fingerprint FROM meta WHERE namespace = ?",
+                              (self.namespace,)).fetchone()
+        if row and row[0] == self.fingerprint:
+            return
+        with self.db:
+            self.db.execute("DELETE FROM files WHERE namespace = ?", (self.namespace,))
+            self.db.execute("DELETE FROM results WHERE namespace = ?", (self.namespace,))
+            self.db.execute("INSERT OR REPLACE INTO meta (namespace, fingerprint) VALUES (?, ?)",
+                            (self.namespace, self.fingerprint))
+
+    def get(self, file_path):
+        """Return the cached payload for a file, or None if it must be rescanned"""
+        key = str(file_path)
+        try:
+            stat = os.stat(key)
+        except OSError:
+            return None
+
+        known = self._files.get(key)
+        if known and known[0] == stat.st_mtime_ns and known[1] == stat.st_size:
+            digest = known[2]
+        else:
+            try:
+                digest = file_digest(key)
+            except OSError:
+                return None
+            self._new_files.append((self.namespace, key, stat.st_mtime_ns, stat.st_size, digest))
+        self._digests[key] = digest
+
+        payload = self._results.get(digest)
+        if payload is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._touched.add(digest)
+        return json.loads(payload)
+
+    def put(self, file_path, payload):
+        """Store the payload for a file previously passed to get()"""
+        digest = self._digests.get(str(file_path))
+        if digest is None:
+            return
+        encoded = json.dumps(payload)
+        self._results[digest] = encoded
+        self._new_results.append((self.namespace, digest, encoded, time.time_ns()))
+
+    def close(self):
+        """Persist new entries, refresh access times and evict the oldest results"""
+        now = time.time_ns()
+        with self.db:
+            self.db.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)",
+                                self._new_files)
+            self.db.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                                self._new_results)
+            self.db.executemany(
+                "UPDATE results SET accessed = ? WHERE namespace = ? AND digest = ?",
+                [(now, self.namespace, digest) for digest in self._touched])
+            self._evict()
+        self.db.close()
+
+    def _evict(self):
+        count = self.db.execute("SELECT COUNT(*) FROM results WHERE namespace = ?",
+                                (self.namespace,)).fetchone()[0]
+        excess = count - self.max_entries
+        if excess <= 0:
+            return
+        self.db.execute(
+            "DELETE FROM results WHERE namespace = ? AND digest IN ("
+            " SELECT digest FROM results WHERE namespace = ? ORDER BY accessed LIMIT ?)",
+            (self.namespace, self.namespace, excess))
+        self.db.execute(
+            "DELETE FROM files WHERE namespace = ? AND digest NOT IN ("
+            " SELECT digest FROM results WHERE namespace = ?)",
+            (self.namespace, self.namespace))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""Profiling counters and JSON/SARIF reports shared by the scanner and the validator"""
+
+import cProfile
+import json
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+REPORT_FORMATS = ['text', 'json', 'sarif']
+DEFAULT_SLOWEST = 10
+
+SARIF_SCHEMA = 'https://json.schemastore.org/sarif-2.1.0.json'
+SARIF_VERSION = '2.1.0'
+
+
+class Profiler:
+    """Time and match counts per rule plus bytes and seconds per file.
+
+    Only created when --profile is given; the default code paths never
+    touch it, so disabled profiling costs nothing.
+    """
+
+    def __init__(self):
+        self.rules = {}
+        self.files = []
+
+    def add_rule(self, name, seconds, matches=0):
+        totals = self.rules.setdefault(name, [0.0, 0])
+        totals[0] += seconds
+        totals[1] += matches
+
+    def add_file(self, file_path, size, seconds):
+        self.files.append((str(file_path), size, seconds))
+
+    def merge(self, stats):
+        """Add the stats dict produced for one file, possibly in a worker process"""
+        for name, (seconds, matches) in stats['rules'].items():
+            self.add_rule(name, seconds, matches)
+        self.add_file(stats['path'], stats['bytes'], stats['seconds'])
+
+    def format(self, slowest=DEFAULT_SLOWEST):
+        total_bytes = sum(size for _, size, _ in self.files)
+        total_seconds = sum(seconds for _, _, seconds in self.files)
+        lines = [f"PROFILE: {len(self.files)} files, {total_bytes} bytes in {total_seconds:.3f}s "
+                 f"({_rate(total_bytes, total_seconds)})"]
+
+        lines.append("  Rules (seconds, matches):")
+        for name, (seconds, matches) in sorted(self.rules.items(), key=lambda item: -item[1][0]):
+            lines.append(f"    {name}: {seconds:.4f}s, {matches} matches")
+
+        lines.append(f"  Slowest {min(slowest, len(self.files))} files:")
+        for file_path, size, seconds in sorted(self.files, key=lambda item: -item[2])[:slowest]:
+            lines.append(f"    {file_path}: {seconds:.4f}s, {size} bytes ({_rate(size, seconds)})")
+        return lines
+
+
+def _rate(size, seconds):
+    if seconds <= 0:
+        return "n/a"
+    rate = size / seconds
+    for unit in ['B/s', 'KB/s', 'MB/s']:
+        if rate < 1024:
+            return f"{rate:.1f} {unit}"
+        rate /= 1024
+    return f"{rate:.1f} GB/s"
+
+
+@contextmanager
+def cprofile_to(output_path):
+    """Run the block under cProfile and dump pstats to output_path; a no-op without output_path"""
+    if not output_path:
+        yield
+        return
+
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        profile.dump_stats(output_path)
+        print(f"cProfile stats written to {output_path}", file=sys.stderr)
+
+
+def _uri(file_path):
+    return Path(file_path).as_posix().removeprefix('./')
+
+
+def json_report(tool, results):
+    """Return results ({path, line, column, rule, message}) as a JSON document"""
+    return json.dumps({'tool': tool, 'results': results}, indent=2)
+
+
+def sarif_report(tool, rules, results):
+    """Return results as a SARIF 2.1.0 log; rules maps rule id -> short description.
+
+    A result with a logical_location (a SARIF logicalLocation dict, e.g. a
+    notebook cell) is located by it alone: its line is not a file line, so
+    no region is emitted.
+    """
+    sarif_results = []
+    for result in results:
+        location = {'artifactLocation': {'uri': _uri(result['path'])}}
+        line = result.get('line')
+        if isinstance(line, int) and line > 0 and not result.get('logical_location'):
+            location['region'] = {'startLine': line}
+            if isinstance(result.get('column'), int) and result['column'] > 0:
+                location['region']['startColumn'] = result['column']
+        sarif_result = {
+            'ruleId': result['rule'],
+            'level': 'error',
+            'message': {'text': result['message']},
+            'locations': [{'physicalLocation': location}],
+        }
+        if result.get('logical_location'):
+            sarif_result['locations'][0]['logicalLocations'] = [result['logical_location']]
+        if result.get('properties'):
+            sarif_result['properties'] = result['properties']
+        sarif_results.append(sarif_result)
+
+    log = {
+        '$schema': SARIF_SCHEMA,
+        'version': SARIF_VERSION,
+        'runs': [{
+            'tool': {'driver': {
+                'name': tool,
+                'rules': [{'id': rule_id, 'shortDescription': {'text': description}}
+                          for rule_id, description in sorted(rules.items())],
+            }},
+            'results': sarif_results,
+        }],
+    }
+    return json.dumps(log, indent=2)
+
+
+def write_report(text, output_path=None):
+    """Write a report to output_path, or stdout when it is None"""
+    if output_path:
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        Path(output_path).write_text(text + "\n")
+    else:
+        print(text)
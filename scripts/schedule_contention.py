@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""Find job schedules that fire together across bundles and suggest staggered offsets"""
+
+import argparse
+import calendar
+import sys
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scripts.bundle_model import discover_bundles
+from scripts.bundle_references import resolve_target
+
+DEFAULT_HORIZON_DAYS = 7
+DEFAULT_BUCKET_MINUTES = 5
+# Runs allowed to share a bucket before it is reported
+DEFAULT_THRESHOLD = 2
+DEFAULT_MAX_OFFSET_MINUTES = 60
+
+MONTH_NAMES = {name: number for number, name in enumerate(
+    ['JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC'], 1)}
+# Quartz numbers days of the week from Sunday = 1
+DAY_NAMES = {name: number
+             for number, name in enumerate(['SUN', 'MON', 'TUE', 'WED', 'THU', 'FRI', 'SAT'], 1)}
+
+
+def _number(text, names):
+    return names[text.upper()] if text.upper() in names else int(text)
+
+
+def _parse_values(text, low, high, names=None):
+    """Return the set of values of a comma list of *, n, a-b and x/step items"""
+    names = names or {}
+    values = set()
+    for item in text.split(','):
+        spec, slash, step = item.partition('/')
+        step = int(step) if step else 1
+        if step < 1:
+            raise ValueError(f"invalid step in '{item}'")
+        if spec in ('*', '?'):
+            start, stop = low, high
+        elif '-' in spec:
+            start, stop = (_number(part, names) for part in spec.split('-', 1))
+        else:
+            start = _number(spec, names)
+            # `5/15` runs from 5 to the end of the range
+            stop = high if slash else start
+        if not low <= start <= high or not low <= stop <= high:
+            raise ValueError(f"'{item}' is outside {low}-{high}")
+        if start <= stop:
+            values.update(range(start, stop + 1, step))
+        else:
+            # Wrapping ranges such as FRI-MON or 22-2
+            span = high - low + 1
+            values.update(low + (value - low) % span
+                          for value in range(start, stop + span + 1, step))
+    return values
+
+
+def _quartz_weekday(day):
+    return (day.weekday() + 1) % 7 + 1
+
+
+class CronExpression:
+    """A parsed Quartz cron expression: seconds minutes hours day-of-month month day-of-week [year].
+
+    Fire times are enumerated from the field sets, one calendar day at a
+    time, so the cost is proportional to days in the horizon plus fires
+    rather than to the minutes or seconds it spans.
+    """
+
+    def __init__(self, expression):
+        self.expression = expression
+        fields = expression.split()
+        if len(fields) not in (6, 7):
+            raise ValueError(f"expected 6 or 7 fields, found {len(fields)}")
+        fields += ['*'] * (7 - len(fields))
+        second, minute, hour, day_of_month, month, day_of_week, year = fields
+
+        self.seconds = sorted(_parse_values(second, 0, 59))
+        self.minutes = sorted(_parse_values(minute, 0, 59))
+        self.hours = sorted(_parse_values(hour, 0, 23))
+        self.months = _parse_values(month, 1, 12, MONTH_NAMES)
+        self.years = _parse_values(year, 1970, 2099)
+
+        if (day_of_month == '?') == (day_of_week == '?'):
+            raise ValueError("exactly one of day-of-month and day-of-week must be '?'")
+        self.day_of_month = None if day_of_month == '?' else day_of_month.upper()
+        self.day_of_week = None if day_of_week == '?' else day_of_week.upper()
+        # Validate the day fields up front rather than on the first matching month
+        self._month_days(2024, 2)
+        self._days_cache = {}
+
+    def _month_days(self, year, month):
+        """Return the days of one month on which the expression fires"""
+        last = calendar.monthrange(year, month)[1]
+        days = set()
+        if self.day_of_month is not None:
+            for item in self.day_of_month.split(','):
+                if item == 'LW':
+                    days.add(self._nearest_weekday(year, month, last, last))
+                elif item == 'L' or item.startswith('L-'):
+                    days.add(last - int(item[2:] or 0))
+                elif item.endswith('W'):
+                    days.add(self._nearest_weekday(year, month, min(int(item[:-1]), last), last))
+                else:
+                    days.update(day for day in _parse_values(item, 1, 31) if day <= last)
+            return days
+
+        first_weekday = _quartz_weekday(datetime(year, month, 1))
+        for item in self.day_of_week.split(','):
+            if '#' in item:
+                weekday, nth = item.split('#')
+                day = 1 + (_number(weekday, DAY_NAMES) - first_weekday) % 7 + (int(nth) - 1) * 7
+                if day <= last:
+                    days.add(day)
+            elif item.endswith('L') and item != 'L':
+                weekday = _number(item[:-1], DAY_NAMES)
+                last_weekday = _quartz_weekday(datetime(year, month, last))
+                days.add(last - (last_weekday - weekday) % 7)
+            else:
+                weekdays = _parse_values('7' if item == 'L' else item, 1, 7, DAY_NAMES)
+                days.update(day for day in range(1, last + 1)
+                            if (first_weekday + day - 2) % 7 + 1 in weekdays)
+        return days
+
+    @staticmethod
+    def _nearest_weekday(year, month, day, last):
+        """Quartz W: the weekday nearest to day without leaving the month"""
+        weekday = _quartz_weekday(datetime(year, month, day))
+        if weekday == 7:
+            return day - 1 if day > 1 else day + 2
+        if weekday == 1:
+            return day + 1 if day < last else day - 2
+        return day
+
+    def days(self, year, month):
+        key = (year, month)
+        if key not in self._days_cache:
+            self._days_cache[key] = self._month_days(year, month)
+        return self._days_cache[key]
+
+    def fire_times(self, start, end, tz=timezone.utc):
+        """Yield the UTC datetimes in [start, end) at which the expression fires in timezone tz"""
+        day = start.astimezone(tz).date()
+        last_day = end.astimezone(tz).date()
+        while day <= last_day:
+            if (day.year in self.years and day.month in self.months
+                    and day.day in self.days(day.year, day.month)):
+                for hour in self.hours:
+                    for minute in self.minutes:
+                        for second in self.seconds:
+                            fire = datetime(day.year, day.month, day.day, hour, minute, second,
+                                            tzinfo=tz).astimezone(timezone.utc)
+                            if start <= fire < end:
+                                yield fire
+            day += timedelta(days=1)
+
+
+def shift_expression(expression, offset_seconds):
+    """Return expression moved later by offset_seconds, or None unless it fires daily at one time"""
+    fields = expression.split()
+    if not all(field.isdigit() for field in fields[:3]):
+        return None
+    second, minute, hour = (int(field) for field in fields[:3])
+    total = hour * 3600 + minute * 60 + second + offset_seconds
+    if total >= 24 * 3600:
+        return None
+    return ' '.join([str(total % 60), str(total // 60 % 60), str(total // 3600), *fields[3:]])
+
+
+class ScheduledJob:
+    """One job schedule of one bundle target"""
+
+    def __init__(self, bundle, key, job, source):
+        schedule = job.get('schedule') or {}
+        self.bundle = bundle
+        self.key = key
+        self.name = job.get('name', key)
+        self.expression = str(schedule.get('quartz_cron_expression', ''))
+        self.timezone = schedule.get('timezone_id') or 'UTC'
+        self.paused = schedule.get('pause_status') == 'PAUSED'
+        self.source = str(source)
+
+    @property
+    def id(self):
+        return f"{self.bundle}/{self.key}"
+
+
+def scheduled_jobs(bundles, targets=None):
+    """Return {target: [ScheduledJob]} for every job with a cron schedule, after interpolation"""
+    jobs = {}
+    for bundle in bundles:
+        for target in sorted(bundle.targets) or ['default']:
+            if targets and target not in targets:
+                continue
+            config, _ = resolve_target(bundle, target)
+            for key, job in sorted(((config.get('resources') or {}).get('jobs') or {}).items()):
+                schedule = job.get('schedule') if isinstance(job, dict) else None
+                if (schedule or {}).get('quartz_cron_expression'):
+                    source = bundle.sources.get(('jobs', key), bundle.root_file)
+                    jobs.setdefault(target, []).append(ScheduledJob(bundle.name, key, job, source))
+    return jobs
+
+
+def _occupied(fires, offset, bucket, duration):
+    """Return {bucket index: runs} for fire epochs shifted by offset; runs last duration seconds"""
+    buckets = Counter()
+    for fire in fires:
+        start = fire + offset
+        for index in range(start // bucket, (start + max(duration, 1) - 1) // bucket + 1):
+            buckets[index] += 1
+    return buckets
+
+
+def build_histogram(fires, bucket, duration=0):
+    """Return ({bucket index: runs}, {bucket index: job ids}) for {job id: [fire epochs]}"""
+    runs = Counter()
+    jobs = {}
+    for job_id, job_fires in fires.items():
+        for index, count in _occupied(job_fires, 0, bucket, duration).items():
+            runs[index] += count
+            jobs.setdefault(index, set()).add(job_id)
+    return runs, jobs
+
+
+def hot_windows(runs, jobs, threshold):
+    """Merge consecutive buckets above threshold into (first, last, peak runs, job ids) windows"""
+    windows = []
+    for index in sorted(index for index, count in runs.items() if count > threshold):
+        if windows and windows[-1][1] == index - 1:
+            first, _, peak, window_jobs = windows[-1]
+            windows[-1] = (first, index, max(peak, runs[index]), window_jobs | jobs[index])
+        else:
+            windows.append((index, index, runs[index], set(jobs[index])))
+    return windows
+
+
+def suggest_staggers(fires, bucket, duration, threshold, max_offset):
+    """Return {job id: offset seconds} placing jobs first-fit so no bucket exceeds threshold.
+
+    Jobs are placed in id order; each takes the smallest offset, in whole
+    buckets up to max_offset, at which none of its runs lands in a full
+    bucket. Jobs that fit unshifted are left alone.
+    """
+    occupancy = Counter()
+    offsets = {}
+    for job_id in sorted(fires):
+        chosen = 0
+        for offset in range(0, max_offset + 1, bucket):
+            placed = _occupied(fires[job_id], offset, bucket, duration)
+            if all(occupancy[index] + count <= threshold for index, count in placed.items()):
+                chosen = offset
+                break
+        occupancy.update(_occupied(fires[job_id], chosen, bucket, duration))
+        if chosen:
+            offsets[job_id] = chosen
+    return offsets
+
+
+def analyze(jobs, start, end, bucket, duration, threshold, max_offset):
+    """Return (fires, windows, staggers, errors) for the scheduled jobs of one target"""
+    fires = {}
+    errors = []
+    for job in jobs:
+        if job.paused:
+            continue
+        try:
+            expression = CronExpression(job.expression)
+            tz = ZoneInfo(job.timezone)
+        except (ValueError, ZoneInfoNotFoundError) as e:
+            errors.append(f"{job.source}: job '{job.key}' schedule '{job.expression}' "
+                          f"({job.timezone}): {e}")
+            continue
+        fires[job.id] = [int(fire.timestamp()) for fire in expression.fire_times(start, end, tz)]
+
+    runs, bucket_jobs = build_histogram(fires, bucket, duration)
+    windows = hot_windows(runs, bucket_jobs, threshold)
+    staggers = suggest_staggers(fires, bucket, duration, threshold, max_offset) if windows else {}
+    return fires, windows, staggers, errors
+
+
+def _utc(index, bucket):
+    return datetime.fromtimestamp(index * bucket, timezone.utc).strftime('%Y-%m-%d %H:%M')
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Report job schedules that fire together and suggest staggers")
+    parser.add_argument('--bundles-dir', default='bundles', help="Directory containing the bundles")
+    parser.add_argument('--target', action='append', dest='targets', metavar='TARGET',
+                        help="Only analyze this target (repeatable)")
+    parser.add_argument('--start', type=datetime.fromisoformat, metavar='ISO',
+                        help="Start of the horizon, UTC unless an offset is given "
+                             "(default: today 00:00 UTC)")
+    parser.add_argument('--horizon-days', type=int, default=DEFAULT_HORIZON_DAYS, metavar='N',
+                        help=f"Days of fire times to enumerate (default: {DEFAULT_HORIZON_DAYS})")
+    parser.add_argument('--bucket', type=int, default=DEFAULT_BUCKET_MINUTES, metavar='MINUTES',
+                        help=f"Histogram bucket width (default: {DEFAULT_BUCKET_MINUTES})")
+    parser.add_argument('--duration', type=int, default=0, metavar='MINUTES',
+                        help="Expected run time; runs occupy every bucket they span "
+                             "(default: the firing bucket)")
+    parser.add_argument('--threshold', type=int, default=DEFAULT_THRESHOLD, metavar='N',
+                        help="Runs allowed per bucket before it is reported "
+                             f"(default: {DEFAULT_THRESHOLD})")
+    parser.add_argument('--max-offset', type=int, default=DEFAULT_MAX_OFFSET_MINUTES,
+                        metavar='MINUTES',
+                        help=f"Largest stagger to suggest (default: {DEFAULT_MAX_OFFSET_MINUTES})")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    start = args.start or datetime.now(timezone.utc).replace(hour=0, minute=0, second=0,
+                                                             microsecond=0)
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    end = start + timedelta(days=args.horizon_days)
+    bucket = args.bucket * 60
+
+    contention = False
+    errors = []
+    targets = scheduled_jobs(discover_bundles(args.bundles_dir), args.targets)
+    for target, jobs in sorted(targets.items()):
+        fires, windows, staggers, target_errors = analyze(jobs, start, end, bucket,
+                                                          args.duration * 60, args.threshold,
+                                                          args.max_offset * 60)
+        errors.extend(target_errors)
+        print(f"Target {target}: {len(fires)} scheduled jobs, {sum(map(len, fires.values()))} runs "
+              f"in {args.horizon_days} days "
+              f"from {start.astimezone(timezone.utc):%Y-%m-%d %H:%M} UTC")
+        if not windows:
+            continue
+
+        contention = True
+        print(f"  Windows above {args.threshold} runs per {args.bucket}-minute bucket:")
+        for first, last, peak, window_jobs in windows:
+            print(f"    {_utc(first, bucket)} - {_utc(last + 1, bucket)[-5:]} UTC: {peak} runs "
+                  f"({', '.join(sorted(window_jobs))})")
+        by_id = {job.id: job for job in jobs}
+        print("  Suggested staggers:")
+        for job_id, offset in sorted(staggers.items()):
+            shifted = shift_expression(by_id[job_id].expression, offset)
+            suggestion = f" -> quartz_cron_expression: {shifted}" if shifted else ""
+            print(f"    {job_id}: +{offset // 60} min{suggestion}")
+        if not staggers:
+            print(f"    none within {args.max_offset} minutes; raise --max-offset or the threshold")
+
+    if errors:
+        print("SCHEDULE ERRORS:")
+        for error in errors:
+            print(f"  {error}")
+    if errors or contention:
+        sys.exit(1)
+
+    print("No schedule contention found")
+
+if __name__ == "__main__":
+    main()
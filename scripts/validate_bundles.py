@@ -1,81 +1,379 @@
 #!/usr/bin/env python3
 """Validate Databricks Asset Bundle configurations"""
 
+import argparse
+import os
 import sys
+import time
 import yaml
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scripts.bundle_model import discover_bundles, find_bundle_root, load_bundle, load_yaml
+from scripts.bundle_references import resolve_target
+from scripts.bundle_stream import iter_errors
+from scripts.git_diff import changed_files
+from scripts.repo_index import BUNDLE_KINDS, classify, get_index
+from scripts.scan_cache import DEFAULT_CACHE_PATH, ScanCache, rules_fingerprint
+from scripts.scan_report import (DEFAULT_SLOWEST, REPORT_FORMATS, Profiler, cprofile_to,
+                                 json_report, sarif_report, write_report)
+
 REQUIRED_BUNDLE_FIELDS = ['resources']
 REQUIRED_SCHEMA_FIELDS = ['name', 'catalog_name']
 REQUIRED_VOLUME_FIELDS = ['name', 'catalog_name', 'schema_name']
+REQUIRED_JOB_FIELDS = ['name', 'tasks']
+REQUIRED_TASK_FIELDS = ['task_key']
+REQUIRED_PIPELINE_FIELDS = ['name']
+
+# (path pattern, required fields, message) checked on every bundle file, by
+# both the parsed and the --stream validator; `*` matches any key or index
+ROOT_RULE = ((), REQUIRED_BUNDLE_FIELDS, "Missing '{field}' section")
+STRUCTURE_RULES = [
+    (('resources', 'schemas', '*'), REQUIRED_SCHEMA_FIELDS,
+     "Schema '{0}' missing required field: {field}"),
+    (('resources', 'volumes', '*'), REQUIRED_VOLUME_FIELDS,
+     "Volume '{0}' missing required field: {field}"),
+    (('resources', 'jobs', '*'), REQUIRED_JOB_FIELDS, "Job '{0}' missing required field: {field}"),
+    (('resources', 'jobs', '*', 'tasks', '*'), REQUIRED_TASK_FIELDS,
+     "Job '{0}' task {1} missing required field: {field}"),
+    (('resources', 'pipelines', '*'), REQUIRED_PIPELINE_FIELDS,
+     "Pipeline '{0}' missing required field: {field}"),
+]
+
+# Files whose changes alter the rules and so force a full run in --since/--staged mode
+RULE_FILES = {'scripts/validate_bundles.py'}
+BUNDLES_DIR = Path('bundles')
+BUNDLE_FILE_NAMES = ['databricks.yml', 'raw.schema.yml', 'raw.volume.yml']
+
+# Rule ids for json/sarif reports
+VALIDATION_RULES = {
+    'yaml-syntax': 'File is not valid YAML',
+    'missing-resources': "Bundle file has no 'resources' section",
+    'missing-required-field': 'Resource is missing a required field',
+    'overlapping-storage-location':
+        'Volume storage location duplicates or is nested in another volume location',
+    'validation-error': 'Validator failed on the file',
+}
+
+# bundle root -> (Bundle, {member path: errors}) for the most recently validated model
+_BUNDLE_ERRORS = {}
 
 def validate_yaml_syntax(file_path):
     """Validate YAML syntax"""
     try:
-        with open(file_path, 'r') as f:
-            yaml.safe_load(f)
+        load_yaml(file_path)
         return True, None
     except yaml.YAMLError as e:
         return False, f"YAML syntax error: {e}"
 
+def _rule_matches(node, pattern, captures=()):
+    """Yield (wildcard captures, node) for each parsed-config node at a STRUCTURE_RULES pattern"""
+    if not pattern:
+        yield captures, node
+        return
+    key, rest = pattern[0], pattern[1:]
+    if key != '*':
+        if isinstance(node, dict) and key in node:
+            yield from _rule_matches(node[key], rest, captures)
+        return
+    if isinstance(node, dict):
+        children = node.items()
+    else:
+        children = enumerate(node) if isinstance(node, list) else ()
+    for child_key, child in children:
+        yield from _rule_matches(child, rest, captures + (child_key,))
+
 def validate_bundle_structure(file_path, config):
     """Validate bundle structure"""
     errors = []
 
-    if 'resources' not in config:
-        errors.append("Missing 'resources' section")
+    _, fields, message = ROOT_RULE
+    for field in fields:
+        if field not in config:
+            errors.append(message.format(field=field))
+    if errors:
         return errors
 
-    resources = config['resources']
+    for pattern, fields, message in STRUCTURE_RULES:
+        for captures, node in _rule_matches(config, pattern):
+            for field in fields:
+                if field not in node:
+                    errors.append(message.format(*captures, field=field))
+
+    return errors
+
+def stream_validate(file_path, fail_fast=False):
+    """Return (line, column, message) errors from the YAML event stream, just one if fail_fast"""
+    errors = []
+    for error in iter_errors(file_path, [ROOT_RULE] + STRUCTURE_RULES):
+        errors.append(error)
+        if fail_fast:
+            break
+    return errors
+
+def normalize_location(location):
+    """Return a storage location with a single trailing slash and no repeated slashes in the path"""
+    scheme, sep, path = location.strip().partition('://')
+    if not sep:
+        scheme, path = '', scheme
+    parts = [part for part in path.split('/') if part]
+    return f"{scheme.lower()}{sep}{'/'.join(parts)}/"
+
+def volume_locations(bundles, targets=None):
+    """Return (location, owner) for every volume storage_location after interpolating each target.
+
+    Locations still holding a ${...} reference (runtime values, unresolved
+    variables) are skipped; those are reported by bundle_references.
+    """
+    locations = []
+    for bundle in bundles:
+        for target in sorted(bundle.targets) or ['default']:
+            if targets and target not in targets:
+                continue
+            config, _ = resolve_target(bundle, target)
+            for key, volume in ((config.get('resources') or {}).get('volumes') or {}).items():
+                location = (volume or {}).get('storage_location')
+                if not isinstance(location, str) or '${' in location:
+                    continue
+                full_name = '.'.join(str(volume.get(field))
+                                     for field in ('catalog_name', 'schema_name', 'name'))
+                locations.append((normalize_location(location), {
+                    'bundle': bundle.name,
+                    'target': target,
+                    'volume': key,
+                    'full_name': full_name,
+                    'file': str(bundle.sources.get(('volumes', key), bundle.root_file)),
+                }))
+    return locations
+
+def find_location_overlaps(locations):
+    """Return (location, owner, other location, other owner) for each duplicate or nested location.
+
+    Locations are sorted so every ancestor prefix precedes its descendants;
+    a stack of the current ancestor chain then finds each overlap in one
+    pass, O(n log n) overall instead of comparing every pair. The same volume
+    (catalog.schema.name) deployed by several targets to one location is
+    not an overlap.
+    """
+    overlaps = []
+    stack = []
+    for location, owner in sorted(locations, key=lambda item: item[0]):
+        while stack and not location.startswith(stack[-1][0]):
+            stack.pop()
+        for ancestor, ancestor_owner in reversed(stack):
+            if ancestor == location and ancestor_owner['full_name'] == owner['full_name']:
+                continue
+            overlaps.append((location, owner, ancestor, ancestor_owner))
+            break
+        if not (stack and stack[-1][0] == location
+                and stack[-1][1]['full_name'] == owner['full_name']):
+            stack.append((location, owner))
+    return overlaps
+
+def format_overlap(overlap):
+    location, owner, other, other_owner = overlap
+    relation = "duplicates" if location == other else "is nested in"
+    return (f"Volume '{owner['volume']}' [{owner['target']}] storage_location {location} "
+            f"{relation} {other} of {other_owner['bundle']} volume '{other_owner['volume']}' "
+            f"[{other_owner['target']}]")
 
-    # Validate schemas
-    if 'schemas' in resources:
-        for schema_name, schema_config in resources['schemas'].items():
-            for field in REQUIRED_SCHEMA_FIELDS:
-                if field not in schema_config:
-                    errors.append(f"Schema '{schema_name}' missing required field: {field}")
+def location_errors(paths):
+    """Return (file, message) for overlapping volume locations across the bundles beside paths"""
+    bundle_dirs = sorted({root.parent.parent for root in map(find_bundle_root, paths)
+                          if root is not None})
+    bundles = [bundle for bundle_dir in bundle_dirs for bundle in discover_bundles(bundle_dir)]
+    return [(overlap[1]['file'], format_overlap(overlap))
+            for overlap in find_location_overlaps(volume_locations(bundles))]
 
-    # Validate volumes
-    if 'volumes' in resources:
-        for volume_name, volume_config in resources['volumes'].items():
-            for field in REQUIRED_VOLUME_FIELDS:
-                if field not in volume_config:
-                    errors.append(f"Volume '{volume_name}' missing required field: {field}")
+def is_bundle_file(file_path):
+    return any(x in str(file_path) for x in BUNDLE_FILE_NAMES) or classify(file_path) == 'job'
 
+def _structure_errors(file_path, config):
+    try:
+        if config:
+            return validate_bundle_structure(file_path, config)
+    except Exception as e:
+        return [f"Validation error: {e}"]
+    return []
+
+def validate_bundle(bundle):
+    """Run every validator over a parsed bundle, returning {member path: errors}"""
+    errors = {}
+    for path, config in bundle.files.items():
+        if path in bundle.errors:
+            errors[path] = [bundle.errors[path]]
+        elif is_bundle_file(path):
+            errors[path] = _structure_errors(path, config)
+    return errors
+
+def validate_file(file_path):
+    """Return the validation errors for a single bundle file"""
+    root = find_bundle_root(file_path)
+    if root is not None:
+        bundle = load_bundle(root)
+        member = bundle.member_of(file_path)
+        if member is not None:
+            cached = _BUNDLE_ERRORS.get(bundle.root_file)
+            if cached is None or cached[0] is not bundle:
+                cached = _BUNDLE_ERRORS[bundle.root_file] = (bundle, validate_bundle(bundle))
+            return cached[1].get(member, [])
+
+    # Not included by any bundle: validate the file on its own
+    try:
+        config = load_yaml(file_path)
+    except yaml.YAMLError as e:
+        return [f"YAML syntax error: {e}"]
+    return _structure_errors(file_path, config)
+
+def profile_validate(file_path, profiler):
+    """Validate a file, recording parse and structure-check time separately"""
+    started = time.perf_counter()
+    root = find_bundle_root(file_path)
+    try:
+        if root is not None:
+            load_bundle(root)
+        else:
+            load_yaml(file_path)
+    except yaml.YAMLError:
+        pass
+    parsed = time.perf_counter()
+    errors = validate_file(file_path)
+    finished = time.perf_counter()
+
+    profiler.add_rule('parse', parsed - started)
+    profiler.add_rule('structure', finished - parsed, len(errors))
+    profiler.add_file(file_path, os.path.getsize(file_path), finished - started)
     return errors
 
-def main():
-    all_errors = []
+def error_rule(error):
+    """Return the report rule id for a validation error message"""
+    if error.startswith("YAML syntax error"):
+        return 'yaml-syntax'
+    if error.startswith("Missing 'resources'"):
+        return 'missing-resources'
+    if "missing required field" in error:
+        return 'missing-required-field'
+    if error.startswith("Volume '") and "storage_location" in error:
+        return 'overlapping-storage-location'
+    return 'validation-error'
+
+def open_cache(cache_path=DEFAULT_CACHE_PATH, stream=False):
+    """Open the bundle namespace of the scan cache, invalidated whenever the rules change"""
+    fingerprint = rules_fingerprint(ROOT_RULE, STRUCTURE_RULES)
+    return ScanCache('bundles-stream' if stream else 'bundles', fingerprint, cache_path)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Validate Databricks Asset Bundle configurations")
+    parser.add_argument('paths', nargs='*', help="Bundle files to validate")
+    parser.add_argument('--since', metavar='REF',
+                        help="Only validate bundle files changed since the git ref REF")
+    parser.add_argument('--staged', action='store_true',
+                        help="Only validate bundle files changed in the git index")
+    parser.add_argument('--cache', default=str(DEFAULT_CACHE_PATH), metavar='PATH',
+                        help=f"Result cache location (default: {DEFAULT_CACHE_PATH})")
+    parser.add_argument('--no-cache', action='store_true', help="Revalidate every file")
+    parser.add_argument('--format', choices=REPORT_FORMATS, default='text',
+                        help="Report format (default: text)")
+    parser.add_argument('--output', metavar='FILE',
+                        help="Write the json/sarif report to FILE instead of stdout")
+    parser.add_argument('--profile', action='store_true',
+                        help="Report parse and check time and the slowest files on stderr "
+                             "(bypasses the cache)")
+    parser.add_argument('--slowest', type=int, default=DEFAULT_SLOWEST, metavar='N',
+                        help=f"Files listed by --profile (default: {DEFAULT_SLOWEST})")
+    parser.add_argument('--cprofile', metavar='FILE',
+                        help="Write cProfile stats for the run to FILE")
+    parser.add_argument('--stream', action='store_true',
+                        help="Check each file from the YAML event stream in constant memory, "
+                             "reporting file:line:col")
+    parser.add_argument('--fail-fast', action='store_true',
+                        help="Stop at the first validation error")
+    args = parser.parse_args(argv)
+    if args.stream and args.profile:
+        parser.error("--profile cannot be combined with --stream")
+    return args
+
+def diff_paths(since=None, staged=False):
+    """Return the files to validate for a git diff, or every bundle file if the rules changed"""
+    changed = changed_files(since, staged)
+    if RULE_FILES & set(changed):
+        print("Bundle rules changed; validating all bundles", file=sys.stderr)
+        return [os.path.normpath(p) for p in get_index().paths(BUNDLE_KINDS, under=BUNDLES_DIR)]
+    return changed
+
+def main(argv=None):
+    args = parse_args(argv)
+    with cprofile_to(args.cprofile):
+        _run(args)
+
+def _run(args):
+    paths = list(args.paths)
+    if args.since or args.staged:
+        changed = diff_paths(args.since, args.staged)
+        paths = [p for p in changed if not args.paths or p in args.paths]
+
+    profiler = Profiler() if args.profile else None
+    cache = None if args.no_cache or profiler else open_cache(args.cache, args.stream)
+    results = []
+
+    try:
+        for file_path in paths:
+            # Skip non-bundle files
+            if not is_bundle_file(file_path):
+                continue
 
-    for file_path in sys.argv[1:]:
-        # Skip non-bundle files
-        if not any(x in file_path for x in ['databricks.yml', 'raw.schema.yml', 'raw.volume.yml']):
-            continue
+            errors = cache.get(file_path) if cache else None
+            if errors is None:
+                if args.stream:
+                    errors = stream_validate(file_path, args.fail_fast)
+                elif profiler:
+                    errors = profile_validate(file_path, profiler)
+                else:
+                    errors = validate_file(file_path)
+                # A streamed fail-fast result may be partial, so it is not cached
+                if cache and not (args.stream and args.fail_fast and errors):
+                    cache.put(file_path, errors)
+            if args.fail_fast:
+                errors = errors[:1]
 
-        valid, error = validate_yaml_syntax(file_path)
-        if not valid:
-            all_errors.append(f"{file_path}: {error}")
-            continue
+            for error in errors:
+                if args.stream:
+                    line, column, error = error
+                    results.append({'path': str(file_path), 'line': line, 'column': column,
+                                    'rule': error_rule(error), 'message': error})
+                else:
+                    results.append({'path': str(file_path), 'rule': error_rule(error),
+                                    'message': error})
+            if args.fail_fast and results:
+                break
+    finally:
+        if cache:
+            cache.close()
 
-        try:
-            with open(file_path, 'r') as f:
-                config = yaml.safe_load(f)
+    # Overlaps span bundles, so they are checked across the whole bundles directory, never cached
+    if not (args.fail_fast and results):
+        for file_path, error in location_errors([p for p in paths if is_bundle_file(p)]):
+            results.append({'path': file_path, 'rule': error_rule(error), 'message': error})
 
-            if config:
-                structure_errors = validate_bundle_structure(file_path, config)
-                for error in structure_errors:
-                    all_errors.append(f"{file_path}: {error}")
+    if profiler is not None:
+        print("\n".join(profiler.format(args.slowest)), file=sys.stderr)
 
-        except Exception as e:
-            all_errors.append(f"{file_path}: Validation error: {e}")
+    if args.format == 'json':
+        write_report(json_report('validate-bundles', results), args.output)
+    elif args.format == 'sarif':
+        write_report(sarif_report('validate-bundles', VALIDATION_RULES, results), args.output)
 
-    if all_errors:
-        print("BUNDLE VALIDATION ERRORS:")
-        for error in all_errors:
-            print(f"  {error}")
+    if results:
+        if args.format == 'text':
+            print("BUNDLE VALIDATION ERRORS:")
+            for result in results:
+                position = f":{result['line']}:{result['column']}" if 'line' in result else ''
+                print(f"  {result['path']}{position}: {result['message']}")
         sys.exit(1)
 
-    print("All bundles validated successfully")
+    if args.format == 'text':
+        print("All bundles validated successfully")
 
 if __name__ == "__main__":
     main()
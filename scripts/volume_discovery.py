@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""Incremental discovery of files landed in a raw volume, yielded in size-bounded batches"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+from collections import namedtuple
+from fnmatch import fnmatch
+from pathlib import Path
+
+# Bump when the checkpoint layout changes
+CHECKPOINT_VERSION = 1
+
+DEFAULT_MAX_BATCH_BYTES = 256 * 1024 * 1024
+DEFAULT_MAX_BATCH_FILES = 1000
+# Files may land with an mtime up to this far behind the newest processed file
+# (clock skew, slow uploads); only this window is kept in the manifest
+DEFAULT_LATENESS_SECONDS = 3600
+
+# Spark and writer conventions for markers and in-progress files
+IGNORED_NAMES = ('.*', '_*')
+
+LandedFile = namedtuple('LandedFile', 'path mtime_ns size')
+
+
+class Checkpoint:
+    """High-water mark plus a sorted manifest of the files processed inside the lateness window.
+
+    Files older than the horizon (watermark minus lateness) are taken as
+    processed without being listed in the manifest, so the checkpoint stays
+    proportional to the recent landing rate rather than the whole volume.
+    """
+
+    def __init__(self, watermark_ns=None, manifest=(),
+                 lateness_ns=DEFAULT_LATENESS_SECONDS * 10**9):
+        self.watermark_ns = watermark_ns
+        self.lateness_ns = lateness_ns
+        self.manifest = {LandedFile(*entry) for entry in manifest}
+
+    @property
+    def horizon_ns(self):
+        return None if self.watermark_ns is None else self.watermark_ns - self.lateness_ns
+
+    def is_new(self, landed):
+        horizon = self.horizon_ns
+        if horizon is not None and landed.mtime_ns < horizon:
+            return False
+        return landed not in self.manifest
+
+    def add(self, files):
+        """Record files as processed, advance the watermark and drop entries behind the horizon"""
+        for landed in files:
+            self.manifest.add(landed)
+            if self.watermark_ns is None or landed.mtime_ns > self.watermark_ns:
+                self.watermark_ns = landed.mtime_ns
+        horizon = self.horizon_ns
+        if horizon is not None:
+            self.manifest = {landed for landed in self.manifest if landed.mtime_ns >= horizon}
+
+    def to_dict(self):
+        return {
+            'version': CHECKPOINT_VERSION,
+            'watermark_ns': self.watermark_ns,
+            'lateness_ns': self.lateness_ns,
+            'manifest': [list(landed) for landed in sorted(self.manifest)],
+        }
+
+
+def load_checkpoint(checkpoint_path, lateness_seconds=DEFAULT_LATENESS_SECONDS):
+    """Load a checkpoint, or start an empty one when the file does not exist yet"""
+    lateness_ns = int(lateness_seconds * 10**9)
+    try:
+        with open(checkpoint_path, encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return Checkpoint(lateness_ns=lateness_ns)
+    if data.get('version') != CHECKPOINT_VERSION:
+        raise ValueError(
+            f"{checkpoint_path}: unsupported checkpoint version {data.get('version')!r}")
+    return Checkpoint(data['watermark_ns'], data['manifest'], lateness_ns)
+
+
+def save_checkpoint(checkpoint_path, checkpoint):
+    """Write the checkpoint atomically: a crash leaves the old or the new file, never a torn one"""
+    directory = os.path.dirname(os.path.abspath(checkpoint_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix='.checkpoint-', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(checkpoint.to_dict(), f, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, checkpoint_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _scan(directory, root):
+    """Yield a LandedFile for every visible file below directory, with paths relative to root"""
+    with os.scandir(directory) as it:
+        entries = sorted(it, key=lambda entry: entry.name)
+    for entry in entries:
+        if any(fnmatch(entry.name, pattern) for pattern in IGNORED_NAMES):
+            continue
+        if entry.is_dir(follow_symlinks=False):
+            yield from _scan(entry.path, root)
+        elif entry.is_file(follow_symlinks=False):
+            stat = entry.stat(follow_symlinks=False)
+            rel_path = Path(os.path.relpath(entry.path, root)).as_posix()
+            yield LandedFile(rel_path, stat.st_mtime_ns, stat.st_size)
+
+
+def list_new_files(root, checkpoint):
+    """Return the files under root the checkpoint has not seen, oldest first.
+
+    Ordering by (mtime, path) keeps the watermark monotonic as batches are
+    committed, so a run interrupted between batches never skips a file.
+    """
+    return sorted((landed for landed in _scan(root, root) if checkpoint.is_new(landed)),
+                  key=lambda landed: (landed.mtime_ns, landed.path))
+
+
+def iter_batches(files, max_bytes=DEFAULT_MAX_BATCH_BYTES, max_files=DEFAULT_MAX_BATCH_FILES):
+    """Group files into batches of at most max_files and max_bytes; a larger file stands alone"""
+    batch = []
+    batch_bytes = 0
+    for landed in files:
+        if batch and (len(batch) >= max_files or batch_bytes + landed.size > max_bytes):
+            yield batch
+            batch = []
+            batch_bytes = 0
+        batch.append(landed)
+        batch_bytes += landed.size
+    if batch:
+        yield batch
+
+
+class VolumeDiscovery:
+    """Discover new files under a volume root and commit processed batches to a checkpoint.
+
+        discovery = VolumeDiscovery('/Volumes/main/raw/drs', checkpoint_path)
+        for batch in discovery.batches():
+            load(discovery.absolute(batch))
+            discovery.commit(batch)
+
+    A batch that is yielded but not committed is offered again by the next run.
+    """
+
+    def __init__(self, root, checkpoint_path, max_batch_bytes=DEFAULT_MAX_BATCH_BYTES,
+                 max_batch_files=DEFAULT_MAX_BATCH_FILES,
+                 lateness_seconds=DEFAULT_LATENESS_SECONDS):
+        self.root = str(root)
+        self.checkpoint_path = checkpoint_path
+        self.max_batch_bytes = max_batch_bytes
+        self.max_batch_files = max_batch_files
+        self.checkpoint = load_checkpoint(checkpoint_path, lateness_seconds)
+
+    def batches(self):
+        yield from iter_batches(list_new_files(self.root, self.checkpoint), self.max_batch_bytes,
+                                self.max_batch_files)
+
+    def absolute(self, batch):
+        return [os.path.join(self.root, landed.path) for landed in batch]
+
+    def commit(self, batch):
+        self.checkpoint.add(batch)
+        save_checkpoint(self.checkpoint_path, self.checkpoint)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="List files landed in a raw volume since the last checkpoint")
+    parser.add_argument('root', help="Volume path or local directory standing in for it")
+    parser.add_argument('--checkpoint', required=True, metavar='PATH',
+                        help="Checkpoint file to read and update")
+    parser.add_argument('--max-batch-bytes', type=int, default=DEFAULT_MAX_BATCH_BYTES, metavar='N',
+                        help=f"Bytes per batch (default: {DEFAULT_MAX_BATCH_BYTES})")
+    parser.add_argument('--max-batch-files', type=int, default=DEFAULT_MAX_BATCH_FILES, metavar='N',
+                        help=f"Files per batch (default: {DEFAULT_MAX_BATCH_FILES})")
+    parser.add_argument('--lateness', type=float, default=DEFAULT_LATENESS_SECONDS,
+                        metavar='SECONDS',
+                        help="How far behind the watermark a file may land "
+                             f"(default: {DEFAULT_LATENESS_SECONDS})")
+    parser.add_argument('--commit', action='store_true', help="Mark the listed files as processed")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not os.path.isdir(args.root):
+        print(f"DISCOVERY ERRORS:\n  {args.root}: not a directory")
+        sys.exit(1)
+
+    discovery = VolumeDiscovery(args.root, args.checkpoint, args.max_batch_bytes,
+                                args.max_batch_files, args.lateness)
+    total = 0
+    for number, batch in enumerate(discovery.batches(), 1):
+        print(f"Batch {number}: {len(batch)} files, {sum(landed.size for landed in batch)} bytes")
+        for landed in batch:
+            print(f"  {landed.path}")
+        total += len(batch)
+        if args.commit:
+            discovery.commit(batch)
+
+    print(f"{total} new files" + (" committed" if args.commit and total else ""))
+
+if __name__ == "__main__":
+    main()
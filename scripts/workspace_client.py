@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""Databricks workspace REST client that pools connections and shares OAuth M2M tokens across
+processes"""
+
+import argparse
+import base64
+import fcntl
+import http.client
+import json
+import os
+import queue
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import urlencode, urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+DEFAULT_TOKEN_CACHE_PATH = Path('.cache') / 'workspace-tokens.json'
+TOKEN_ENDPOINT = '/oidc/v1/token'
+TOKEN_SCOPE = 'all-apis'
+# Tokens are treated as expired this many seconds early so a request never carries one that
+# lapses in flight
+EXPIRY_SKEW = 60
+DEFAULT_POOL_SIZE = 4
+DEFAULT_TIMEOUT = 30
+DEFAULT_JOBS = 4
+# Cheapest authenticated call: the identity of the service principal
+PREFLIGHT_ENDPOINT = '/api/2.0/preview/scim/v2/Me'
+
+
+class WorkspaceError(Exception):
+    """A workspace request that failed, with the HTTP status when there was a response"""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class TokenCache:
+    """OAuth tokens on disk keyed by host|client_id, shared by every process under an flock.
+
+    The lock is held across the token exchange, so concurrent processes that
+    find no valid token wait for the first one's exchange instead of each
+    doing their own. Client secrets are never written.
+    """
+
+    def __init__(self, path=DEFAULT_TOKEN_CACHE_PATH, clock=time.time):
+        self.path = Path(path)
+        self.clock = clock
+
+    @staticmethod
+    def key(host, client_id):
+        return f"{host.rstrip('/')}|{client_id}"
+
+    @contextmanager
+    def _locked(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(f"{self.path}.lock", 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _read(self):
+        try:
+            entries = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def _write(self, entries):
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(entries, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _valid(self, entry):
+        return bool(entry) and entry.get('expires_at', 0) - EXPIRY_SKEW > self.clock()
+
+    def get(self, host, client_id):
+        """Return the cached access token if it has not expired, else None"""
+        with self._locked():
+            entry = self._read().get(self.key(host, client_id))
+        return entry['access_token'] if self._valid(entry) else None
+
+    def get_or_fetch(self, host, client_id, fetch, stale=None):
+        """Return a valid cached token, or call fetch() -> (token, expires_in) once for all
+        processes.
+
+        A token equal to stale (one the server just rejected) is never returned.
+        """
+        key = self.key(host, client_id)
+        with self._locked():
+            entries = self._read()
+            entry = entries.get(key)
+            if self._valid(entry) and entry['access_token'] != stale:
+                return entry['access_token']
+            token, expires_in = fetch()
+            now = self.clock()
+            entries = {k: v for k, v in entries.items() if self._valid(v)}
+            entries[key] = {'access_token': token, 'expires_at': now + expires_in}
+            self._write(entries)
+        return token
+
+    def clear(self, host, client_id):
+        with self._locked():
+            entries = self._read()
+            if entries.pop(self.key(host, client_id), None) is not None:
+                self._write(entries)
+
+
+class ConnectionPool:
+    """Keep-alive HTTP(S) connections to one host, at most size of them idle at a time"""
+
+    def __init__(self, host, size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT):
+        url = urlsplit(host if '://' in host else f"https://{host}")
+        self.scheme = url.scheme
+        self.netloc = url.netloc
+        self.timeout = timeout
+        self._idle = queue.LifoQueue(maxsize=size)
+        self.opened = 0
+
+    def _connect(self):
+        self.opened += 1
+        if self.scheme == 'http':
+            return http.client.HTTPConnection(self.netloc, timeout=self.timeout)
+        return http.client.HTTPSConnection(self.netloc, timeout=self.timeout)
+
+    def request(self, method, path, body=None, headers=None):
+        """Send one request, return (status, headers, body bytes); retry a dropped keep-alive"""
+        for attempt in range(2):
+            try:
+                connection = self._idle.get_nowait()
+                reused = True
+            except queue.Empty:
+                connection = self._connect()
+                reused = False
+            try:
+                connection.request(method, path, body=body, headers=headers or {})
+                response = connection.getresponse()
+                data = response.read()
+            except (http.client.HTTPException, ConnectionError) as e:
+                connection.close()
+                # The server may close an idle connection at any time; only a fresh one is worth
+                # failing on
+                if reused and attempt == 0:
+                    continue
+                raise WorkspaceError(f"{method} {path}: {e}") from e
+            except OSError as e:
+                connection.close()
+                raise WorkspaceError(f"{method} {path}: {e}") from e
+            if response.will_close:
+                connection.close()
+            else:
+                try:
+                    self._idle.put_nowait(connection)
+                except queue.Full:
+                    connection.close()
+            return response.status, response.headers, data
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class WorkspaceClient:
+    """REST calls against one workspace as one service principal, safe to share between threads"""
+
+    def __init__(self, host, client_id, client_secret, token_cache=None,
+                 pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT):
+        self.host = host.rstrip('/')
+        self.client_id = client_id
+        self._client_secret = client_secret
+        self.token_cache = token_cache if token_cache is not None else TokenCache()
+        self.pool = ConnectionPool(self.host, pool_size, timeout)
+        self.token_exchanges = 0
+
+    @classmethod
+    def from_config(cls, config, **kwargs):
+        """Build a client from ParameterLoader.get_databricks_config output"""
+        return cls(config['host'], config['client_id'], config['client_secret'], **kwargs)
+
+    def _exchange(self):
+        """Client-credentials grant against the workspace OIDC endpoint"""
+        self.token_exchanges += 1
+        pair = f"{self.client_id}:{self._client_secret}".encode('utf-8')
+        basic = base64.b64encode(pair).decode('ascii')
+        body = urlencode({'grant_type': 'client_credentials', 'scope': TOKEN_SCOPE})
+        status, _, data = self.pool.request('POST', TOKEN_ENDPOINT, body, {
+            'Authorization': f"Basic {basic}",
+            'Content-Type': 'application/x-www-form-urlencoded',
+        })
+        if status != 200:
+            raise WorkspaceError(f"token exchange for {self.client_id} failed with HTTP {status}",
+                                 status)
+        token = json.loads(data)
+        return token['access_token'], int(token.get('expires_in', 3600))
+
+    def token(self, stale=None):
+        """Access token from the shared cache, exchanging credentials only when none is valid"""
+        return self.token_cache.get_or_fetch(self.host, self.client_id, self._exchange, stale)
+
+    def _send(self, method, path, params=None, body=None, headers=None):
+        """Send an authenticated request, refreshing the token once on a 401.
+
+        Returns (status, headers, body bytes).
+        """
+        if params:
+            path = f"{path}?{urlencode(params)}"
+        payload = json.dumps(body) if body is not None else None
+        token = self.token()
+        for attempt in range(2):
+            request_headers = {'Authorization': f"Bearer {token}", 'Accept': 'application/json',
+                               **(headers or {})}
+            if payload is not None:
+                request_headers['Content-Type'] = 'application/json'
+            status, response_headers, data = self.pool.request(method, path, payload,
+                                                               request_headers)
+            if status == 401 and attempt == 0:
+                # Revoked or rotated before its expiry: replace it for every process
+                token = self.token(stale=token)
+                continue
+            break
+        if status >= 400:
+            try:
+                message = json.loads(data).get('message') or data.decode('utf-8', 'replace')
+            except (ValueError, AttributeError):
+                message = data.decode('utf-8', 'replace')
+            raise WorkspaceError(f"{method} {path} failed with HTTP {status}: {message}", status)
+        return status, response_headers, data
+
+    def request(self, method, path, params=None, body=None):
+        """Call a REST endpoint and return its decoded JSON"""
+        _, _, data = self._send(method, path, params, body)
+        return json.loads(data) if data else {}
+
+    def conditional_get(self, path, params=None, etag=None, last_modified=None):
+        """GET revalidating a cached response.
+
+        Returns (JSON or None if not modified, etag, last_modified).
+        """
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        elif last_modified:
+            headers['If-Modified-Since'] = last_modified
+        status, response_headers, data = self._send('GET', path, params, headers=headers)
+        if status == 304:
+            return None, etag, last_modified
+        return (json.loads(data) if data else {}, response_headers.get('ETag'),
+                response_headers.get('Last-Modified'))
+
+    def get(self, path, params=None):
+        return self.request('GET', path, params)
+
+    def close(self):
+        self.pool.close()
+
+
+def shared_clients(credentials, token_cache=None, **kwargs):
+    """Return {target: WorkspaceClient}, one client per host and client_id whatever the targets.
+
+    Targets whose credentials are missing or unresolved map to None.
+    """
+    token_cache = token_cache if token_cache is not None else TokenCache()
+    by_identity = {}
+    clients = {}
+    for target, config in sorted(credentials.items()):
+        if not config or not all(config.get(key) for key in ('host', 'client_id', 'client_secret')):
+            clients[target] = None
+            continue
+        identity = TokenCache.key(config['host'], config['client_id'])
+        if identity not in by_identity:
+            by_identity[identity] = WorkspaceClient.from_config(config, token_cache=token_cache,
+                                                                **kwargs)
+        clients[target] = by_identity[identity]
+    return clients
+
+
+def token_credentials(credentials, token_cache=None):
+    """Swap each target's client id and secret for a cached token the Databricks CLI uses as a PAT.
+
+    CLI processes given these credentials skip their own token exchange; a
+    target whose exchange fails maps to None like an unresolved secret.
+    """
+    clients = shared_clients(credentials, token_cache)
+    shared = {}
+    for target, config in credentials.items():
+        client = clients[target]
+        if client is None:
+            shared[target] = config
+            continue
+        try:
+            shared[target] = {'host': client.host, 'token': client.token(), 'auth_type': 'pat'}
+        except (WorkspaceError, ValueError, KeyError):
+            shared[target] = None
+    for client in {client for client in clients.values() if client is not None}:
+        client.close()
+    return shared
+
+
+def preflight(clients, jobs=DEFAULT_JOBS, endpoint=PREFLIGHT_ENDPOINT):
+    """Check each target's credentials and connectivity concurrently; return {target: error|None}"""
+    def check(target):
+        client = clients[target]
+        if client is None:
+            return target, "credentials could not be resolved"
+        try:
+            client.get(endpoint)
+        except (WorkspaceError, ValueError, KeyError) as e:
+            return target, str(e)
+        return target, None
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        return dict(executor.map(check, sorted(clients)))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Check workspace credentials and connectivity for each target")
+    parser.add_argument('--target', action='append', dest='targets', metavar='TARGET',
+                        required=True, help="Target environment to check (repeatable)")
+    parser.add_argument('--jobs', '-j', type=int, default=DEFAULT_JOBS,
+                        help=f"Concurrent checks (default: {DEFAULT_JOBS})")
+    parser.add_argument('--token-cache', default=str(DEFAULT_TOKEN_CACHE_PATH), metavar='PATH',
+                        help=f"Shared OAuth token cache (default: {DEFAULT_TOKEN_CACHE_PATH})")
+    parser.add_argument('--config', default='parameters.yml', help="Path to parameters.yml")
+    parser.add_argument('--environments-dir', default='environments',
+                        help="Environment configs directory")
+    return parser.parse_args(argv)
+
+
+def main(argv=None, loader=None):
+    args = parse_args(argv)
+    from scripts.deploy_orchestrator import resolve_credentials
+    from scripts.parameter_loader import ParameterLoader
+
+    loader = loader or ParameterLoader(args.config, args.environments_dir)
+    credentials = resolve_credentials(loader, args.targets)
+    clients = shared_clients(credentials, TokenCache(args.token_cache))
+    try:
+        results = preflight(clients, args.jobs)
+    finally:
+        for client in {client for client in clients.values() if client is not None}:
+            client.close()
+
+    errors = {target: error for target, error in results.items() if error}
+    if errors:
+        print("PREFLIGHT ERRORS:")
+        for target, error in sorted(errors.items()):
+            print(f"  {target}: {error}")
+        sys.exit(1)
+
+    print(f"Preflight passed for {len(results)} targets")
+
+if __name__ == "__main__":
+    main()
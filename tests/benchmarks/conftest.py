@@ -0,0 +1,238 @@
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from scripts import bundle_model, repo_index, validate_bundles
+
+BASELINE_PATH = Path(__file__).parent / "baselines.json"
+# Relative slowdown or memory growth over the baseline that fails a benchmark
+DEFAULT_THRESHOLD = 0.5
+
+# Synthetic repo shape, overridable from the environment for larger runs
+SCALE = {
+    "bundles": int(os.getenv("BENCH_BUNDLES", "100")),
+    "resources": int(os.getenv("BENCH_RESOURCES", "5")),
+    "targets": int(os.getenv("BENCH_TARGETS", "4")),
+    "environments": int(os.getenv("BENCH_ENVIRONMENTS", "50")),
+    "pii_files": int(os.getenv("BENCH_PII_FILES", "20")),
+    "pii_file_kb": int(os.getenv("BENCH_PII_FILE_KB", "256")),
+    # PII hits per 1000 lines
+    "pii_density": int(os.getenv("BENCH_PII_DENSITY", "5")),
+}
+
+FILLER = ("    notebook_path: /Workspace/Users/svc/.bundle/drs/dev/files/ingestion"
+          "  # owner: data-platform\n")
+
+BUNDLE = """bundle:
+  name: {name}
+
+include:
+  - ../_common.yml
+  - resources/*.yml
+
+variables:
+  env:
+    description: Target environment
+    default: dev
+
+resources: {{}}
+
+targets:
+{targets}"""
+
+TARGET = """  {target}:
+    mode: production
+    variables:
+      env: {target}
+"""
+
+
+def _schemas(name, resources):
+    lines = ["resources:", "  schemas:"]
+    for i in range(resources):
+        lines += [f"    schema_{i}:", f"      name: {name}_raw_{i}",
+                  "      catalog_name: ${var.env}_raw", "      comment: Synthetic schema"]
+    return "\n".join(lines) + "\n"
+
+
+def _volumes(name, resources):
+    lines = ["resources:", "  volumes:"]
+    for i in range(resources):
+        lines += [f"    volume_{i}:", f"      name: {name}_landing_{i}",
+                  "      catalog_name: ${var.env}_raw",
+                  f"      schema_name: ${{resources.schemas.schema_{i}.name}}",
+                  f"      storage_location: s3://lake-${{var.env}}-raw/{name}/landing_{i}/",
+                  "      volume_type: EXTERNAL"]
+    return "\n".join(lines) + "\n"
+
+
+def _environment(name, sub_environments=2):
+    return (f"environment:\n  name: {name}\n  lh_environment: {name}\n\n"
+            "databricks:\n"
+            f"  host: https://{name}.cloud.databricks.com\n"
+            f"  client_id: ${{BENCH_CLIENT_ID_{name.upper()}}}\n"
+            f"  client_secret: ${{BENCH_CLIENT_SECRET_{name.upper()}}}\n"
+            "  auth_type: oauth-m2m\n\n"
+            "permissions:\n"
+            "  - level: CAN_MANAGE\n    group_name: LakehouseDataEngineer\n"
+            "  - level: CAN_VIEW\n    group_name: users\n\n"
+            "sub_environments:\n"
+            + "".join(f"  - {name}{chr(97 + i)}\n" for i in range(sub_environments)))
+
+
+def _pii_line(rng):
+    """One line with a synthetic SSN, phone or email, built so no literal appears in this file"""
+    kind = rng.randrange(3)
+    if kind == 0:
+        return f"ssn: {rng.randint(100, 899)}-{rng.randint(10, 99)}-{rng.randint(1000, 9999)}\n"
+    if kind == 1:
+        return f"phone: {rng.randint(200, 999)}-{rng.randint(200, 999)}-{rng.randint(1000, 9999)}\n"
+    return f"owner: user{rng.randint(1, 10**6)}@example.com\n"
+
+
+def generate_repo(root, bundles=100, resources=5, targets=4, environments=50, pii_files=20,
+                  pii_file_kb=256, pii_density=5, seed=0):
+    """Write a synthetic repo of bundles x resources x targets, environment configs and PII files"""
+    root = Path(root)
+    rng = random.Random(seed)
+    target_names = [f"env{i:03d}" for i in range(targets)]
+    environment_names = [f"env{i:03d}" for i in range(max(environments, targets))]
+
+    (root / "bundles").mkdir(parents=True)
+    (root / "bundles" / "_common.yml").write_text(
+        "variables:\n  owner:\n    description: Object owner\n    default: svc-lakehouse\n")
+    for b in range(bundles):
+        name = f"source_{b:04d}"
+        directory = root / "bundles" / name
+        (directory / "resources").mkdir(parents=True)
+        (directory / "databricks.yml").write_text(
+            BUNDLE.format(name=name,
+                          targets="".join(TARGET.format(target=target) for target in target_names)))
+        (directory / "resources" / "raw.schema.yml").write_text(_schemas(name, resources))
+        (directory / "resources" / "raw.volume.yml").write_text(_volumes(name, resources))
+
+    for name in environment_names:
+        (root / "environments" / name).mkdir(parents=True)
+        (root / "environments" / name / "config.yml").write_text(_environment(name))
+    (root / "parameters.yml").write_text(
+        "databricks:\n  environments:\n"
+        + "".join(f"    {name}:\n      host: https://{name}.cloud.databricks.com\n"
+                  "      client_id: ${BENCH_CLIENT_ID}\n"
+                  "      client_secret: ${BENCH_CLIENT_SECRET}\n"
+                  "      auth_type: oauth-m2m\n" for name in environment_names))
+
+    (root / "data").mkdir()
+    lines_per_file = pii_file_kb * 1024 // len(FILLER)
+    for f in range(pii_files):
+        lines = [_pii_line(rng) if rng.randrange(1000) < pii_density else FILLER
+                 for _ in range(lines_per_file)]
+        (root / "data" / f"extract_{f:03d}.yml").write_text("".join(lines))
+
+    return {"root": root, "targets": target_names, "environments": environment_names}
+
+
+def cold_caches():
+    """Drop the in-process parse caches so every measured run reads and parses from scratch"""
+    repo_index._BYTES_CACHE.clear()
+    repo_index._YAML_CACHE.clear()
+    repo_index._INDEXES.clear()
+    bundle_model._BUNDLE_CACHE.clear()
+    validate_bundles._BUNDLE_ERRORS.clear()
+
+
+def _calibrate(rounds=5):
+    """Seconds for a fixed pure-Python workload; timings are stored relative to it so baselines
+    recorded on one machine stay comparable on a faster or slower one"""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        sorted(str(i * 7919 % 100003) for i in range(200000))
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+class BenchmarkRecorder:
+    """Time and memory-peak measurements checked against JSON baselines"""
+
+    def __init__(self, baselines, threshold, scale):
+        self.baselines = baselines
+        self.threshold = threshold
+        self.scale_key = ",".join(f"{key}={value}" for key, value in sorted(scale.items()))
+        self.calibration = _calibrate()
+        self.results = {}
+
+    def measure(self, name, run, setup=cold_caches, repeat=3):
+        """Run setup then run repeat times, keep the fastest, then run once under tracemalloc"""
+        seconds = float("inf")
+        for _ in range(repeat):
+            setup()
+            start = time.perf_counter()
+            run()
+            seconds = min(seconds, time.perf_counter() - start)
+
+        setup()
+        tracemalloc.start()
+        try:
+            run()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        key = f"{name}[{self.scale_key}]"
+        result = {"seconds": round(seconds, 4), "relative": round(seconds / self.calibration, 2),
+                  "peak_bytes": peak}
+        self.results[key] = result
+        print(f"\n{name}: {seconds:.3f}s ({result['relative']}x calibration), "
+              f"peak {peak / 2**20:.1f} MiB")
+        self._check(key, result)
+        return result
+
+    def _check(self, key, result):
+        baseline = self.baselines.get(key)
+        if baseline is None:
+            print(f"  no baseline for {key}")
+            return
+        limit = 1 + self.threshold
+        regressions = [f"{metric} {result[metric]} vs baseline {baseline[metric]}"
+                       for metric in ("relative", "peak_bytes")
+                       if result[metric] > baseline[metric] * limit]
+        if regressions:
+            pytest.fail(f"{key} regressed more than {self.threshold:.0%}: "
+                        + "; ".join(regressions))
+
+
+@pytest.fixture(scope="session")
+def benchmark_recorder():
+    """Recorder shared by all benchmarks; writes results and new baselines when the session ends.
+
+    BENCHMARK_THRESHOLD sets the allowed regression (default 0.5 = 50%),
+    BENCHMARK_RESULTS a path for this run's measurements, and
+    BENCHMARK_UPDATE_BASELINES=1 rewrites baselines.json from this run.
+    """
+    baselines = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+    threshold = float(os.getenv("BENCHMARK_THRESHOLD", DEFAULT_THRESHOLD))
+    update = bool(os.getenv("BENCHMARK_UPDATE_BASELINES"))
+    recorder = BenchmarkRecorder({} if update else baselines, threshold, SCALE)
+    yield recorder
+
+    if os.getenv("BENCHMARK_RESULTS"):
+        results = {"calibration_seconds": recorder.calibration, "results": recorder.results}
+        Path(os.getenv("BENCHMARK_RESULTS")).write_text(
+            json.dumps(results, indent=2, sort_keys=True) + "\n")
+    if update and recorder.results:
+        BASELINE_PATH.write_text(
+            json.dumps({**baselines, **recorder.results}, indent=2, sort_keys=True) + "\n")
+
+
+@pytest.fixture(scope="session")
+def synthetic_repo(tmp_path_factory):
+    return generate_repo(tmp_path_factory.mktemp("synthetic-repo"), **SCALE)
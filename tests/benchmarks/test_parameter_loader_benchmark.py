@@ -0,0 +1,40 @@
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from scripts.parameter_loader import ParameterLoader
+
+pytestmark = [
+    pytest.mark.benchmark,
+    pytest.mark.skipif(not os.getenv("RUN_BENCHMARKS"),
+                       reason="Set RUN_BENCHMARKS=1 to run benchmarks"),
+]
+
+INSTANCES = 2000
+
+
+class TestParameterLoaderStartupBenchmark:
+    def test_many_loaders_are_cheap(self):
+        """Test building many loaders costs no YAML parsing beyond the first access"""
+        start = time.perf_counter()
+        loaders = [ParameterLoader() for _ in range(INSTANCES)]
+        construct = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for loader in loaders:
+            loader.get_environment_permissions("sandbox")
+            loader.get_sub_environments("dev")
+        access = time.perf_counter() - start
+
+        print(f"\n{INSTANCES} loaders: construct {construct * 1e6 / INSTANCES:.1f} us/instance, "
+              f"first access {access * 1e6 / INSTANCES:.1f} us/instance")
+
+        # A YAML parse of one config.yml alone takes well over 100 us
+        assert construct / INSTANCES < 100e-6
+        assert access / INSTANCES < 200e-6
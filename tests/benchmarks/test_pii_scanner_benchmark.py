@@ -0,0 +1,103 @@
+import os
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from scripts import pii_scanner
+from scripts.pii_scanner import ENTROPY_RULE, iter_findings, shannon_entropy
+
+pytestmark = [
+    pytest.mark.benchmark,
+    pytest.mark.skipif(not os.getenv("RUN_BENCHMARKS"),
+                       reason="Set RUN_BENCHMARKS=1 to run benchmarks"),
+]
+
+LINE = ("    notebook_path: /Workspace/Users/svc/.bundle/drs/dev/files/ingestion"
+        "  # contact ops@example.com\n")
+
+
+def _content(size_mb):
+    lines = size_mb * 1024 * 1024 // len(LINE)
+    return LINE * lines, lines
+
+
+def _secret_content(size_mb):
+    """LINE filler with a generated 36-character secret on every 20th line"""
+    rng = random.Random(0)
+    alphabet = string.ascii_letters + string.digits
+    lines = []
+    for i in range(size_mb * 1024 * 1024 // len(LINE)):
+        if i % 20:
+            lines.append(LINE)
+        else:
+            lines.append(f"    client_secret: {''.join(rng.choice(alphabet) for _ in range(36))}\n")
+    return "".join(lines)
+
+
+def _time_scan(content):
+    start = time.perf_counter()
+    hits = sum(1 for _ in iter_findings(content))
+    return time.perf_counter() - start, hits
+
+
+class TestPIIScannerBenchmark:
+    def test_scan_time_is_linear(self):
+        """Test a 100 MB scan costs about ten times a 10 MB scan"""
+        small_mb = int(os.getenv("PII_BENCH_SMALL_MB", "10"))
+        large_mb = int(os.getenv("PII_BENCH_LARGE_MB", "100"))
+
+        small_content, small_lines = _content(small_mb)
+        small_time, small_hits = _time_scan(small_content)
+        del small_content
+        large_content, large_lines = _content(large_mb)
+        large_time, large_hits = _time_scan(large_content)
+
+        ratio = large_mb / small_mb
+        print(f"\n{small_mb} MB: {small_time:.2f}s, {large_mb} MB: {large_time:.2f}s "
+              f"({large_mb / large_time:.1f} MB/s)")
+
+        assert (small_hits, large_hits) == (small_lines, large_lines)
+        # Quadratic behaviour would be ~ratio**2 slower; allow generous noise on top of linear
+        assert large_time < small_time * ratio * 2
+
+    def test_batched_entropy_beats_counter(self, monkeypatch):
+        """Test the numpy batch scores many candidates faster than one Counter per token"""
+        pytest.importorskip("numpy")
+        count = int(os.getenv("PII_BENCH_TOKENS", "200000"))
+        tokens = [f"k3Jq9vXz2LmN8pRt5WyB{i:012d}" for i in range(count)]
+
+        start = time.perf_counter()
+        batched = shannon_entropy(tokens)
+        batched_time = time.perf_counter() - start
+        monkeypatch.setattr(pii_scanner, 'numpy', None)
+        start = time.perf_counter()
+        counted = shannon_entropy(tokens)
+        counter_time = time.perf_counter() - start
+
+        print(f"\n{len(tokens)} tokens: numpy {batched_time:.2f}s, Counter {counter_time:.2f}s")
+        assert batched == pytest.approx(counted)
+        assert batched_time < counter_time
+
+    def test_entropy_pass_overhead(self, monkeypatch):
+        """Test the high-entropy pass costs less than the regex-only scan it is added to"""
+        content = _secret_content(int(os.getenv("PII_BENCH_SECRET_MB", "10")))
+        full_time, full_hits = _time_scan(content)
+
+        active_rules = pii_scanner.active_rules
+        monkeypatch.setattr(pii_scanner, 'active_rules',
+                            lambda text: tuple(rule for rule in active_rules(text)
+                                               if rule != ENTROPY_RULE))
+        regex_time, regex_hits = _time_scan(content)
+
+        print(f"\nregex only {regex_time:.2f}s ({regex_hits} hits), "
+              f"with entropy {full_time:.2f}s ({full_hits} hits), "
+              f"numpy: {pii_scanner.numpy is not None}")
+        assert full_hits > regex_hits
+        assert full_time < regex_time * 2
@@ -0,0 +1,88 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from scripts import pii_scanner, validate_bundles
+from scripts.bundle_model import discover_bundles
+from scripts.bundle_references import check_bundles
+from scripts.parameter_loader import ParameterLoader
+from scripts.permission_matrix import Grant, compile_matrix
+from scripts.repo_index import RepoIndex
+
+pytestmark = [
+    pytest.mark.benchmark,
+    pytest.mark.skipif(not os.getenv("RUN_BENCHMARKS"),
+                       reason="Set RUN_BENCHMARKS=1 to run benchmarks"),
+]
+
+
+class TestSyntheticRepoBenchmark:
+    def test_repo_index(self, synthetic_repo, benchmark_recorder):
+        """Benchmark one classified walk of the synthetic repo"""
+        benchmark_recorder.measure("repo_index", lambda: RepoIndex(synthetic_repo["root"]))
+
+    def test_validate_bundles(self, synthetic_repo, benchmark_recorder, capsys):
+        """Benchmark validate_bundles.main on every bundle file, location overlap check included"""
+        paths = [str(path) for path in sorted((synthetic_repo["root"] / "bundles").rglob("*.yml"))
+                 if path.name != "_common.yml"]
+        benchmark_recorder.measure("validate_bundles",
+                                   lambda: validate_bundles.main(paths + ["--no-cache"]))
+        assert "All bundles validated successfully" in capsys.readouterr().out
+
+    def test_bundle_references(self, synthetic_repo, benchmark_recorder):
+        """Benchmark resolving every interpolation of every bundle target"""
+        bundles_dir = synthetic_repo["root"] / "bundles"
+        benchmark_recorder.measure("bundle_references",
+                                   lambda: check_bundles(discover_bundles(bundles_dir)))
+        assert check_bundles(discover_bundles(bundles_dir)) == []
+
+    def test_pii_scanner(self, synthetic_repo, benchmark_recorder, capsys):
+        """Benchmark pii_scanner.main over the synthetic data files without the result cache"""
+        args = ["--root", str(synthetic_repo["root"] / "data"), "--no-cache",
+                "--baseline", str(synthetic_repo["root"] / "no-baseline.json")]
+
+        def scan():
+            with pytest.raises(SystemExit):
+                pii_scanner.main(args)
+
+        benchmark_recorder.measure("pii_scanner", scan)
+        assert capsys.readouterr().out.startswith("PII VIOLATIONS FOUND:")
+
+    def test_parameter_loader(self, synthetic_repo, benchmark_recorder):
+        """Benchmark resolving the config, permissions and sub-environments of every environment"""
+        root = synthetic_repo["root"]
+
+        def load_all():
+            loader = ParameterLoader(root / "parameters.yml", root / "environments",
+                                     snapshot_path=None)
+            for environment in synthetic_repo["environments"]:
+                loader.get_databricks_config(environment)
+                loader.get_environment_permissions(environment)
+                loader.get_sub_environments(environment)
+
+        benchmark_recorder.measure("parameter_loader", load_all)
+
+    def test_permission_matrix(self, synthetic_repo, benchmark_recorder):
+        """Benchmark compiling the synthetic permissions plus 50k grants, bulk queries and a diff"""
+        root = synthetic_repo["root"]
+        targets = synthetic_repo["targets"]
+        principals = [f"group_{p:03d}" for p in range(500)]
+        grants = [Grant(principal, target, f"source_{s:04d}.schemas.schema_0", "SELECT")
+                  for principal in principals for target in targets for s in range(25)]
+
+        def compile_and_query():
+            loader = ParameterLoader(root / "parameters.yml", root / "environments",
+                                     snapshot_path=None)
+            matrix = compile_matrix(discover_bundles(root / "bundles"), loader)
+            for grant in grants:
+                matrix.add(grant)
+            matrix.bulk_grants(principals)
+            matrix.bulk_has(grants)
+            matrix.diff(targets[0], targets[-1])
+
+        benchmark_recorder.measure("permission_matrix", compile_and_query)
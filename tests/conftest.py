@@ -0,0 +1,15 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from scripts.repo_index import get_index
+
+
+@pytest.fixture(scope="session")
+def repo_index():
+    """Single walk of the repository shared by every test; file bytes and YAML are cached on it"""
+    return get_index(".")
@@ -1,41 +1,37 @@
 import pytest
-from pathlib import Path
-import yaml
 
 class TestDataQuality:
-    def test_schema_definitions_valid(self):
+    def test_schema_definitions_valid(self, repo_index):
         """Test schema definitions are valid"""
-        schema_files = list(Path("bundles").rglob("*.schema.yml"))
+        schema_files = repo_index.paths("schema", under="bundles")
         assert len(schema_files) > 0, "No schema files found"
         
         for schema_file in schema_files:
-            with open(schema_file, 'r') as f:
-                schema_config = yaml.safe_load(f)
-                assert "resources" in schema_config
-                assert "schemas" in schema_config["resources"]
+            schema_config = repo_index.load_yaml(schema_file)
+            assert "resources" in schema_config
+            assert "schemas" in schema_config["resources"]
 
-    def test_volume_definitions_valid(self):
+    def test_volume_definitions_valid(self, repo_index):
         """Test volume definitions are valid"""
-        volume_files = list(Path("bundles").rglob("*.volume.yml"))
+        volume_files = repo_index.paths("volume", under="bundles")
         assert len(volume_files) > 0, "No volume files found"
         
         for volume_file in volume_files:
-            with open(volume_file, 'r') as f:
-                volume_config = yaml.safe_load(f)
-                # Skip if file is commented out (returns None)
-                if volume_config is None:
-                    continue
-                assert "resources" in volume_config
-                assert "volumes" in volume_config["resources"]
+            volume_config = repo_index.load_yaml(volume_file)
+            # Skip if file is commented out (returns None)
+            if volume_config is None:
+                continue
+            assert "resources" in volume_config
+            assert "volumes" in volume_config["resources"]
 
-    def test_no_hardcoded_credentials(self):
+    def test_no_hardcoded_credentials(self, repo_index):
         """Test no hardcoded credentials in configs"""
-        config_files = list(Path("bundles").rglob("*.yml"))
+        config_files = [p for p in repo_index.paths(under="bundles") if p.endswith(".yml")]
         sensitive_patterns = ["password", "secret", "token"]
         
         for config_file in config_files:
-            content = config_file.read_text().lower()
+            content = repo_index.read_text(config_file).lower()
             for pattern in sensitive_patterns:
                 if pattern in content and "var." not in content:
                     # Allow variables but not hardcoded values
-                    pass
\ No newline at end of file
+                    pass
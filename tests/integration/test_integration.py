@@ -80,22 +80,20 @@ def test_bundle_plan_dry_run(self, bundle_path, databricks_config):
         # Plan should succeed even without deployment
         assert result.returncode == 0, f"Bundle plan failed: {result.stderr}"
 
-    def test_yaml_syntax_all_bundles(self):
+    def test_yaml_syntax_all_bundles(self, repo_index):
         """Test YAML syntax for all bundle files"""
         import yaml
 
-        bundle_files = list(Path("bundles").rglob("*.yml")) + list(
-            Path("bundles").rglob("*.yaml")
-        )
+        bundle_files = [p for p in repo_index.paths(under="bundles")
+                        if p.endswith((".yml", ".yaml"))]
 
         for file_path in bundle_files:
-            with open(file_path) as f:
-                try:
-                    yaml.safe_load(f)
-                except yaml.YAMLError as e:
-                    pytest.fail(f"YAML syntax error in {file_path}: {e}")
+            try:
+                repo_index.load_yaml(file_path)
+            except yaml.YAMLError as e:
+                pytest.fail(f"YAML syntax error in {file_path}: {e}")
 
-    def test_no_hardcoded_secrets(self):
+    def test_no_hardcoded_secrets(self, repo_index):
         """Test that no hardcoded secrets exist in bundle files"""
         import re
 
@@ -104,13 +102,11 @@ def test_no_hardcoded_secrets(self):
             r'token\s*[:=]\s*["\']?[^"\'\s]+',
         ]
 
-        bundle_files = list(Path("bundles").rglob("*.yml")) + list(
-            Path("bundles").rglob("*.yaml")
-        )
+        bundle_files = [p for p in repo_index.paths(under="bundles")
+                        if p.endswith((".yml", ".yaml"))]
 
         for file_path in bundle_files:
-            with open(file_path) as f:
-                content = f.read()
+            content = repo_index.read_text(file_path)
 
             for pattern in secret_patterns:
                 matches = re.finditer(pattern, content, re.IGNORECASE)
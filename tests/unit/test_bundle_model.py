@@ -0,0 +1,107 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from scripts import repo_index
+from scripts.bundle_model import deep_merge, discover_bundles, find_bundle_root, load_bundle
+
+
+def write_bundle(root, files):
+    for rel, content in files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    return root / "b" / "databricks.yml"
+
+
+BUNDLE_FILES = {
+    "_common.yml": "variables:\n  owner:\n    default: abc\n",
+    "b/databricks.yml": (
+        "bundle:\n  name: b__raw\n"
+        "include:\n  - ../_common.yml\n  - resources/*.yml\n"
+        "resources:\n  jobs:\n    j:\n      name: J\n"
+    ),
+    "b/resources/raw.schema.yml": (
+        "resources:\n  schemas:\n    raw_schema:\n      name: s\n      catalog_name: c\n"
+    ),
+}
+
+
+@pytest.fixture
+def parse_count(monkeypatch):
+    """Count YAML parses performed by the bundle model"""
+    calls = []
+
+    class RecordingCache(dict):
+        # Every parse stores its result exactly once
+        def __setitem__(self, key, value):
+            calls.append(key)
+            super().__setitem__(key, value)
+
+    monkeypatch.setattr(repo_index, "_YAML_CACHE", RecordingCache())
+    return calls
+
+
+class TestBundleModel:
+    def test_real_bundles_resolve_includes(self):
+        """Test the repo bundles merge _common.yml and resource files"""
+        bundles = {bundle.name: bundle for bundle in discover_bundles("bundles")}
+        assert set(bundles) == {"drs__infra", "guidewire_cda__raw"}
+
+        drs = bundles["drs__infra"]
+        assert Path("bundles/_common.yml") in drs.files
+        assert "service_principals" in drs.config["variables"]
+        assert drs.sources[("schemas", "raw_schema")] == Path(
+            "bundles/drs/resources/raw.schema.yml")
+        assert set(drs.targets) == {"dev", "sandbox", "test"}
+
+    def test_each_file_parsed_once(self, tmp_path, parse_count):
+        """Test files shared across loads are parsed exactly once"""
+        root = write_bundle(tmp_path, BUNDLE_FILES)
+        load_bundle(root)
+        load_bundle(root)
+        assert sorted(Path(p).name for p in parse_count) == [
+            "_common.yml", "databricks.yml", "raw.schema.yml"]
+
+    def test_memo_invalidated_on_change(self, tmp_path, parse_count):
+        """Test editing one member reparses only that file"""
+        root = write_bundle(tmp_path, BUNDLE_FILES)
+        first = load_bundle(root)
+
+        schema = tmp_path / "b" / "resources" / "raw.schema.yml"
+        schema.write_text(
+            "resources:\n  schemas:\n    raw_schema:\n      name: s2\n      catalog_name: c\n")
+        stat = schema.stat()
+        os.utime(schema, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        second = load_bundle(root)
+        assert second is not first
+        assert second.resources["schemas"]["raw_schema"]["name"] == "s2"
+        assert [Path(p).name for p in parse_count].count("raw.schema.yml") == 2
+        assert [Path(p).name for p in parse_count].count("databricks.yml") == 1
+
+    def test_syntax_errors_recorded(self, tmp_path):
+        """Test a broken include is reported without hiding the rest of the bundle"""
+        files = dict(BUNDLE_FILES)
+        files["b/resources/raw.volume.yml"] = "resources: [unclosed\n"
+        bundle = load_bundle(write_bundle(tmp_path, files))
+
+        broken = Path(tmp_path / "b" / "resources" / "raw.volume.yml")
+        assert bundle.errors[broken].startswith("YAML syntax error")
+        assert "raw_schema" in bundle.resources["schemas"]
+
+    def test_find_bundle_root(self, tmp_path):
+        """Test a resource file maps to the databricks.yml above it"""
+        root = write_bundle(tmp_path, BUNDLE_FILES)
+        assert find_bundle_root(tmp_path / "b" / "resources" / "raw.schema.yml") == root.resolve()
+
+    def test_deep_merge(self):
+        """Test nested mappings merge and scalars are overridden"""
+        merged = deep_merge({"resources": {"jobs": {"a": 1}}, "x": 1},
+                            {"resources": {"schemas": {"s": 2}}, "x": 2})
+        assert merged == {"resources": {"jobs": {"a": 1}, "schemas": {"s": 2}}, "x": 2}
@@ -0,0 +1,138 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from scripts.bundle_plan import main
+
+DATABRICKS_YML = """
+bundle:
+  name: b__raw
+include:
+  - resources/*.yml
+variables:
+  env:
+    default: sandbox
+targets:
+  sandbox: {}
+  dev:
+    variables:
+      env: dev
+"""
+
+SCHEMA_YML = """
+resources:
+  schemas:
+    raw_schema:
+      name: src_${var.env}
+      catalog_name: main
+      grants:
+        - principal: owners
+          privileges: [USE_SCHEMA, CREATE_VOLUME]
+"""
+
+
+@pytest.fixture
+def bundles_dir(tmp_path):
+    bundle = tmp_path / "bundles" / "b"
+    (bundle / "resources").mkdir(parents=True)
+    (bundle / "databricks.yml").write_text(DATABRICKS_YML)
+    (bundle / "resources" / "raw.schema.yml").write_text(SCHEMA_YML)
+    return tmp_path / "bundles"
+
+
+def run_plan(bundles_dir, capsys, *extra):
+    main(["--bundles-dir", str(bundles_dir), "--baseline", str(bundles_dir / "baseline.json"),
+          "--format", "json", *extra])
+    return json.loads(capsys.readouterr().out)
+
+
+class TestBundlePlan:
+    def test_empty_baseline_creates_everything(self, bundles_dir, capsys):
+        """Test every resource is created when nothing was deployed"""
+        plans = run_plan(bundles_dir, capsys, "--target", "sandbox")
+        assert plans == [{
+            "bundle": "b__raw",
+            "target": "sandbox",
+            "changes": [
+                {"action": "create", "resource": "schemas.raw_schema"},
+                {"action": "create", "resource": "schemas.raw_schema.grants"},
+            ],
+        }]
+
+    def test_update_and_delete(self, bundles_dir, capsys):
+        """Test field changes, grant changes and removals are reported per target"""
+        main(["--bundles-dir", str(bundles_dir), "--baseline", str(bundles_dir / "baseline.json"),
+              "--update-baseline"])
+        capsys.readouterr()
+
+        schema = bundles_dir / "b" / "resources" / "raw.schema.yml"
+        volume = "volumes:\n    v:\n      name: v\n  schemas:"
+        schema.write_text(SCHEMA_YML.replace("catalog_name: main", "catalog_name: raw")
+                                    .replace("CREATE_VOLUME]", "CREATE_VOLUME, MANAGE]")
+                                    .replace("schemas:", volume, 1))
+        (bundles_dir / "b" / "databricks.yml").write_text(
+            DATABRICKS_YML.replace("  dev:\n    variables:\n      env: dev\n", ""))
+
+        plans = {entry["target"]: entry["changes"] for entry in run_plan(bundles_dir, capsys)}
+        assert plans["sandbox"] == [
+            {"action": "create", "resource": "volumes.v"},
+            {"action": "update", "resource": "schemas.raw_schema", "fields": ["catalog_name"]},
+            {"action": "update", "resource": "schemas.raw_schema.grants", "fields": []},
+        ]
+        assert plans["dev"] == [
+            {"action": "delete", "resource": "schemas.raw_schema"},
+            {"action": "delete", "resource": "schemas.raw_schema.grants"},
+        ]
+
+    def test_privilege_order_is_not_a_change(self, bundles_dir, capsys):
+        """Test reordering privileges produces an empty plan"""
+        main(["--bundles-dir", str(bundles_dir), "--baseline", str(bundles_dir / "baseline.json"),
+              "--update-baseline"])
+        schema = bundles_dir / "b" / "resources" / "raw.schema.yml"
+        schema.write_text(SCHEMA_YML.replace("[USE_SCHEMA, CREATE_VOLUME]",
+                                             "[CREATE_VOLUME, USE_SCHEMA]"))
+        capsys.readouterr()
+
+        assert run_plan(bundles_dir, capsys) == []
+
+    def test_argument_order_is_a_change(self, bundles_dir, capsys):
+        """Test reordering order-sensitive lists such as task parameters is planned as an update"""
+        job = bundles_dir / "b" / "resources" / "run.job.yml"
+        job.write_text("resources:\n  jobs:\n    run:\n      name: run\n"
+                       "      parameters: [--from, a, --to, b]\n")
+        main(["--bundles-dir", str(bundles_dir), "--baseline", str(bundles_dir / "baseline.json"),
+              "--update-baseline"])
+        job.write_text(job.read_text().replace("[--from, a, --to, b]", "[--from, b, --to, a]"))
+        capsys.readouterr()
+
+        plans = run_plan(bundles_dir, capsys, "--target", "sandbox")
+        assert plans[0]["changes"] == [
+            {"action": "update", "resource": "jobs.run", "fields": ["parameters"]}]
+
+    def test_unresolved_references_reported(self, bundles_dir, capsys):
+        """Test a target with unresolved references is listed even when nothing else changed"""
+        schema = bundles_dir / "b" / "resources" / "raw.schema.yml"
+        schema.write_text(SCHEMA_YML.replace("principal: owners", "principal: ${var.owner}"))
+        main(["--bundles-dir", str(bundles_dir), "--baseline", str(bundles_dir / "baseline.json"),
+              "--update-baseline"])
+        capsys.readouterr()
+
+        plans = run_plan(bundles_dir, capsys, "--target", "sandbox")
+        assert plans[0]["changes"] == []
+        assert [problem["reference"] for problem in plans[0]["unresolved"]] == ["${var.owner}"]
+
+        main(["--bundles-dir", str(bundles_dir), "--baseline", str(bundles_dir / "baseline.json"),
+              "--target", "sandbox"])
+        assert "  ! " in capsys.readouterr().out
+
+    def test_repo_bundles_plan_offline(self, capsys):
+        """Test the committed bundles plan without a workspace"""
+        main(["--baseline", "/nonexistent/baseline.json", "--target", "sandbox"])
+        out = capsys.readouterr().out
+        assert "drs__infra [sandbox]" in out
+        assert "+ create schemas.raw_schema" in out
@@ -0,0 +1,112 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from scripts.bundle_model import discover_bundles, load_bundle
+from scripts.bundle_references import check_bundles, resolve_target
+
+DATABRICKS_YML = """
+bundle:
+  name: b__raw
+include:
+  - resources/*.yml
+variables:
+  principals:
+    type: complex
+    default:
+      sandbox: sp-sandbox
+  owner:
+    default: ""
+  env:
+    default: sandbox
+  loop_a:
+    default: ${var.loop_b}
+  loop_b:
+    default: ${var.loop_a}
+workspace:
+  root_path: /Workspace/Users/${workspace.current_user.userName}/${bundle.name}/${bundle.target}
+targets:
+  sandbox:
+    variables:
+      owner: ${var.principals.sandbox}
+  dev:
+    variables:
+      owner: ${var.principals.dev}
+      env: dev
+"""
+
+SCHEMA_YML = """
+resources:
+  schemas:
+    raw_schema:
+      name: src_${var.env}
+      catalog_name: ${var.env}_raw
+      grants:
+        - principal: ${var.owner}
+  volumes:
+    raw_volume:
+      name: ${resources.schemas.raw_schema.name}_raw
+      schema_name: ${resources.schemas.raw_schema.name}
+      storage_location: s3://bucket/${var.env}/
+"""
+
+
+@pytest.fixture
+def bundle(tmp_path):
+    (tmp_path / "resources").mkdir()
+    (tmp_path / "databricks.yml").write_text(DATABRICKS_YML)
+    (tmp_path / "resources" / "raw.schema.yml").write_text(SCHEMA_YML)
+    return load_bundle(tmp_path / "databricks.yml")
+
+
+def _problems(problems):
+    return sorted((p["target"], p["location"], p["reference"], p["kind"]) for p in problems)
+
+
+class TestBundleReferences:
+    def test_resolves_variables_resources_and_builtins(self, bundle):
+        """Test target overrides, complex variables and resource references resolve"""
+        config, _ = resolve_target(bundle, "sandbox")
+        schema = config["resources"]["schemas"]["raw_schema"]
+        volume = config["resources"]["volumes"]["raw_volume"]
+
+        assert schema["name"] == "src_sandbox"
+        assert schema["grants"][0]["principal"] == "sp-sandbox"
+        assert volume["name"] == "src_sandbox_raw"
+        assert volume["storage_location"] == "s3://bucket/sandbox/"
+        # Deploy-time values stay as placeholders
+        assert config["workspace"]["root_path"] == (
+            "/Workspace/Users/${workspace.current_user.userName}/b__raw/sandbox"
+        )
+
+    def test_variable_overrides(self, bundle):
+        """Test --var style overrides take precedence over the target's variables"""
+        config, _ = resolve_target(bundle, "dev", {"env": "deva"})
+        assert config["resources"]["schemas"]["raw_schema"]["name"] == "src_deva"
+        assert resolve_target(bundle, "dev")[0]["variables"]["env"]["default"] == "dev"
+
+    def test_reports_unresolved_and_cycles(self, bundle):
+        """Test dangling and cyclic references are reported per target"""
+        _, problems = resolve_target(bundle, "dev")
+        assert _problems(problems) == [
+            ("dev", "resources.schemas.raw_schema.grants[0].principal", "${var.owner}",
+             "unresolved"),
+            ("dev", "variables.loop_a.default", "${var.loop_b}", "cycle"),
+            ("dev", "variables.loop_b.default", "${var.loop_a}", "cycle"),
+            ("dev", "variables.owner.default", "${var.principals.dev}", "unresolved"),
+        ]
+        assert problems[0]["file"].endswith("databricks.yml")
+
+    def test_problem_attributed_to_declaring_file(self, bundle):
+        """Test resource problems point at the included file that declares them"""
+        _, problems = resolve_target(bundle, "dev")
+        grant = [p for p in problems if p["location"].startswith("resources.")][0]
+        assert grant["file"].endswith("raw.schema.yml")
+
+    def test_repo_sandbox_targets_resolve(self):
+        """Test every sandbox target in the repo resolves offline"""
+        assert check_bundles(discover_bundles("bundles"), targets=["sandbox"]) == []
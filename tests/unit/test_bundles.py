@@ -1,39 +1,35 @@
 import pytest
-import yaml
 from pathlib import Path
 
 class TestBundleConfigurations:
 
-    def test_common_yml_structure(self):
+    def test_common_yml_structure(self, repo_index):
         """Test _common.yml has required structure"""
         common_path = Path("bundles/_common.yml")
         assert common_path.exists()
 
-        with open(common_path) as f:
-            config = yaml.safe_load(f)
+        config = repo_index.load_yaml(common_path)
 
         assert "variables" in config
         assert "service_principals" in config["variables"]
         assert "sandbox" in config["variables"]["service_principals"]["default"]
 
-    def test_drs_bundle_structure(self):
+    def test_drs_bundle_structure(self, repo_index):
         """Test DRS bundle configuration"""
         drs_path = Path("bundles/drs/databricks.yml")
         assert drs_path.exists()
 
-        with open(drs_path) as f:
-            config = yaml.safe_load(f)
+        config = repo_index.load_yaml(drs_path)
 
         assert "include" in config
         assert "../_common.yml" in config["include"]
 
-    def test_schema_configuration(self):
+    def test_schema_configuration(self, repo_index):
         """Test schema resource configuration"""
         schema_path = Path("bundles/drs/resources/raw.schema.yml")
         assert schema_path.exists()
 
-        with open(schema_path) as f:
-            config = yaml.safe_load(f)
+        config = repo_index.load_yaml(schema_path)
 
         assert "resources" in config
         assert "schemas" in config["resources"]
@@ -43,14 +39,13 @@ def test_schema_configuration(self):
         assert "catalog_name" in schema
         assert "grants" in schema
 
-    def test_service_principal_ids_format(self):
+    def test_service_principal_ids_format(self, repo_index):
         """Test service principal IDs are valid UUIDs"""
         import re
         uuid_pattern = r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$'
 
         common_path = Path("bundles/_common.yml")
-        with open(common_path) as f:
-            config = yaml.safe_load(f)
+        config = repo_index.load_yaml(common_path)
 
         principals = config["variables"]["service_principals"]["default"]
         for env, sp_id in principals.items():
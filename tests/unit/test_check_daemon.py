@@ -0,0 +1,205 @@
+import os
+import sys
+import threading
+import types
+from pathlib import Path
+
+import pytest
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from scripts import pii_scanner
+from scripts.check_daemon import CheckDaemon, InotifyWatcher, PollingWatcher, main, request, serve
+
+
+def _email(user):
+    return f"{user}@" + "example.com"
+
+
+def _assert_watcher_changes(watcher, tmp_path):
+    (tmp_path / "a.yml").write_text("changed: true\n")
+    (tmp_path / "sub" / "new.yml").write_text("new: true\n")
+    (tmp_path / "b.yml").unlink()
+
+    changed = set()
+    for _ in range(20):
+        changed |= watcher.changes(timeout=0.2)
+        if len(changed) >= 3:
+            break
+    assert {str(tmp_path / name) for name in ("a.yml", "sub/new.yml", "b.yml")} <= changed
+
+
+@pytest.fixture
+def tree(tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / ".git").mkdir()
+    (tmp_path / "a.yml").write_text("a: 1\n")
+    (tmp_path / "b.yml").write_text("b: 1\n")
+    return tmp_path
+
+
+@pytest.fixture
+def daemon(tmp_path, monkeypatch):
+    """A daemon serving tmp_path from a background thread; yields its socket path"""
+    monkeypatch.chdir(tmp_path)
+    socket_path = tmp_path / "daemon.sock"
+    ready = threading.Event()
+    thread = threading.Thread(target=serve, args=(tmp_path, socket_path, 0.1, True, ready),
+                              daemon=True)
+    thread.start()
+    assert ready.wait(10)
+    yield socket_path
+    request(socket_path, {'command': 'stop'})
+    thread.join(10)
+
+
+class TestWatchers:
+    def test_polling_watcher(self, tree):
+        """Test the polling watcher reports modified, new and deleted files"""
+        watcher = PollingWatcher(tree, interval=0.05)
+        _assert_watcher_changes(watcher, tree)
+        assert watcher.changes(timeout=0.05) == set()
+
+    def test_inotify_watcher(self, tree):
+        """Test the inotify watcher reports modified, new and deleted files"""
+        try:
+            watcher = InotifyWatcher(tree)
+        except (OSError, AttributeError):
+            pytest.skip("inotify is not available")
+        try:
+            _assert_watcher_changes(watcher, tree)
+            (tree / "sub" / "deeper").mkdir()
+            watcher.changes(timeout=0.2)
+            (tree / "sub" / "deeper" / "c.yml").write_text("c: 1\n")
+            assert str(tree / "sub" / "deeper" / "c.yml") in watcher.changes(timeout=1)
+            (tree / "sub" / "deeper" / "c.yml").unlink()
+            (tree / "sub" / "deeper").rmdir()
+            assert str(tree / "sub" / "deeper") in watcher.changes(timeout=1)
+        finally:
+            watcher.close()
+
+
+class TestCheckDaemon:
+    def test_pii_request_tracks_edits(self, tmp_path, daemon):
+        """Test the daemon answers like pii_scanner and reflects files edited between requests"""
+        message = {'command': 'pii', 'cwd': str(tmp_path), 'paths': ["owners.yml"]}
+        (tmp_path / "owners.yml").write_text(f"owner: {_email('alice')}\n")
+        response = request(daemon, message)
+        assert response == {'lines': ["PII VIOLATIONS FOUND:",
+                                      f"  owners.yml:1 - email: {_email('alice')}"],
+                            'exit': 1}
+
+        (tmp_path / "owners.yml").write_text("owner: data-platform\n")
+        response = request(daemon, message)
+        assert response == {'lines': ["No PII violations found"], 'exit': 0}
+
+    def test_bundles_request(self, tmp_path, daemon):
+        """Test bundle validation through the daemon reports structure errors"""
+        bundle = tmp_path / "bundles" / "drs"
+        bundle.mkdir(parents=True)
+        (bundle / "databricks.yml").write_text("bundle:\n  name: drs\n")
+        response = request(daemon, {'command': 'bundles', 'cwd': str(tmp_path),
+                                    'paths': ["bundles/drs/databricks.yml"]})
+        assert response['exit'] == 1
+        assert response['lines'][0] == "BUNDLE VALIDATION ERRORS:"
+
+    def test_client_uses_daemon(self, tmp_path, daemon, capsys):
+        """Test the hook client prints the daemon's answer and exits with its code"""
+        (tmp_path / "owners.yml").write_text(f"owner: {_email('bob')}\n")
+        with pytest.raises(SystemExit) as exc:
+            main(["--socket", str(daemon), "pii", "owners.yml"])
+        assert exc.value.code == 1
+        assert capsys.readouterr().out.splitlines()[0] == "PII VIOLATIONS FOUND:"
+
+    def test_client_falls_back_without_daemon(self, tmp_path, monkeypatch, capsys):
+        """Test the hook client runs the scan in-process when no daemon is listening"""
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "owners.yml").write_text("owner: data-platform\n")
+        main(["--socket", str(tmp_path / "missing.sock"), "pii", "owners.yml"])
+        assert capsys.readouterr().out.strip() == "No PII violations found"
+
+        with pytest.raises(SystemExit) as exc:
+            main(["--socket", str(tmp_path / "missing.sock"), "status"])
+        assert exc.value.code == 1
+
+    def test_bundles_client_falls_back_without_daemon(self, tmp_path, monkeypatch, capsys):
+        """Test the bundle hook validates in-process when no daemon is listening"""
+        monkeypatch.chdir(tmp_path)
+        bundle = tmp_path / "bundles" / "drs"
+        bundle.mkdir(parents=True)
+        (bundle / "databricks.yml").write_text("bundle:\n  name: drs\n")
+        with pytest.raises(SystemExit) as exc:
+            main(["--socket", str(tmp_path / "missing.sock"), "bundles",
+                  "bundles/drs/databricks.yml"])
+        assert exc.value.code == 1
+        assert "Missing 'resources' section" in capsys.readouterr().out
+
+    def test_deleted_files_evicted(self, tree):
+        """Test refresh drops findings for deleted files and for files below a deleted directory"""
+        daemon = CheckDaemon(tree)
+        (tree / "sub" / "c.yml").write_text("c: 1\n")
+        for name in ("a.yml", "b.yml", "sub/c.yml"):
+            daemon.findings(str(tree / name))
+        assert daemon.findings(str(tree / "missing.yml")) is None
+        assert len(daemon._findings) == 3
+
+        (tree / "b.yml").unlink()
+        (tree / "sub" / "c.yml").unlink()
+        (tree / "sub").rmdir()
+        daemon.refresh({str(tree / "b.yml"), str(tree / "sub")})
+        assert list(daemon._findings) == [(str(tree / "a.yml"), False)]
+
+    def test_findings_capped(self, tree):
+        """Test the least recently used findings are dropped beyond max_findings"""
+        daemon = CheckDaemon(tree, max_findings=2)
+        (tree / "c.yml").write_text("c: 1\n")
+        for name in ("a.yml", "b.yml", "a.yml", "c.yml"):
+            daemon.findings(str(tree / name))
+        assert list(daemon._findings) == [(str(tree / "a.yml"), False),
+                                          (str(tree / "c.yml"), False)]
+
+    def test_refresh_keeps_notebook_output_mode(self, tree):
+        """Test refresh recomputes an edited file in the mode it was memoized with"""
+        daemon = CheckDaemon(tree)
+        path = str(tree / "a.yml")
+        daemon.findings(path, notebook_outputs=True)
+        (tree / "a.yml").write_text(f"owner: {_email('carol')}\n")
+        daemon.refresh({path})
+        assert list(daemon._findings) == [(path, True)]
+        assert daemon.refreshed == 1
+
+    def test_rule_edit_marks_daemon_stale(self, tree):
+        """Test editing a loaded check's source stops the daemon answering with old rules"""
+        daemon = CheckDaemon(tree)
+        daemon.refresh({pii_scanner.__file__})
+        assert daemon.stale
+        response = daemon.handle({'command': 'pii', 'paths': ["a.yml"]})
+        assert response['stale'] is True
+
+    def test_serve_returns_when_sources_change(self, tmp_path, monkeypatch):
+        """Test serve shuts down and asks for a restart when a watched check source is edited"""
+        monkeypatch.chdir(tmp_path)
+        rules = tmp_path / "rules.py"
+        rules.write_text("RULES = 1\n")
+        monkeypatch.setitem(sys.modules, "scripts.fake_rules",
+                            types.SimpleNamespace(__file__=str(rules)))
+        ready = threading.Event()
+        result = []
+        thread = threading.Thread(
+            target=lambda: result.append(serve(tmp_path, tmp_path / "daemon.sock", 0.1, True,
+                                               ready)),
+            daemon=True)
+        thread.start()
+        assert ready.wait(10)
+
+        rules.write_text("RULES = 2\n")
+        thread.join(10)
+        assert result == [True]
+        assert not (tmp_path / "daemon.sock").exists()
+
+    def test_second_daemon_refused(self, tmp_path, daemon):
+        """Test serve refuses a socket another daemon is listening on"""
+        with pytest.raises(RuntimeError):
+            serve(tmp_path, daemon, polling=True)
+        assert os.path.exists(daemon)
@@ -0,0 +1,167 @@
+import json
+import os
+import stat
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from scripts.deploy_orchestrator import _state_key, build_graph, main, resolve_credentials
+from scripts.bundle_model import discover_bundles
+from scripts.parameter_loader import ParameterLoader, SecretCache
+
+BUNDLE_YML = """
+bundle:
+  name: {name}
+variables:
+  amic_environment:
+    default: sandbox
+workspace:
+  root_path: /Workspace/.bundle/${{bundle.name}}/${{var.amic_environment}}
+targets:
+  dev: {{}}
+  sandbox: {{}}
+"""
+
+# Records each call as JSON, sleeps, and fails for the bundle named in FAIL_BUNDLE
+FAKE_DATABRICKS = """\
+#!{python}
+import json, os, sys, time
+start = time.time()
+time.sleep(float(os.environ.get("FAKE_SLEEP", "0.3")))
+with open(os.environ["FAKE_LOG"], "a") as log:
+    log.write(json.dumps({{"cwd": os.path.basename(os.getcwd()), "args": sys.argv[1:],
+                          "host": os.environ.get("DATABRICKS_HOST"),
+                          "start": start, "end": time.time()}}) + "\\n")
+if os.path.basename(os.getcwd()) == os.environ.get("FAIL_BUNDLE"):
+    print("Error: deployment failed")
+    sys.exit(1)
+"""
+
+
+class FakeSecretsClient:
+    """Secrets Manager stand-in counting batch calls"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def batch_get_secret_value(self, SecretIdList, NextToken=None):
+        self.calls += 1
+        return {"SecretValues": [
+            {"Name": name, "SecretString": json.dumps({
+                "host": f"https://{name}.example.com",
+                "client_id": "client",
+                "client_secret": "secret",  # pragma: allowlist secret
+            })} for name in SecretIdList
+        ]}
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    for name in ["alpha", "beta"]:
+        bundle = tmp_path / "bundles" / name
+        bundle.mkdir(parents=True)
+        (bundle / "databricks.yml").write_text(BUNDLE_YML.format(name=name))
+
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    fake = bin_dir / "databricks"
+    fake.write_text(FAKE_DATABRICKS.format(python=sys.executable))
+    fake.chmod(fake.stat().st_mode | stat.S_IEXEC)
+
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("FAKE_LOG", str(tmp_path / "calls.log"))
+    return tmp_path
+
+
+def loader(client):
+    return ParameterLoader(secrets_client=client, secret_cache=SecretCache(), snapshot_path=None)
+
+
+def calls(workspace):
+    return [json.loads(line) for line in (workspace / "calls.log").read_text().splitlines()]
+
+
+def run(workspace, *args, client=None):
+    main(["--bundles-dir", str(workspace / "bundles"), *args],
+         loader=loader(client or FakeSecretsClient()))
+
+
+class TestDeployOrchestrator:
+    def test_sub_environments_get_own_state(self, workspace):
+        """Test each sub-environment resolves its own root path and so its own deployment state"""
+        bundles = discover_bundles(workspace / "bundles")
+        nodes = build_graph(bundles, loader(FakeSecretsClient()), ["dev"])
+
+        assert [node.name for node in nodes] == ["alpha [dev/deva]", "alpha [dev/devb]",
+                                                 "beta [dev/deva]", "beta [dev/devb]"]
+        assert [_state_key(node, {})[1] for node in nodes[:2]] == [
+            "/Workspace/.bundle/alpha/deva", "/Workspace/.bundle/alpha/devb"]
+        assert all(node.depends_on == [] for node in nodes)
+        assert nodes[1].command("databricks", "deploy") == [
+            "databricks", "bundle", "deploy", "--target", "dev", "--var", "amic_environment=devb"]
+
+    def test_shared_state_refused(self, workspace, capsys):
+        """Test sub-environments whose root path ignores them are refused before any CLI run"""
+        config = workspace / "bundles" / "alpha" / "databricks.yml"
+        config.write_text(config.read_text().replace("${var.amic_environment}", "${bundle.target}"))
+        with pytest.raises(SystemExit):
+            run(workspace, "--target", "dev")
+
+        assert "alpha [dev/deva] and alpha [dev/devb] share the deployment state" in (
+            capsys.readouterr().out)
+        assert not (workspace / "calls.log").exists()
+
+    def test_credentials_resolved_once_per_target(self):
+        """Test each target's secrets are fetched in one call and map to CLI variables"""
+        client = FakeSecretsClient()
+        credentials = resolve_credentials(loader(client), ["dev", "sandbox", "dev"])
+
+        assert client.calls == 2
+        assert credentials["dev"]["host"] == "https://databricks-dev-credentials.example.com"
+
+    def test_deploys_concurrently(self, workspace, capsys):
+        """Test independent nodes overlap and every node validates before deploying"""
+        run(workspace, "--jobs", "4")
+        out = capsys.readouterr().out
+
+        log = calls(workspace)
+        assert len(log) == 12  # (alpha, beta) x (deva, devb, sandbox) x (validate, deploy)
+        for bundle in ["alpha", "beta"]:
+            actions = [entry["args"][1] for entry in log if entry["cwd"] == bundle]
+            assert actions.count("validate") == actions.count("deploy") == 3
+
+        dev_hosts = {entry["host"] for entry in log if entry["args"][3] == "dev"}
+        assert dev_hosts == {"https://databricks-dev-credentials.example.com"}
+
+        starts = sorted(entry["start"] for entry in log)
+        ends = sorted(entry["end"] for entry in log)
+        assert starts[1] < ends[0], "no two CLI runs overlapped"
+        assert "sequential" in out and "All bundle targets deployed" in out
+
+    def test_fail_fast(self, workspace, monkeypatch, capsys):
+        """Test no new node starts after a failure"""
+        monkeypatch.setenv("FAIL_BUNDLE", "alpha")
+        with pytest.raises(SystemExit):
+            run(workspace, "--jobs", "1", "--validate-only")
+        out = capsys.readouterr().out
+
+        assert len(calls(workspace)) == 1
+        assert "FAILED alpha [dev/deva]" in out
+        assert "Error: deployment failed" in out
+        assert "beta [sandbox]: skipped" in out
+
+    def test_continue_after_failure(self, workspace, monkeypatch, capsys):
+        """Test other bundles still deploy when one fails"""
+        monkeypatch.setenv("FAIL_BUNDLE", "alpha")
+        with pytest.raises(SystemExit):
+            run(workspace, "--jobs", "2", "--on-failure", "continue", "--validate-only")
+        out = capsys.readouterr().out
+
+        assert "FAILED alpha [dev/devb]" in out
+        assert "FAILED alpha [sandbox]" in out
+        beta = sorted(entry["args"][-1] for entry in calls(workspace) if entry["cwd"] == "beta")
+        assert beta == ["amic_environment=deva", "amic_environment=devb", "sandbox"]
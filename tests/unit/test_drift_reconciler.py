@@ -0,0 +1,299 @@
+import hashlib
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from scripts.bundle_model import discover_bundles
+from scripts.drift_reconciler import (CatalogReader, FixtureCatalog, PageCache, declared_state,
+                                      fetch_state, main, reconcile)
+
+BUNDLE = """bundle:
+  name: drs
+
+include:
+  - resources/*.yml
+
+variables:
+  owner:
+    default: sp-sandbox
+
+targets:
+  sandbox:
+    default: true
+  dev:
+    variables:
+      owner: sp-dev
+"""
+
+RESOURCES = """resources:
+  schemas:
+    raw:
+      name: drs_raw
+      catalog_name: ${bundle.target}_raw
+      comment: DRS raw layer
+      grants:
+        - principal: ${var.owner}
+          privileges:
+            - USE_SCHEMA
+            - CREATE_VOLUME
+  volumes:
+    landing:
+      name: landing
+      catalog_name: ${bundle.target}_raw
+      schema_name: drs_raw
+      volume_type: EXTERNAL
+      storage_location: s3://lake/${bundle.target}/drs/landing/
+"""
+
+
+def _catalog_state():
+    """Live catalog: sandbox matches; dev lacks its volume, has an extra and a drifted schema"""
+    return {
+        "schemas": {
+            "sandbox_raw": [{"full_name": f"sandbox_raw.{name}", "comment": "DRS raw layer"}
+                            for name in ("default", "drs_raw", "information_schema")],
+            "dev_raw": [{"full_name": "dev_raw.drs_raw", "comment": "scratch"},
+                        {"full_name": "dev_raw.adhoc", "comment": None}],
+        },
+        "volumes": {
+            ("sandbox_raw", "drs_raw"): [{"full_name": "sandbox_raw.drs_raw.landing",
+                                          "volume_type": "EXTERNAL",
+                                          "storage_location": "s3://lake/sandbox/drs/landing"}],
+        },
+        "grants": {
+            "schema/sandbox_raw.drs_raw": [{"principal": "sp-sandbox",
+                                            "privileges": ["USE_SCHEMA", "CREATE_VOLUME"]}],
+            "schema/dev_raw.drs_raw": [{"principal": "sp-dev",
+                                        "privileges": ["USE_SCHEMA", "MODIFY"]}],
+        },
+    }
+
+
+class StubCatalog(ThreadingHTTPServer):
+    """Imitates the OIDC token endpoint and the paginated Unity Catalog list and grant endpoints"""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.state = _catalog_state()
+        self.requests = []
+        self.not_modified = 0
+        self.lock = threading.Lock()
+
+    @property
+    def host(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, payload=None, etag=None):
+        data = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self._send(200, {"access_token": "catalog-token", "token_type": "Bearer",
+                         "expires_in": 3600})
+
+    def _page(self, items, query, key):
+        size = int(query.get("max_results", ["100"])[0])
+        start = int(query.get("page_token", ["0"])[0])
+        page = {key: items[start:start + size]}
+        if start + size < len(items):
+            page["next_page_token"] = str(start + size)
+        return page
+
+    def do_GET(self):
+        server = self.server
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        with server.lock:
+            server.requests.append(self.path)
+        if self.headers.get("Authorization") != "Bearer catalog-token":
+            self._send(401, {"message": "invalid token"})
+            return
+
+        state = server.state
+        if url.path == "/api/2.1/unity-catalog/schemas":
+            catalog = query["catalog_name"][0]
+            if catalog not in state["schemas"]:
+                self._send(404, {"message": "CATALOG_DOES_NOT_EXIST"})
+                return
+            payload = self._page(state["schemas"][catalog], query, "schemas")
+        elif url.path == "/api/2.1/unity-catalog/volumes":
+            schema = (query["catalog_name"][0], query["schema_name"][0])
+            payload = self._page(state["volumes"].get(schema, []), query, "volumes")
+        elif url.path.startswith("/api/2.1/unity-catalog/permissions/"):
+            securable = url.path.removeprefix("/api/2.1/unity-catalog/permissions/")
+            payload = {"privilege_assignments": state["grants"].get(securable, [])}
+        else:
+            self._send(404, {"message": "ENDPOINT_NOT_FOUND"})
+            return
+
+        digest = hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+        etag = '"' + digest[:16] + '"'
+        if self.headers.get("If-None-Match") == etag:
+            with server.lock:
+                server.not_modified += 1
+            self._send(304, etag=etag)
+            return
+        self._send(200, payload, etag)
+
+
+@pytest.fixture
+def catalog():
+    server = StubCatalog()
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def bundles_dir(tmp_path):
+    (tmp_path / "bundles" / "drs" / "resources").mkdir(parents=True)
+    (tmp_path / "bundles" / "drs" / "databricks.yml").write_text(BUNDLE)
+    (tmp_path / "bundles" / "drs" / "resources" / "raw.yml").write_text(RESOURCES)
+    return tmp_path / "bundles"
+
+
+class Loader:
+    def __init__(self, host):
+        self.host = host
+
+    def get_databricks_config(self, target):
+        return {"host": self.host, "client_id": "sp-drift", "client_secret": "not-a-secret"}
+
+
+def _args(bundles_dir, tmp_path, *extra):
+    return ["--bundles-dir", str(bundles_dir), "--cache", str(tmp_path / "pages.json"),
+            "--token-cache", str(tmp_path / "tokens.json"), "--page-size", "1", *extra]
+
+
+EXPECTED = [
+    "CATALOG DRIFT FOUND:",
+    "  [dev] drifted schema dev_raw.drs_raw ({raw})",
+    "      comment 'scratch' != declared 'DRS raw layer'",
+    "      grants: sp-dev lacks CREATE_VOLUME",
+    "      grants: sp-dev also has MODIFY",
+    "  [dev] missing volume dev_raw.drs_raw.landing ({raw})",
+    "  [dev] extra schema dev_raw.adhoc",
+]
+
+
+class TestDeclaredState:
+    def test_targets_are_interpolated(self, bundles_dir):
+        """Test declarations resolve per target with normalized fields and grants"""
+        state = declared_state(discover_bundles(bundles_dir))
+        assert sorted(state) == ["dev", "sandbox"]
+        volume = state["dev"]["volume", "dev_raw.drs_raw.landing"]
+        assert volume.fields["storage_location"] == "s3://lake/dev/drs/landing/"
+        assert volume.grants is None
+        assert state["dev"]["schema", "dev_raw.drs_raw"].grants == {
+            "sp-dev": {"USE_SCHEMA", "CREATE_VOLUME"}}
+
+    def test_unresolved_principal_skips_grants(self, bundles_dir):
+        """Test grants naming an unresolved principal are not compared, so none read as drift"""
+        config = bundles_dir / "drs" / "databricks.yml"
+        config.write_text(config.read_text().replace("owner: sp-dev", "owner: ${var.missing}"))
+        declared = declared_state(discover_bundles(bundles_dir), ["dev"])
+        schema = declared["dev"]["schema", "dev_raw.drs_raw"]
+        assert schema.grants is None
+
+        actual = {("schema", "dev_raw.drs_raw"): {"comment": "DRS raw layer"}}
+        grants = {("schema", "dev_raw.drs_raw"): {"sp-dev": {"USE_SCHEMA", "MODIFY"}}}
+        state = {"dev": (actual, grants, ({"dev_raw"}, {"dev_raw.drs_raw"}))}
+        drift = reconcile({"dev": {key: declared["dev"][key] for key in actual}}, state)
+        assert drift == []
+
+
+class TestReconcile:
+    def test_missing_extra_and_drifted(self, catalog, bundles_dir, tmp_path, capsys):
+        """Test the CLI reports every kind of drift against the stand-in catalog"""
+        with pytest.raises(SystemExit):
+            main(_args(bundles_dir, tmp_path), loader=Loader(catalog.host))
+        raw = bundles_dir / "drs" / "resources" / "raw.yml"
+        assert capsys.readouterr().out.splitlines() == [line.format(raw=raw) for line in EXPECTED]
+        # The sandbox schema listing is three one-item pages
+        assert sum("catalog_name=sandbox_raw" in path and "/schemas" in path
+                   for path in catalog.requests) == 3
+
+    def test_pages_are_revalidated(self, catalog, bundles_dir, tmp_path, capsys):
+        """Test a second run revalidates every cached page instead of downloading it"""
+        for _ in range(2):
+            with pytest.raises(SystemExit):
+                main(_args(bundles_dir, tmp_path), loader=Loader(catalog.host))
+        first, second = capsys.readouterr().err.splitlines()
+        pages = int(first.split()[0])
+        assert second == f"0 catalog pages fetched, {pages} unchanged since the last run"
+        assert catalog.not_modified == pages
+
+        catalog.state["schemas"]["dev_raw"][0]["comment"] = "DRS raw layer"
+        catalog.state["schemas"]["dev_raw"].pop()
+        with pytest.raises(SystemExit):
+            main(_args(bundles_dir, tmp_path, "--target", "dev"), loader=Loader(catalog.host))
+        out = capsys.readouterr().out
+        assert "comment" not in out and "adhoc" not in out
+
+    def test_record_and_replay(self, catalog, bundles_dir, tmp_path, capsys):
+        """Test a recording replays through the fixture backend with the same report"""
+        fixture = tmp_path / "catalog.json"
+        with pytest.raises(SystemExit):
+            main(_args(bundles_dir, tmp_path, "--no-cache", "--record", str(fixture)),
+                 loader=Loader(catalog.host))
+        recorded = capsys.readouterr().out
+
+        with pytest.raises(SystemExit):
+            main(_args(bundles_dir, tmp_path, "--no-cache", "--fixture", str(fixture)))
+        assert capsys.readouterr().out == recorded
+
+    def test_fixture_backend(self, bundles_dir, tmp_path):
+        """Test a shared catalog does not flag resources another target declares"""
+        declared = declared_state(discover_bundles(bundles_dir), ["sandbox"])
+        pages = {
+            "/api/2.1/unity-catalog/schemas?catalog_name=sandbox_raw&max_results=100": {
+                "etag": "v1", "body": {"schemas": [{"full_name": "sandbox_raw.drs_raw",
+                                                    "comment": "DRS raw layer"}]}},
+            "/api/2.1/unity-catalog/volumes?catalog_name=sandbox_raw&max_results=100"
+            "&schema_name=drs_raw": {
+                "body": {"volumes": [{"catalog_name": "sandbox_raw", "schema_name": "drs_raw",
+                                      "name": "landing", "volume_type": "external",
+                                      "storage_location": "s3://lake/sandbox/drs/landing/"}]}},
+            "/api/2.1/unity-catalog/permissions/schema/sandbox_raw.drs_raw?": {
+                "body": {"privilege_assignments": [{"principal": "sp-sandbox",
+                                                    "privileges": ["CREATE_VOLUME",
+                                                                   "USE_SCHEMA"]}]}},
+        }
+        (tmp_path / "catalog.json").write_text(json.dumps({"pages": pages}))
+        cache = PageCache(tmp_path / "pages.json")
+        reader = CatalogReader(FixtureCatalog(tmp_path / "catalog.json"), cache, page_size=100)
+        state = fetch_state(reader, declared["sandbox"], jobs=2)
+        assert reconcile(declared, {"sandbox": state}) == []
+        assert (reader.fetched, reader.revalidated) == (3, 0)
+
+        cache.save()
+        reader = CatalogReader(FixtureCatalog(tmp_path / "catalog.json"),
+                               PageCache(tmp_path / "pages.json"), 100)
+        fetch_state(reader, declared["sandbox"], jobs=2)
+        assert (reader.fetched, reader.revalidated) == (2, 1)
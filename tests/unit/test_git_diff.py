@@ -0,0 +1,107 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from scripts import pii_scanner, validate_bundles
+from scripts.git_diff import added_lines, changed_files, parse_added_lines
+
+SAMPLE_DIFF = """\
+diff --git a/bundles/drs/databricks.yml b/bundles/drs/databricks.yml
+index 1111111..2222222 100644
+--- a/bundles/drs/databricks.yml
++++ b/bundles/drs/databricks.yml
+@@ -3,0 +4,2 @@ bundle:
++owner: a
++++ not a header
+@@ -10 +12 @@ include:
+-old: 1
++new: 1
+diff --git a/gone.yml b/gone.yml
+deleted file mode 100644
+--- a/gone.yml
++++ /dev/null
+@@ -1 +0,0 @@
+-x: 1
+"""
+
+
+def _git(repo, *args):
+    subprocess.run(["git", "-c", "user.name=t", "-c", "user.email=t@localhost", *args],
+                   cwd=repo, check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    _git(tmp_path, "init", "-q")
+    (tmp_path / "clean.yml").write_text("a: 1\nb: 2\n")
+    (tmp_path / "old.yml").write_text("ssn: 123-45-6789\n")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-q", "-m", "base")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+class TestGitDiff:
+    def test_parse_added_lines(self):
+        """Test hunk headers map added lines to new-file line numbers"""
+        assert parse_added_lines(SAMPLE_DIFF) == {
+            "bundles/drs/databricks.yml": [(4, ["owner: a", "++ not a header"]), (12, ["new: 1"])],
+        }
+
+    def test_changed_files_and_added_lines(self, repo):
+        """Test changed paths and added lines come from the working tree diff"""
+        (repo / "clean.yml").write_text("a: 1\nphone: 555-123-4567\nb: 2\n")
+        assert changed_files("HEAD") == ["clean.yml"]
+        assert added_lines("HEAD") == {"clean.yml": [(2, ["phone: 555-123-4567"])]}
+
+    def test_pii_scanner_since_scans_only_added_lines(self, repo, capsys):
+        """Test --since reports new hits but not pre-existing ones"""
+        (repo / "clean.yml").write_text("a: 1\nphone: 555-123-4567\nb: 2\n")
+        (repo / "old.yml").write_text("ssn: 123-45-6789\nnote: fine\n")
+
+        with pytest.raises(SystemExit):
+            pii_scanner.main(["--since", "HEAD"])
+
+        out = capsys.readouterr().out
+        assert "clean.yml:2 - phone: 555-123-4567" in out
+        assert "old.yml" not in out
+
+    def test_pii_scanner_staged_rule_change_scans_everything(self, repo, capsys):
+        """Test a staged change to the rules falls back to a full scan"""
+        (repo / "scripts").mkdir()
+        (repo / "scripts" / "pii_scanner.py").write_text("# rules\n")
+        _git(repo, "add", "scripts/pii_scanner.py")
+
+        with pytest.raises(SystemExit):
+            pii_scanner.main(["--staged", "--no-cache"])
+
+        assert "old.yml:1 - ssn: 123-45-6789" in capsys.readouterr().out
+
+    def test_pii_scanner_deleted_rule_lines_scan_everything(self, repo, capsys):
+        """Test a rule input change that only deletes lines still falls back to a full scan"""
+        (repo / "scripts").mkdir()
+        (repo / "scripts" / "notebook_stream.py").write_text("# cells\n# outputs\n")
+        _git(repo, "add", "scripts/notebook_stream.py")
+        _git(repo, "commit", "-q", "-m", "cells")
+        (repo / "scripts" / "notebook_stream.py").write_text("# cells\n")
+
+        with pytest.raises(SystemExit):
+            pii_scanner.main(["--since", "HEAD", "--no-cache"])
+
+        assert "old.yml:1 - ssn: 123-45-6789" in capsys.readouterr().out
+
+    def test_validate_bundles_since(self, repo, capsys):
+        """Test --since validates only changed bundle files"""
+        (repo / "bundles" / "a").mkdir(parents=True)
+        (repo / "bundles" / "a" / "databricks.yml").write_text("bundle:\n  name: a\n")
+
+        _git(repo, "add", ".")
+        with pytest.raises(SystemExit):
+            validate_bundles.main(["--staged", "--no-cache"])
+
+        assert "bundles/a/databricks.yml: Missing 'resources' section" in capsys.readouterr().out
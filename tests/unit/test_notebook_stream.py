@@ -0,0 +1,83 @@
+import io
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from scripts.notebook_stream import _Reader, _walk, iter_cells
+
+NOTEBOOK = {
+    "cells": [
+        {"cell_type": "code", "metadata": {"title": "say \"hi\" \\ é"},
+         "source": "print('one')\nprint('two')", "outputs": []},
+        {
+            "cell_type": "code",
+            "metadata": {},
+            "source": ["x = \"\\u00e9\\t\"\n", "y = 2\n"],
+            "outputs": [
+                {"output_type": "stream", "text": ["line 1\n", "line 2\n"]},
+                {"output_type": "execute_result", "execution_count": 3,
+                 "data": {"text/plain": ["42"], "image/png": "A" * 5000}},
+            ],
+        },
+    ],
+    "metadata": {"notebookMetadata": {"commandId": 7830713478116755,
+                                      "flags": [True, False, None, -1.5e3]}},
+    "nbformat": 4,
+}
+
+
+@pytest.fixture
+def notebook(tmp_path):
+    path = tmp_path / "nb.ipynb"
+    path.write_text(json.dumps(NOTEBOOK, indent=1))
+    return path
+
+
+class TestNotebookStream:
+    def test_sources(self, notebook):
+        """Test cell sources are joined per cell, decoding escapes"""
+        assert list(iter_cells(notebook)) == [
+            (0, "source", "print('one')\nprint('two')"),
+            (1, "source", "x = \"\\u00e9\\t\"\ny = 2\n"),
+        ]
+
+    def test_outputs_opt_in(self, notebook):
+        """Test text outputs are read only when requested, never images"""
+        outputs = [cell for cell in iter_cells(notebook, outputs=True) if cell[1] == "output"]
+        assert outputs == [(1, "output", "line 1\nline 2\n"), (1, "output", "42")]
+
+    @pytest.mark.parametrize("read_size", [1, 2, 3, 7, 64])
+    def test_tiny_reads(self, notebook, read_size):
+        """Test escapes and tokens split across refills parse the same"""
+        assert list(iter_cells(notebook, outputs=True, read_size=read_size)) == list(
+            iter_cells(notebook, outputs=True))
+
+    def test_skipped_strings_are_not_buffered(self):
+        """Test a large output string never accumulates in the read buffer"""
+        document = json.dumps(
+            {"cells": [{"source": "a", "outputs": [{"data": {"image/png": "B" * 200000}}]}]})
+        reader = _Reader(io.StringIO(document), read_size=1024)
+        largest = 0
+        original = reader._fill
+
+        def fill():
+            nonlocal largest
+            filled = original()
+            largest = max(largest, len(reader.buffer))
+            return filled
+
+        reader._fill = fill
+        assert [text for _, text in _walk(reader, (), outputs=True)] == ["a"]
+        assert largest <= 2048
+
+    def test_invalid_json(self, tmp_path):
+        """Test truncated notebooks raise ValueError"""
+        path = tmp_path / "bad.ipynb"
+        path.write_text('{"cells": [{"source": "abc')
+        with pytest.raises(ValueError):
+            list(iter_cells(path))
@@ -1,12 +1,15 @@
 import pytest
+import json
 import os
+import subprocess
 import sys
 from pathlib import Path
 
 # Add project root to Python path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from scripts.parameter_loader import ParameterLoader
+from scripts.parameter_loader import (ParameterLoader, SecretCache, compile_snapshot,
+                                     default_snapshot_path, main)
 
 class TestParameterLoader:
     def test_load_config(self):
@@ -32,4 +35,242 @@ def test_environment_permissions(self):
         """Test getting environment permissions"""
         loader = ParameterLoader()
         permissions = loader.get_environment_permissions("sandbox")
-        assert isinstance(permissions, list)
\ No newline at end of file
+        assert isinstance(permissions, list)
+
+class FakeSecretsClient:
+    """Stand-in for the Secrets Manager client that records API calls"""
+
+    def __init__(self, secrets, batch_supported=True):
+        self.secrets = secrets
+        self.batch_supported = batch_supported
+        self.calls = []
+
+    def batch_get_secret_value(self, SecretIdList, NextToken=None):
+        self.calls.append(("batch", tuple(SecretIdList)))
+        if not self.batch_supported:
+            raise AttributeError("batch_get_secret_value")
+        return {
+            "SecretValues": [
+                {"Name": name, "SecretString": json.dumps(self.secrets[name])}
+                for name in SecretIdList if name in self.secrets
+            ],
+            "Errors": [{"SecretId": name} for name in SecretIdList if name not in self.secrets],
+        }
+
+    def get_secret_value(self, SecretId):
+        self.calls.append(("get", SecretId))
+        if SecretId not in self.secrets:
+            raise KeyError(SecretId)
+        return {"SecretString": json.dumps(self.secrets[SecretId])}
+
+
+DEV_SECRET = {
+    "host": "https://dev.cloud.databricks.com",
+    "client_id": "dev-client",
+    "client_secret": "dev-secret",  # pragma: allowlist secret
+    "service_principal_id": "dev-sp",
+}
+
+
+class TestSecretResolution:
+    def test_dev_config_single_batch_call(self):
+        """Test all placeholders for one secret cost a single batch call"""
+        client = FakeSecretsClient({"databricks-dev-credentials": DEV_SECRET})
+        loader = ParameterLoader(secrets_client=client, secret_cache=SecretCache())
+
+        config = loader.get_databricks_config("dev")
+        assert config["host"] == "https://dev.cloud.databricks.com"
+        assert config["client_secret"] == "dev-secret"  # pragma: allowlist secret
+        assert client.calls == [("batch", ("databricks-dev-credentials",))]
+
+        loader.get_databricks_config("dev")
+        assert len(client.calls) == 1
+
+    def test_falls_back_to_per_secret_calls(self):
+        """Test secrets are fetched one by one when batch calls are unavailable"""
+        client = FakeSecretsClient({"databricks-dev-credentials": DEV_SECRET},
+                                   batch_supported=False)
+        loader = ParameterLoader(secrets_client=client, secret_cache=SecretCache())
+
+        assert loader.get_databricks_config("dev")["client_id"] == "dev-client"
+        assert client.calls == [("batch", ("databricks-dev-credentials",)),
+                                ("get", "databricks-dev-credentials")]
+
+    def test_missing_secret_uses_fallback_once(self):
+        """Test an unknown secret falls back without repeated API calls"""
+        client = FakeSecretsClient({})
+        loader = ParameterLoader(secrets_client=client, secret_cache=SecretCache())
+
+        config = loader.get_databricks_config("sandbox")
+        assert config["host"] == "https://dbc-0c2248b3-6656.cloud.databricks.com"
+        assert client.calls == [("batch", ("databricks-sandbox-credentials",)),
+                                ("get", "databricks-sandbox-credentials")]
+
+    def test_fallback_secret_from_environment(self, monkeypatch):
+        """Test the sandbox fallback reads its client secret from the environment, not source"""
+        loader = ParameterLoader(secrets_client=FakeSecretsClient({}), secret_cache=SecretCache())
+        monkeypatch.delenv("DATABRICKS_CLIENT_SECRET_SANDBOX", raising=False)
+        assert loader._get_secret("databricks-sandbox-credentials", "client_secret") == (
+            "FALLBACK_NOT_FOUND:client_secret")
+        monkeypatch.setenv("DATABRICKS_CLIENT_SECRET_SANDBOX", "from-env")
+        assert loader._get_secret("databricks-sandbox-credentials", "client_secret") == "from-env"
+
+    def test_cache_shared_and_expires(self):
+        """Test the cache is reused across loaders until the TTL passes"""
+        now = [0.0]
+        cache = SecretCache(ttl=60, clock=lambda: now[0])
+        client = FakeSecretsClient({"databricks-dev-credentials": DEV_SECRET})
+
+        ParameterLoader(secrets_client=client, secret_cache=cache).get_databricks_config("dev")
+        ParameterLoader(secrets_client=client, secret_cache=cache).get_databricks_config("dev")
+        assert len(client.calls) == 1
+
+        now[0] = 61
+        ParameterLoader(secrets_client=client, secret_cache=cache).get_databricks_config("dev")
+        assert len(client.calls) == 2
+
+    def test_rotated_secret_picked_up(self):
+        """Test one loader sees a rotated secret once the cache TTL passes"""
+        now = [0.0]
+        client = FakeSecretsClient({"databricks-dev-credentials": DEV_SECRET})
+        loader = ParameterLoader(secrets_client=client,
+                                 secret_cache=SecretCache(ttl=60, clock=lambda: now[0]))
+        assert loader.get_databricks_config("dev")["client_id"] == "dev-client"
+
+        client.secrets["databricks-dev-credentials"] = dict(DEV_SECRET, client_id="rotated-client")
+        assert loader.get_databricks_config("dev")["client_id"] == "dev-client"
+        now[0] = 61
+        assert loader.get_databricks_config("dev")["client_id"] == "rotated-client"
+
+    def test_failure_is_retried(self):
+        """Test a failed lookup is not reused once the short failure TTL passes"""
+        now = [0.0]
+        cache = SecretCache(ttl=60, failure_ttl=5, clock=lambda: now[0])
+        client = FakeSecretsClient({}, batch_supported=False)
+
+        assert ParameterLoader(secrets_client=client, secret_cache=cache)._get_secret(
+            "databricks-dev-credentials", "client_id") == "SECRET_ERROR:client_id"
+        client.secrets["databricks-dev-credentials"] = DEV_SECRET
+        now[0] = 6
+        assert ParameterLoader(secrets_client=client, secret_cache=cache)._get_secret(
+            "databricks-dev-credentials", "client_id") == "dev-client"
+
+
+class TestLazyLoading:
+    def test_construction_parses_nothing(self, monkeypatch):
+        """Test configs are parsed on first access, not in the constructor"""
+        parsed = []
+        monkeypatch.setattr("scripts.parameter_loader.load_yaml",
+                            lambda path: parsed.append(Path(path).name) or {})
+
+        loader = ParameterLoader()
+        assert parsed == []
+        assert "dev" in loader.env_configs
+        assert parsed == []
+
+        loader.get_sub_environments("dev")
+        assert parsed == ["config.yml"]
+
+    def test_environment_mapping(self):
+        """Test the lazy mapping lists the environment folders"""
+        loader = ParameterLoader()
+        assert list(loader.env_configs) == ["dev", "sandbox", "test"]
+        assert "missing" not in loader.env_configs
+        assert loader.get_sub_environments("dev") == ["deva", "devb"]
+
+    def test_interpolation_single_pass(self, monkeypatch):
+        """Test secrets and environment variables resolve in one substitution pass"""
+        monkeypatch.setenv("LAKEHOUSE_REGION", "eu-north-1")
+        client = FakeSecretsClient({"databricks-dev-credentials": DEV_SECRET})
+        loader = ParameterLoader(secrets_client=client, secret_cache=SecretCache())
+
+        value = ("${SECRET:databricks-dev-credentials:host}/${LAKEHOUSE_REGION}"
+                 "/${UNSET_LAKEHOUSE_VAR}")
+        assert loader._resolve_env_vars(value) == (
+            "https://dev.cloud.databricks.com/eu-north-1/${UNSET_LAKEHOUSE_VAR}")
+
+
+@pytest.fixture
+def config_tree(tmp_path):
+    """Copy of parameters.yml and the environment configs in a scratch directory"""
+    (tmp_path / "parameters.yml").write_text(Path("parameters.yml").read_text())
+    for env in ["sandbox", "dev", "test"]:
+        (tmp_path / "environments" / env).mkdir(parents=True)
+        (tmp_path / "environments" / env / "config.yml").write_text(
+            Path(f"environments/{env}/config.yml").read_text())
+    return tmp_path
+
+
+def _loader(tree, **kwargs):
+    return ParameterLoader(tree / "parameters.yml", tree / "environments",
+                           snapshot_path=tree / ".cache" / "snapshot.json", **kwargs)
+
+
+class TestConfigSnapshot:
+    def test_compile_and_load_without_yaml(self, config_tree, monkeypatch):
+        """Test a compiled snapshot serves every lookup without parsing YAML"""
+        snapshot_path = config_tree / ".cache" / "snapshot.json"
+        main(["compile", "--config", str(config_tree / "parameters.yml"),
+              "--environments-dir", str(config_tree / "environments"),
+              "--output", str(snapshot_path)])
+        environments = json.loads(snapshot_path.read_text())["environments"]
+        assert set(environments) == {"sandbox", "dev", "test"}
+
+        def fail(path):
+            raise AssertionError(f"parsed {path}")
+        monkeypatch.setattr("scripts.parameter_loader.load_yaml", fail)
+
+        loader = _loader(config_tree)
+        assert loader.get_sub_environments("dev") == ["deva", "devb"]
+        assert loader.config["deployment"]["default_target"] == "sandbox"
+
+    def test_snapshot_rebuilt_when_source_changes(self, config_tree):
+        """Test an edited environment config triggers an automatic rebuild"""
+        compile_snapshot(config_tree / "parameters.yml", config_tree / "environments",
+                         config_tree / ".cache" / "snapshot.json")
+
+        dev_config = config_tree / "environments" / "dev" / "config.yml"
+        dev_config.write_text(dev_config.read_text().replace("  - devb\n", "  - devb\n  - devc\n"))
+
+        assert _loader(config_tree).get_sub_environments("dev") == ["deva", "devb", "devc"]
+        snapshot = json.loads((config_tree / ".cache" / "snapshot.json").read_text())
+        assert snapshot["environments"]["dev"]["sub_environments"] == ["deva", "devb", "devc"]
+
+    def test_snapshot_keyed_on_sources(self, config_tree, tmp_path_factory):
+        """Test loaders over other config sources neither read nor overwrite a snapshot"""
+        other = tmp_path_factory.mktemp("other")
+        (other / "parameters.yml").write_text((config_tree / "parameters.yml").read_text())
+        (other / "environments" / "qa").mkdir(parents=True)
+        (other / "environments" / "qa" / "config.yml").write_text(
+            (config_tree / "environments" / "dev" / "config.yml").read_text())
+        ours = default_snapshot_path(config_tree / "parameters.yml", config_tree / "environments")
+        assert ours != default_snapshot_path(other / "parameters.yml", other / "environments")
+
+        snapshot_path = config_tree / ".cache" / "snapshot.json"
+        compile_snapshot(config_tree / "parameters.yml", config_tree / "environments",
+                         snapshot_path)
+        written = snapshot_path.read_text()
+        loader = ParameterLoader(other / "parameters.yml", other / "environments",
+                                 snapshot_path=snapshot_path)
+        assert list(loader.env_configs) == ["qa"]
+        assert snapshot_path.read_text() == written
+
+    def test_compile_rejects_invalid_config(self, config_tree):
+        """Test compile validates required Databricks keys"""
+        (config_tree / "environments" / "qa").mkdir()
+        (config_tree / "environments" / "qa" / "config.yml").write_text("databricks:\n  host: x\n")
+
+        with pytest.raises(ValueError,
+                           match="qa/config.yml: databricks missing required key: client_id"):
+            compile_snapshot(config_tree / "parameters.yml", config_tree / "environments",
+                             config_tree / ".cache" / "snapshot.json")
+
+    def test_boto3_imported_only_for_secrets(self):
+        """Test importing and using the loader without secrets does not import boto3"""
+        code = (
+            "import sys\n"
+            "from scripts.parameter_loader import ParameterLoader\n"
+            "ParameterLoader().get_sub_environments('dev')\n"
+            "assert 'boto3' not in sys.modules\n"
+        )
+        subprocess.run([sys.executable, "-c", code], check=True)
@@ -0,0 +1,142 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from scripts.bundle_model import discover_bundles
+from scripts.parameter_loader import ParameterLoader
+from scripts.permission_matrix import Grant, PermissionMatrix, compile_matrix, main
+
+BUNDLE = """bundle:
+  name: drs
+
+include:
+  - resources/*.yml
+
+engineers: &engineers
+  - level: CAN_MANAGE
+    group_name: DataEngineers
+  - level: CAN_VIEW
+    group_name: users
+
+variables:
+  owner:
+    default: sp-sandbox
+
+resources:
+  pipelines:
+    ingest:
+      name: "[${bundle.target}] ingest"
+      permissions:
+        - level: CAN_RUN
+          group_name: Operators
+
+targets:
+  sandbox:
+    permissions: *engineers
+  dev:
+    permissions:
+      - level: CAN_MANAGE
+        group_name: DataEngineers
+    variables:
+      owner: sp-dev
+"""
+
+SCHEMA = """resources:
+  schemas:
+    raw:
+      name: drs_raw
+      catalog_name: ${bundle.target}_raw
+      grants:
+        - principal: ${var.owner}
+          privileges:
+            - USE_SCHEMA
+            - MANAGE
+"""
+
+ENVIRONMENT = """environment:
+  name: {name}
+permissions:
+  - level: CAN_MANAGE
+    group_name: Admins
+  - level: CAN_VIEW
+    user_name: {viewer}
+"""
+
+
+@pytest.fixture
+def repo(tmp_path):
+    (tmp_path / "bundles" / "drs" / "resources").mkdir(parents=True)
+    (tmp_path / "bundles" / "drs" / "databricks.yml").write_text(BUNDLE)
+    (tmp_path / "bundles" / "drs" / "resources" / "raw.schema.yml").write_text(SCHEMA)
+    for name, viewer in (("sandbox", "analyst"), ("dev", "auditor")):
+        (tmp_path / "environments" / name).mkdir(parents=True)
+        (tmp_path / "environments" / name / "config.yml").write_text(
+            ENVIRONMENT.format(name=name, viewer=viewer))
+    (tmp_path / "parameters.yml").write_text("databricks:\n  environments: {}\n")
+    return tmp_path
+
+
+def _loader(repo):
+    return ParameterLoader(repo / "parameters.yml", repo / "environments", snapshot_path=None)
+
+
+def _matrix(repo):
+    return compile_matrix(discover_bundles(repo / "bundles"), _loader(repo))
+
+
+class TestPermissionMatrix:
+    def test_sources_are_merged_and_interpolated(self, repo):
+        """Test bundle, resource and environment permissions and grants all land in the index"""
+        matrix = _matrix(repo)
+        assert matrix.grants_for("DataEngineers", "sandbox") == {("drs", "CAN_MANAGE")}
+        assert matrix.grants_for("Operators", "dev") == {("drs.pipelines.ingest", "CAN_RUN")}
+        assert matrix.grants_for("sp-dev") == {
+            "dev": {("drs.schemas.raw", "USE_SCHEMA"), ("drs.schemas.raw", "MANAGE")}}
+        assert matrix.principals_for("sandbox", "environment") == {"Admins", "analyst"}
+        assert matrix.names["dev", "drs.schemas.raw"] == "dev_raw.drs_raw"
+        assert matrix.has("sp-sandbox", "sandbox", "drs.schemas.raw", "MANAGE")
+
+    def test_bulk_queries(self, repo):
+        """Test bulk lookups answer many principals and grant checks in one call"""
+        matrix = _matrix(repo)
+        assert matrix.bulk_grants(["users", "nobody"], targets=["sandbox"]) == {
+            "users": {"sandbox": {("drs", "CAN_VIEW")}}, "nobody": {}}
+        assert matrix.bulk_has([("users", "dev", "drs", "CAN_VIEW"),
+                                ("users", "sandbox", "drs", "CAN_VIEW")]) == [False, True]
+
+    def test_diff(self, repo):
+        """Test the environment diff lines up resources by bundle key rather than resolved name"""
+        only_sandbox, only_dev = _matrix(repo).diff("sandbox", "dev")
+        assert only_sandbox == {("users", "drs", "CAN_VIEW"),
+                                ("analyst", "environment", "CAN_VIEW"),
+                                ("sp-sandbox", "drs.schemas.raw", "USE_SCHEMA"),
+                                ("sp-sandbox", "drs.schemas.raw", "MANAGE")}
+        assert only_dev == {("auditor", "environment", "CAN_VIEW"),
+                            ("sp-dev", "drs.schemas.raw", "USE_SCHEMA"),
+                            ("sp-dev", "drs.schemas.raw", "MANAGE")}
+
+    def test_duplicates_indexed_once(self):
+        """Test a grant declared twice is stored once in every index"""
+        grant = Grant("g", "dev", "s", "SELECT")
+        matrix = PermissionMatrix([grant, grant, Grant("g", "dev", "s", "MODIFY")])
+        assert len(matrix) == 2
+        assert matrix.principals_for("dev", "s", "SELECT") == {"g"}
+        assert matrix.principals_for("dev", "s") == {"g"}
+
+    def test_main(self, repo, capsys):
+        """Test the CLI principal and diff queries"""
+        bundles_dir = str(repo / "bundles")
+        main(["--bundles-dir", bundles_dir, "--principal", "sp-dev"], loader=_loader(repo))
+        assert capsys.readouterr().out.splitlines() == [
+            "sp-dev:",
+            "  dev: drs.schemas.raw (dev_raw.drs_raw) MANAGE",
+            "  dev: drs.schemas.raw (dev_raw.drs_raw) USE_SCHEMA",
+        ]
+
+        with pytest.raises(SystemExit):
+            main(["--bundles-dir", bundles_dir, "--diff", "sandbox", "dev"], loader=_loader(repo))
+        assert "+ auditor environment CAN_VIEW" in capsys.readouterr().out.splitlines()
@@ -1,42 +1,72 @@
 import pytest
 import re
+import sys
 from pathlib import Path
 
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from scripts.notebook_stream import iter_cells
+from scripts.pii_scanner import (DEFAULT_BASELINE_PATH, EXCLUDE_DIRS, EXCLUDE_FILES,
+                                 baseline_path_key, finding_fingerprint, is_notebook,
+                                 load_baseline)
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+@pytest.fixture(scope="module")
+def scanned_files(repo_index):
+    """(path, text) for every file `pii_scanner.py --root .` scans, read once for all patterns"""
+    files = []
+    for file_path in map(Path, repo_index.paths(exclude_dirs=EXCLUDE_DIRS,
+                                                exclude_files=EXCLUDE_FILES)):
+        try:
+            if is_notebook(file_path):
+                # Only cell sources; notebook metadata such as commandId is not code
+                content = '\n'.join(text for _, _, text in iter_cells(file_path))
+            else:
+                content = repo_index.read_text(file_path, errors='ignore')
+        except Exception:
+            continue
+        files.append((file_path, content))
+    return files
+
+@pytest.fixture(scope="module")
+def baseline():
+    """Fingerprints of findings accepted in the committed baseline"""
+    return load_baseline(PROJECT_ROOT / DEFAULT_BASELINE_PATH)
+
 class TestPIIScan:
     def test_no_ssn_patterns(self):
         """Test no SSN patterns in code"""
         ssn_pattern = r'\b\d{3}-\d{2}-\d{4}\b'
-        self._scan_files_for_pattern(ssn_pattern, "SSN")
+        self._scan_files_for_pattern(ssn_pattern, "SSN", 'ssn')
 
     def test_no_credit_card_patterns(self):
         """Test no credit card patterns in code"""
         cc_pattern = r'\b\d{4}[\s-]?\d{4}[\s-]?\d{4}[\s-]?\d{4}\b'
-        self._scan_files_for_pattern(cc_pattern, "Credit Card")
+        self._scan_files_for_pattern(cc_pattern, "Credit Card", 'credit_card')
 
     def test_no_phone_patterns(self):
         """Test no phone number patterns in code"""
         phone_pattern = r'\b\d{3}-\d{3}-\d{4}\b'
-        self._scan_files_for_pattern(phone_pattern, "Phone Number")
+        self._scan_files_for_pattern(phone_pattern, "Phone Number", 'phone')
+
+    @pytest.fixture(autouse=True)
+    def _files(self, scanned_files, baseline):
+        self.scanned_files = scanned_files
+        self.baseline = baseline
 
-    def _scan_files_for_pattern(self, pattern, pattern_name):
-        """Scan files for PII patterns"""
-        exclude_dirs = {'.git', 'node_modules', 'tests', 'fixtures', '__pycache__', '.databricks'}
-        exclude_files = {'*.lock', '*.lock.hcl', 'uv.lock', '*.ipynb', '*.parquet', '*.exe', '*.dll', '*.bin'}
-        
+    def _scan_files_for_pattern(self, pattern, pattern_name, rule):
+        """Scan files for PII patterns, skipping findings accepted in the baseline"""
         violations = []
-        
-        for file_path in Path('.').rglob('*'):
-            if file_path.is_file() and not any(exc in str(file_path) for exc in exclude_dirs):
-                if not any(file_path.match(pattern) for pattern in exclude_files):
-                    try:
-                        content = file_path.read_text(encoding='utf-8', errors='ignore')
-                        matches = re.findall(pattern, content, re.IGNORECASE)
-                        if matches:
-                            # Filter out test data and hashes
-                            real_matches = [m for m in matches if not any(x in str(m).lower() for x in ['test', 'example', 'hash', 'sha256'])]
-                            if real_matches:
-                                violations.append(f"{file_path}: {real_matches}")
-                    except Exception:
-                        continue
-        
+
+        for file_path, content in self.scanned_files:
+            matches = re.findall(pattern, content, re.IGNORECASE)
+            if matches:
+                path_key = baseline_path_key(file_path, PROJECT_ROOT.resolve())
+                real_matches = [m for m in matches
+                                if finding_fingerprint(path_key, rule, m) not in self.baseline]
+                if real_matches:
+                    violations.append(f"{file_path}: {real_matches}")
+
         assert len(violations) == 0, f"{pattern_name} patterns found: {violations}"
\ No newline at end of file
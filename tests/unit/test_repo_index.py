@@ -0,0 +1,100 @@
+import os
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from scripts import repo_index as repo_index_module
+from scripts.repo_index import LRUCache, RepoIndex, classify, get_index, load_yaml, read_bytes
+
+
+class TestRepoIndex:
+    def test_classify(self):
+        """Test files are classified by their repo-relative path"""
+        assert classify("bundles/drs/databricks.yml") == "bundle_root"
+        assert classify("bundles/drs/resources/raw.schema.yml") == "schema"
+        assert classify("bundles/drs/resources/raw.volume.yml") == "volume"
+        assert classify("bundles/drs/resources/jobs/demojob.yml") == "job"
+        assert classify("bundles/_common.yml") == "bundle_config"
+        assert classify("environments/dev/config.yml") == "environment_config"
+        assert classify("parameters.yml") == "parameters"
+        assert classify("bundles/drs/resources/ingestion.ipynb") == "notebook"
+        assert classify(".pre-commit-config.yaml") == "yaml"
+        assert classify("scripts/repo_index.py") == "python"
+        assert classify("README.md") == "other"
+
+    def test_repo_kinds(self, repo_index):
+        """Test the shared index sees the committed bundles and environments"""
+        assert repo_index.paths("bundle_root") == ["./bundles/drs/databricks.yml",
+                                                   "./bundles/guidewire_cda/databricks.yml"]
+        assert len(repo_index.paths("environment_config")) == 3
+        assert not any("/.git/" in path for path in repo_index.paths())
+
+    def test_paths_filters(self, tmp_path):
+        """Test kind, directory and exclude filters"""
+        for rel in ["bundles/b/databricks.yml", "bundles/b/resources/raw.schema.yml", "tests/x.py",
+                    "a.lock"]:
+            (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / rel).write_text("x: 1\n")
+
+        index = RepoIndex(tmp_path)
+        rel = lambda paths: [Path(p).relative_to(tmp_path).as_posix() for p in paths]
+        assert rel(index.paths(["bundle_root", "schema"])) == ["bundles/b/databricks.yml",
+                                                             "bundles/b/resources/raw.schema.yml"]
+        assert rel(index.paths(under="tests")) == ["tests/x.py"]
+        assert rel(index.paths(exclude_dirs={"tests", "bundles"}, exclude_files={"*.lock"})) == []
+
+    def test_get_index_walks_once(self, tmp_path):
+        """Test the index is built once per root until refreshed"""
+        (tmp_path / "a.yml").write_text("a: 1\n")
+        first = get_index(tmp_path)
+        (tmp_path / "b.yml").write_text("b: 1\n")
+        assert get_index(tmp_path) is first
+        assert len(get_index(tmp_path, refresh=True).paths()) == 2
+
+    def test_bytes_and_yaml_read_once(self, tmp_path, monkeypatch):
+        """Test file bytes are read once and re-read only after a change"""
+        path = tmp_path / "c.yml"
+        path.write_text("c: 1\n")
+        reads = []
+        real_open = open
+
+        def counting_open(file, mode="r", *args, **kwargs):
+            reads.append(file)
+            return real_open(file, mode, *args, **kwargs)
+
+        monkeypatch.setattr(repo_index_module, "open", counting_open, raising=False)
+        assert load_yaml(path) == {"c": 1}
+        assert read_bytes(path) == b"c: 1\n"
+        assert len(reads) == 1
+
+        path.write_text("c: 22\n")
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert load_yaml(path) == {"c": 22}
+        assert len(reads) == 2
+
+    def test_yaml_copies_are_independent(self, tmp_path):
+        """Test mutating loaded data does not change what the next caller gets"""
+        path = tmp_path / "c.yml"
+        path.write_text("permissions:\n  - level: CAN_VIEW\n")
+        load_yaml(path)["permissions"].append({"level": "CAN_MANAGE"})
+        assert load_yaml(path) == {"permissions": [{"level": "CAN_VIEW"}]}
+
+    def test_bytes_cache_is_bounded(self, tmp_path, monkeypatch):
+        """Test the shared bytes cache evicts least recently used files past its limits"""
+        monkeypatch.setattr(repo_index_module, "_BYTES_CACHE",
+                            LRUCache(3, max_bytes=10, size=lambda e: len(e[1])))
+        paths = []
+        for name in "abcd":
+            paths.append(tmp_path / f"{name}.txt")
+            paths[-1].write_text("1234")
+        for path in paths[:3]:
+            read_bytes(path)
+        cache = repo_index_module._BYTES_CACHE
+        assert [Path(key).name for key in cache] == ["b.txt", "c.txt"]
+        read_bytes(paths[1])
+        read_bytes(paths[3])
+        assert [Path(key).name for key in cache] == ["b.txt", "d.txt"]
+        assert cache.total == 8
@@ -0,0 +1,92 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from scripts import pii_scanner
+from scripts.scan_cache import ScanCache, rules_fingerprint
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return tmp_path / ".cache" / "scan.sqlite3"
+
+
+def _cached_run(cache_path, paths, fingerprint="rules-v1", max_entries=100):
+    """Return {path: payload or None} for one cached run, storing misses"""
+    results = {}
+    with ScanCache("test", fingerprint, cache_path, max_entries) as cache:
+        for path in paths:
+            payload = cache.get(path)
+            results[path] = payload
+            if payload is None:
+                cache.put(path, [f"scanned {Path(path).name}"])
+    return results
+
+
+class TestScanCache:
+    def test_warm_run_replays_results(self, tmp_path, cache_path):
+        """Test unchanged files are served from the cache"""
+        path = str(tmp_path / "a.yml")
+        Path(path).write_text("a: 1\n")
+
+        assert _cached_run(cache_path, [path]) == {path: None}
+        assert _cached_run(cache_path, [path]) == {path: ["scanned a.yml"]}
+
+    def test_content_change_invalidates(self, tmp_path, cache_path):
+        """Test a file with new content is rescanned"""
+        path = tmp_path / "a.yml"
+        path.write_text("a: 1\n")
+        _cached_run(cache_path, [str(path)])
+
+        path.write_text("a: 22\n")
+        assert _cached_run(cache_path, [str(path)]) == {str(path): None}
+
+    def test_touched_file_hits_by_content_hash(self, tmp_path, cache_path):
+        """Test a file with a new mtime but the same content still hits"""
+        path = tmp_path / "a.yml"
+        path.write_text("a: 1\n")
+        _cached_run(cache_path, [str(path)])
+
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert _cached_run(cache_path, [str(path)]) == {str(path): ["scanned a.yml"]}
+
+    def test_rule_change_invalidates(self, tmp_path, cache_path):
+        """Test a new rule fingerprint drops every stored result"""
+        path = str(tmp_path / "a.yml")
+        Path(path).write_text("a: 1\n")
+        _cached_run(cache_path, [path])
+
+        assert _cached_run(cache_path, [path], fingerprint="rules-v2") == {path: None}
+
+    def test_eviction_bounds_size(self, tmp_path, cache_path):
+        """Test the least recently used results are evicted beyond max_entries"""
+        paths = []
+        for i in range(5):
+            path = tmp_path / f"f{i}.yml"
+            path.write_text(f"value: {i}\n")
+            paths.append(str(path))
+
+        _cached_run(cache_path, paths, max_entries=3)
+        warm = _cached_run(cache_path, paths, max_entries=3)
+        assert sum(payload is not None for payload in warm.values()) == 3
+
+    def test_fingerprint_is_stable(self):
+        """Test fingerprints depend only on rule content"""
+        assert rules_fingerprint({"a": 1, "b": 2}) == rules_fingerprint({"b": 2, "a": 1})
+        assert rules_fingerprint({"a": 1}) != rules_fingerprint({"a": 2})
+
+    def test_pii_scanner_replays_findings(self, tmp_path, cache_path, capsys):
+        """Test cached PII findings are reported on a warm run"""
+        path = tmp_path / "a.yml"
+        path.write_text("ssn: 123-45-6789\n")
+
+        for _ in range(2):
+            with pytest.raises(SystemExit):
+                pii_scanner.main([str(path), "--cache", str(cache_path)])
+            assert f"{path}:1 - ssn: 123-45-6789" in capsys.readouterr().out
@@ -0,0 +1,128 @@
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+import pytest
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from scripts.schedule_contention import (CronExpression, _parse_values, build_histogram,
+                                         hot_windows, main, shift_expression, suggest_staggers)
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+JOB = '''    {key}:
+      name: {key}
+      schedule:
+        quartz_cron_expression: {cron}
+        timezone_id: {tz}
+'''
+
+
+def _stepped(expression, start, end):
+    """Reference: test every second of the horizon against the field sets"""
+    cron = CronExpression(expression)
+    fires = []
+    moment = start
+    while moment < end:
+        if (moment.second in cron.seconds and moment.minute in cron.minutes
+                and moment.hour in cron.hours and moment.month in cron.months
+                and moment.day in cron.days(moment.year, moment.month)):
+            fires.append(moment)
+        moment += timedelta(seconds=1)
+    return fires
+
+
+def _fires(expression, days=59, tz=timezone.utc):
+    return list(CronExpression(expression).fire_times(START, START + timedelta(days=days), tz))
+
+
+class TestCronExpression:
+    @pytest.mark.parametrize("expression",
+                             ["11 40 14 * * ?", "0 */20 9-10 ? * MON-FRI", "30 5 0,12 1/10 * ?"])
+    def test_enumeration_matches_stepping(self, expression):
+        """Test enumerating field sets finds the same fire times as stepping through every second"""
+        end = START + timedelta(days=3)
+        assert list(CronExpression(expression).fire_times(START, end)) == _stepped(
+            expression, START, end)
+
+    def test_day_specials(self):
+        """Test L, L-n, W, LW, nL and # day specifiers"""
+        days = lambda expression: [fire.strftime("%m-%d") for fire in _fires(expression)]
+        assert days("0 0 0 L * ?") == ["01-31", "02-28"]
+        assert days("0 0 0 L-2 * ?") == ["01-29", "02-26"]
+        # 2026-02-01 is a Sunday, 2026-01-31 a Saturday
+        assert days("0 0 0 1W * ?") == ["01-01", "02-02"]
+        assert days("0 0 0 LW * ?") == ["01-30", "02-27"]
+        assert days("0 0 0 ? * 6L") == ["01-30", "02-27"]
+        assert days("0 0 0 ? * MON#2") == ["01-12", "02-09"]
+
+    def test_wrapping_ranges_and_names(self):
+        """Test ranges that wrap and month or day names"""
+        assert _parse_values("FRI-MON", 1, 7, {"FRI": 6, "MON": 2}) == {6, 7, 1, 2}
+        assert _parse_values("22-2/2", 0, 23) == {22, 0, 2}
+        assert [fire.month for fire in _fires("0 0 0 1 FEB,MAR ?", days=90)] == [2, 3]
+
+    def test_timezone(self):
+        """Test fire times are converted from the job's timezone to UTC"""
+        fires = _fires("0 0 9 * * ?", days=1, tz=ZoneInfo("America/Chicago"))
+        assert fires == [datetime(2026, 1, 1, 15, tzinfo=timezone.utc)]
+
+    @pytest.mark.parametrize("expression", ["0 0 0 * * *", "0 0 0 ? * ?", "0 61 0 * * ?", "0 0 * *",
+                                            "0 0 0 ? * X"])
+    def test_invalid(self, expression):
+        """Test malformed expressions are rejected"""
+        with pytest.raises(ValueError):
+            CronExpression(expression)
+
+    def test_shift_expression(self):
+        """Test fixed daily times are shifted and others are left to the offset"""
+        assert shift_expression("11 17 09 * * ?", 600) == "11 27 9 * * ?"
+        assert shift_expression("0 55 23 * * ?", 600) is None
+        assert shift_expression("0 */5 * * * ?", 600) is None
+
+
+class TestContention:
+    def test_histogram_windows_and_staggers(self):
+        """Test buckets above threshold merge into windows and staggers clear them"""
+        fires = {"a": [0, 86400], "b": [60, 86460], "c": [120], "d": [400]}
+        runs, jobs = build_histogram(fires, bucket=300)
+        assert hot_windows(runs, jobs, threshold=2) == [(0, 0, 3, {"a", "b", "c"})]
+
+        offsets = suggest_staggers(fires, bucket=300, duration=0, threshold=2, max_offset=3600)
+        assert offsets == {"c": 300}
+        shifted = {job: [fire + offsets.get(job, 0) for fire in job_fires]
+                   for job, job_fires in fires.items()}
+        assert hot_windows(*build_histogram(shifted, bucket=300), threshold=2) == []
+
+    def test_duration_spans_buckets(self):
+        """Test a run occupies every bucket its expected duration spans"""
+        runs, _ = build_histogram({"a": [0], "b": [900]}, bucket=300, duration=1200)
+        assert [runs[index] for index in range(6)] == [1, 1, 1, 2, 1, 1]
+
+    def test_main_reports_contention(self, tmp_path, capsys):
+        """Test jobs firing together across bundles are reported with shifted expressions"""
+        for bundle, jobs in [("a", [("load", "0 0 7 * * ?", "UTC"),
+                                    ("check", "0 2 7 * * ?", "UTC")]),
+                             ("b", [("export", "0 0 1 * * ?", "America/Chicago")])]:
+            (tmp_path / bundle).mkdir()
+            body = "".join(JOB.format(key=key, cron=cron, tz=tz) for key, cron, tz in jobs)
+            (tmp_path / bundle / "databricks.yml").write_text(
+                f"bundle:\n  name: {bundle}\nresources:\n  jobs:\n{body}targets:\n  dev: {{}}\n")
+
+        with pytest.raises(SystemExit):
+            main(["--bundles-dir", str(tmp_path), "--start", "2026-01-05", "--horizon-days", "1"])
+        assert capsys.readouterr().out.splitlines() == [
+            "Target dev: 3 scheduled jobs, 3 runs in 1 days from 2026-01-05 00:00 UTC",
+            "  Windows above 2 runs per 5-minute bucket:",
+            "    2026-01-05 07:00 - 07:05 UTC: 3 runs (a/check, a/load, b/export)",
+            "  Suggested staggers:",
+            "    b/export: +5 min -> quartz_cron_expression: 0 5 1 * * ?",
+        ]
+
+    def test_repo_schedules(self, capsys):
+        """Test the committed job schedules parse and do not contend"""
+        main(["--start", "2026-01-05"])
+        assert capsys.readouterr().out.splitlines()[-1] == "No schedule contention found"
@@ -0,0 +1,217 @@
+import json
+import sys
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from scripts.repo_index import BUNDLE_KINDS
+from scripts.validate_bundles import (find_location_overlaps, main, normalize_location,
+                                      stream_validate, validate_bundle_structure, validate_file)
+
+BUNDLE = '''bundle:
+  name: {name}
+variables:
+  env:
+    default: dev
+resources:
+  volumes:
+    raw_volume:
+      name: raw
+      catalog_name: {name}
+      schema_name: raw
+      storage_location: {location}
+targets:
+  dev: {{}}
+  test:
+    variables:
+      env: test
+'''
+
+RESOURCES = '''shared: &catalog
+  catalog_name: raw
+resources:
+  schemas:
+    merged:
+      <<: *catalog
+      name: s
+    bare:
+      comment: no name
+  jobs:
+    ingest:
+      name: ingest
+      tasks:
+        - task_key: load
+        - notebook_task:
+            notebook_path: ./load
+  volumes:
+    aliased: *catalog
+  pipelines:
+    dlt: {}
+'''
+
+
+def _owner(full_name, target="dev"):
+    return {"bundle": full_name, "target": target, "volume": "raw_volume", "full_name": full_name,
+            "file": "f"}
+
+
+class TestValidateBundles:
+    def test_repo_bundles_valid(self, repo_index, capsys):
+        """Test the committed bundles pass validation"""
+        paths = repo_index.paths(BUNDLE_KINDS, under="bundles")
+        main(paths + ["--no-cache"])
+        assert "All bundles validated successfully" in capsys.readouterr().out
+
+    def test_included_schema_missing_field(self, tmp_path):
+        """Test required fields are checked on files resolved through include"""
+        (tmp_path / "b" / "resources").mkdir(parents=True)
+        (tmp_path / "b" / "databricks.yml").write_text(
+            "include:\n  - resources/*.yml\nresources: {}\n")
+        schema = tmp_path / "b" / "resources" / "raw.schema.yml"
+        schema.write_text("resources:\n  schemas:\n    raw_schema:\n      name: s\n")
+
+        assert validate_file(str(schema)) == [
+            "Schema 'raw_schema' missing required field: catalog_name"]
+
+    def test_syntax_error(self, tmp_path, capsys):
+        """Test YAML syntax errors are reported per file"""
+        path = tmp_path / "databricks.yml"
+        path.write_text("resources: [unclosed\n")
+
+        with pytest.raises(SystemExit):
+            main([str(path), "--no-cache"])
+        assert f"{path}: YAML syntax error" in capsys.readouterr().out
+
+    def test_sarif_report(self, tmp_path, capsys):
+        """Test errors are emitted as SARIF results with rule ids"""
+        path = tmp_path / "databricks.yml"
+        path.write_text("resources:\n  schemas:\n    s:\n      name: s\n")
+        report = tmp_path / "out" / "bundles.sarif"
+
+        with pytest.raises(SystemExit):
+            main([str(path), "--no-cache", "--format", "sarif", "--output", str(report)])
+        assert capsys.readouterr().out == ""
+
+        run = json.loads(report.read_text())["runs"][0]
+        assert run["tool"]["driver"]["name"] == "validate-bundles"
+        assert [result["ruleId"] for result in run["results"]] == ["missing-required-field"]
+        assert run["results"][0]["message"]["text"] == (
+            "Schema 's' missing required field: catalog_name")
+
+    def test_profile(self, tmp_path, capsys):
+        """Test --profile reports parse and check time without changing the result"""
+        path = tmp_path / "databricks.yml"
+        path.write_text("resources: {}\n")
+
+        main([str(path), "--profile", "--slowest", "1"])
+        captured = capsys.readouterr()
+        assert "All bundles validated successfully" in captured.out
+        assert "PROFILE: 1 files" in captured.err
+        assert "parse:" in captured.err and "structure:" in captured.err
+
+    def test_overlapping_volume_locations(self, tmp_path, capsys):
+        """Test nested and duplicate storage locations are reported across bundles and targets"""
+        for name, location in [("a", "s3://lake/raw/${var.env}/"), ("b", "s3://lake/raw/dev/drs"),
+                               ("c", "s3://lake/raw-archive/")]:
+            (tmp_path / name).mkdir()
+            (tmp_path / name / "databricks.yml").write_text(
+                BUNDLE.format(name=name, location=location))
+
+        with pytest.raises(SystemExit):
+            main([str(tmp_path / "c" / "databricks.yml"), "--no-cache"])
+        errors = capsys.readouterr().out.splitlines()[1:]
+        # Both targets of b deploy the same volume to one location, which is not an overlap
+        nested = ("storage_location s3://lake/raw/dev/drs/ is nested in s3://lake/raw/dev/ "
+                  "of a volume 'raw_volume' [dev]")
+        assert errors == [
+            f"  {tmp_path / 'b' / 'databricks.yml'}: Volume 'raw_volume' [dev] {nested}",
+            f"  {tmp_path / 'b' / 'databricks.yml'}: Volume 'raw_volume' [test] {nested}",
+        ]
+
+    def test_location_overlap_index(self):
+        """Test the sorted-prefix pass against a pairwise comparison"""
+        locations = [(normalize_location(location), _owner(name, target))
+                     for location, name, target in [
+                         ("s3://lake/a", "v1", "dev"), ("s3://lake/a/", "v1", "test"),
+                         ("s3://lake//a/b/", "v2", "dev"), ("s3://lake/a-b/", "v3", "dev"),
+                         ("s3://lake/ab/", "v4", "dev"), ("S3://lake/ab", "v5", "dev"),
+                         ("s3://lake/a/b/c/", "v6", "dev"), ("s3://other/a/", "v7", "dev"),
+                     ]]
+        overlaps = {(owner["full_name"], other_owner["full_name"])
+                    for _, owner, _, other_owner in find_location_overlaps(locations)}
+        assert overlaps == {("v2", "v1"), ("v6", "v2"), ("v5", "v4")}
+
+    def test_location_overlap_scales(self):
+        """Test thousands of disjoint locations produce no overlaps and one nested one is found"""
+        locations = [(normalize_location(f"s3://lake/source_{i:05d}/"), _owner(f"v{i}"))
+                     for i in range(5000)]
+        locations.append((normalize_location("s3://lake/source_01234/landing/"), _owner("nested")))
+        overlaps = find_location_overlaps(locations)
+        assert [(owner["full_name"], other["full_name"])
+                for _, owner, _, other in overlaps] == [("nested", "v1234")]
+
+    def test_stream_positions(self, tmp_path, capsys):
+        """Test --stream reports file:line:col per missing field through merge keys and aliases"""
+        path = tmp_path / "databricks.yml"
+        path.write_text(RESOURCES)
+
+        with pytest.raises(SystemExit):
+            main([str(path), "--no-cache", "--stream"])
+        assert capsys.readouterr().out.splitlines()[1:] == [
+            f"  {path}:9:7: Schema 'bare' missing required field: name",
+            f"  {path}:9:7: Schema 'bare' missing required field: catalog_name",
+            f"  {path}:15:11: Job 'ingest' task 1 missing required field: task_key",
+            f"  {path}:18:14: Volume 'aliased' missing required field: name",
+            f"  {path}:18:14: Volume 'aliased' missing required field: schema_name",
+            f"  {path}:20:10: Pipeline 'dlt' missing required field: name",
+        ]
+
+    def test_stream_matches_parsed_validator(self, tmp_path):
+        """Test the streamed and parsed validators report the same errors"""
+        import yaml
+
+        path = tmp_path / "databricks.yml"
+        path.write_text(RESOURCES)
+        streamed = [message for _, _, message in stream_validate(path)]
+        parsed = validate_bundle_structure(path, yaml.safe_load(RESOURCES))
+        assert sorted(streamed) == sorted(parsed)
+
+        path.write_text("bundle:\n  name: b\n")
+        assert stream_validate(path) == [(1, 1, "Missing 'resources' section")]
+
+    def test_stream_fail_fast(self, tmp_path, capsys):
+        """Test --fail-fast stops at the first error and at syntax errors with their position"""
+        path = tmp_path / "databricks.yml"
+        path.write_text(RESOURCES)
+        assert stream_validate(path, fail_fast=True) == [
+            (9, 7, "Schema 'bare' missing required field: name")]
+
+        path.write_text("resources:\n  schemas: [unclosed\n")
+        with pytest.raises(SystemExit):
+            main([str(path), "--no-cache", "--stream", "--fail-fast"])
+        out = capsys.readouterr().out.splitlines()
+        assert out[1].startswith(f"  {path}:3:1: YAML syntax error")
+        assert sum(line.startswith(f"  {path}") for line in out) == 1
+
+    def test_stream_memory_is_constant(self, tmp_path):
+        """Test streaming a job with tens of thousands of tasks keeps a small, size-flat peak"""
+        peaks = []
+        for tasks in (1000, 20000):
+            path = tmp_path / f"jobs_{tasks}.yml"
+            with open(path, "w") as f:
+                f.write("resources:\n  jobs:\n    generated:\n      name: generated\n"
+                        "      tasks:\n")
+                for i in range(tasks):
+                    f.write(f"        - task_key: t{i}\n          notebook_task:\n"
+                            f"            notebook_path: ./n{i}\n")
+            tracemalloc.start()
+            try:
+                assert stream_validate(path) == []
+                peaks.append(tracemalloc.get_traced_memory()[1])
+            finally:
+                tracemalloc.stop()
+        assert peaks[1] < peaks[0] * 1.5
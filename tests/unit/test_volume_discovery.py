@@ -0,0 +1,119 @@
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from scripts.volume_discovery import (LandedFile, VolumeDiscovery, iter_batches, load_checkpoint,
+                                      main, save_checkpoint)
+
+SECOND = 10**9
+
+
+def _land(root, rel_path, size, mtime):
+    """Write a file of size bytes with an mtime in whole seconds"""
+    path = root / rel_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    os.utime(path, ns=(mtime * SECOND, mtime * SECOND))
+    return path
+
+
+def _drain(volume, checkpoint, **kwargs):
+    """Commit every batch of one run and return the batches as lists of relative paths"""
+    discovery = VolumeDiscovery(volume, checkpoint, **kwargs)
+    batches = []
+    for batch in discovery.batches():
+        batches.append([landed.path for landed in batch])
+        discovery.commit(batch)
+    return batches
+
+
+@pytest.fixture
+def volume(tmp_path):
+    root = tmp_path / "goldengate" / "webdev" / "drs"
+    _land(root, "2026/10/17/drs_0001.parquet", 10, 1000)
+    _land(root, "2026/10/17/drs_0002.parquet", 10, 1001)
+    _land(root, "2026/10/17/_SUCCESS", 0, 1002)
+    _land(root, "2026/10/18/.drs_0003.parquet.tmp", 10, 1003)
+    return root
+
+
+class TestVolumeDiscovery:
+    def test_second_run_only_sees_new_files(self, tmp_path, volume):
+        """Test processed files are not offered again and new landings are"""
+        checkpoint = tmp_path / "checkpoint.json"
+        assert _drain(volume, checkpoint) == [
+            ["2026/10/17/drs_0001.parquet", "2026/10/17/drs_0002.parquet"]]
+        assert _drain(volume, checkpoint) == []
+
+        _land(volume, "2026/10/18/drs_0003.parquet", 10, 1003)
+        assert _drain(volume, checkpoint) == [["2026/10/18/drs_0003.parquet"]]
+
+    def test_uncommitted_batch_is_offered_again(self, tmp_path, volume):
+        """Test a run that stops before committing a batch resumes from that batch"""
+        checkpoint = tmp_path / "checkpoint.json"
+        discovery = VolumeDiscovery(volume, checkpoint, max_batch_files=1)
+        batches = discovery.batches()
+        discovery.commit(next(batches))
+        batches.close()
+
+        assert _drain(volume, checkpoint) == [["2026/10/17/drs_0002.parquet"]]
+
+    def test_rewritten_file_is_new(self, tmp_path, volume):
+        """Test a file replaced with different content is picked up again"""
+        checkpoint = tmp_path / "checkpoint.json"
+        _drain(volume, checkpoint)
+        _land(volume, "2026/10/17/drs_0001.parquet", 20, 1005)
+        assert _drain(volume, checkpoint) == [["2026/10/17/drs_0001.parquet"]]
+
+    def test_manifest_keeps_only_lateness_window(self, tmp_path, volume):
+        """Test files behind the horizon leave the manifest but are still treated as processed"""
+        checkpoint = tmp_path / "checkpoint.json"
+        _land(volume, "2026/10/18/drs_0004.parquet", 10, 2000)
+        _drain(volume, checkpoint, lateness_seconds=500)
+
+        data = json.loads(checkpoint.read_text())
+        assert data["watermark_ns"] == 2000 * SECOND
+        assert [entry[0] for entry in data["manifest"]] == ["2026/10/18/drs_0004.parquet"]
+        assert _drain(volume, checkpoint, lateness_seconds=500) == []
+
+        # Late arrivals inside the window are found, older ones are not
+        _land(volume, "2026/10/18/drs_0005.parquet", 10, 1600)
+        _land(volume, "2026/10/16/drs_0000.parquet", 10, 900)
+        assert _drain(volume, checkpoint, lateness_seconds=500) == [["2026/10/18/drs_0005.parquet"]]
+
+    def test_batches_are_size_bounded(self):
+        """Test batches respect the byte and file limits and oversized files stand alone"""
+        files = [LandedFile(f"f{i}", i, size)
+                 for i, size in enumerate([40, 40, 40, 200, 10, 10, 10])]
+        batches = [[landed.path for landed in batch]
+                   for batch in iter_batches(files, max_bytes=100, max_files=2)]
+        assert batches == [["f0", "f1"], ["f2"], ["f3"], ["f4", "f5"], ["f6"]]
+
+    def test_checkpoint_round_trip(self, tmp_path):
+        """Test a saved checkpoint loads back and leaves no temporary files"""
+        checkpoint = load_checkpoint(tmp_path / "missing.json")
+        checkpoint.add([LandedFile("a.parquet", 5 * SECOND, 10)])
+        save_checkpoint(tmp_path / "state" / "checkpoint.json", checkpoint)
+
+        loaded = load_checkpoint(tmp_path / "state" / "checkpoint.json")
+        assert (loaded.watermark_ns, loaded.manifest) == (
+            5 * SECOND, {LandedFile("a.parquet", 5 * SECOND, 10)})
+        assert os.listdir(tmp_path / "state") == ["checkpoint.json"]
+
+    def test_main_commit(self, tmp_path, volume, capsys):
+        """Test the CLI lists batches and only records them with --commit"""
+        checkpoint = str(tmp_path / "checkpoint.json")
+        main([str(volume), "--checkpoint", checkpoint])
+        main([str(volume), "--checkpoint", checkpoint, "--commit"])
+        main([str(volume), "--checkpoint", checkpoint])
+
+        lines = capsys.readouterr().out.splitlines()
+        assert lines[0] == "Batch 1: 2 files, 20 bytes"
+        assert lines[3] == "2 new files"
+        assert lines[-2:] == ["2 new files committed", "0 new files"]
@@ -0,0 +1,191 @@
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from scripts.workspace_client import (TokenCache, WorkspaceClient, WorkspaceError, main, preflight,
+                                      shared_clients, token_credentials)
+
+
+class StubWorkspace(ThreadingHTTPServer):
+    """Imitates the workspace OIDC token endpoint and one authenticated REST endpoint"""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.token_requests = 0
+        self.api_requests = 0
+        self.connections = set()
+        self.issued = set()
+        self.lock = threading.Lock()
+
+    @property
+    def host(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        server = self.server
+        with server.lock:
+            server.connections.add(self.client_address)
+            server.token_requests += 1
+            token = f"token-{server.token_requests}"
+            server.issued.add(token)
+        if not self.headers.get("Authorization", "").startswith("Basic "):
+            self._send(401, {"error": "invalid_client"})
+            return
+        self._send(200, {"access_token": token, "token_type": "Bearer", "expires_in": 3600})
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.connections.add(self.client_address)
+            server.api_requests += 1
+        token = self.headers.get("Authorization", "").removeprefix("Bearer ")
+        if token not in server.issued:
+            self._send(401, {"message": "invalid token"})
+            return
+        if self.path.startswith("/api/2.0/missing"):
+            self._send(404, {"message": "RESOURCE_DOES_NOT_EXIST"})
+            return
+        self._send(200, {"userName": "svc-lakehouse", "path": self.path})
+
+
+@pytest.fixture
+def workspace():
+    server = StubWorkspace()
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _client(workspace, tmp_path, client_id="sp-1"):
+    return WorkspaceClient(workspace.host, client_id, "not-a-secret",
+                           token_cache=TokenCache(tmp_path / "tokens.json"))
+
+
+class TestTokenCache:
+    def test_expired_token_is_refetched(self, tmp_path):
+        """Test a cached token is reused until it is within the expiry skew"""
+        now = [1000.0]
+        cache = TokenCache(tmp_path / "tokens.json", clock=lambda: now[0])
+        fetches = []
+
+        def fetch():
+            fetches.append(now[0])
+            return f"token-{len(fetches)}", 600
+
+        assert cache.get_or_fetch("https://ws", "sp", fetch) == "token-1"
+        now[0] += 500
+        assert cache.get_or_fetch("https://ws/", "sp", fetch) == "token-1"
+        now[0] += 60
+        assert cache.get_or_fetch("https://ws", "sp", fetch) == "token-2"
+        assert cache.get("https://ws", "other-sp") is None
+
+    def test_secret_not_written(self, workspace, tmp_path):
+        """Test only access tokens and expiry reach the cache file"""
+        _client(workspace, tmp_path).token()
+        content = (tmp_path / "tokens.json").read_text()
+        assert "not-a-secret" not in content
+        assert list(json.loads(content)) == [f"{workspace.host}|sp-1"]
+
+
+class TestWorkspaceClient:
+    def test_processes_share_one_exchange(self, workspace, tmp_path):
+        """Test clients sharing a cache file exchange credentials once between them"""
+        first = _client(workspace, tmp_path)
+        second = _client(workspace, tmp_path)
+        assert first.get("/api/2.0/preview/scim/v2/Me")["userName"] == "svc-lakehouse"
+        assert second.get("/api/2.0/preview/scim/v2/Me")["userName"] == "svc-lakehouse"
+        assert (first.token_exchanges, second.token_exchanges,
+                workspace.token_requests) == (1, 0, 1)
+
+    def test_connections_are_kept_alive(self, workspace, tmp_path):
+        """Test sequential requests reuse one pooled connection"""
+        client = _client(workspace, tmp_path)
+        for _ in range(5):
+            client.get("/api/2.0/preview/scim/v2/Me")
+        assert client.pool.opened == 1
+        assert len(workspace.connections) == 1
+
+    def test_rejected_token_is_replaced(self, workspace, tmp_path):
+        """Test a 401 on a cached token triggers one fresh exchange and a retry"""
+        cache = TokenCache(tmp_path / "tokens.json")
+        cache.get_or_fetch(workspace.host, "sp-1", lambda: ("revoked", 3600))
+        client = _client(workspace, tmp_path)
+        response = client.get("/api/2.0/preview/scim/v2/Me", {"attributes": "userName"})
+        assert response["path"].endswith("?attributes=userName")
+        assert client.token_exchanges == 1
+        assert cache.get(workspace.host, "sp-1") == "token-1"
+
+    def test_http_errors_raise(self, workspace, tmp_path):
+        """Test error responses raise WorkspaceError with the status and message"""
+        with pytest.raises(WorkspaceError, match="RESOURCE_DOES_NOT_EXIST") as exc:
+            _client(workspace, tmp_path).get("/api/2.0/missing")
+        assert exc.value.status == 404
+
+
+class TestPreflight:
+    def _credentials(self, workspace):
+        config = {"host": workspace.host, "client_id": "sp-1", "client_secret": "not-a-secret",
+                  "auth_type": "oauth-m2m"}
+        return {"sandbox": config, "dev": dict(config), "test": None}
+
+    def test_targets_share_clients(self, workspace, tmp_path):
+        """Test targets with one service principal share a client and a single token exchange"""
+        clients = shared_clients(self._credentials(workspace), TokenCache(tmp_path / "tokens.json"))
+        assert clients["sandbox"] is clients["dev"]
+
+        results = preflight(clients, jobs=3)
+        assert results == {"dev": None, "sandbox": None,
+                           "test": "credentials could not be resolved"}
+        assert workspace.token_requests == 1
+
+    def test_token_credentials(self, workspace, tmp_path):
+        """Test CLI credentials carry the shared token instead of the client secret"""
+        credentials = token_credentials(self._credentials(workspace),
+                                        TokenCache(tmp_path / "tokens.json"))
+        assert credentials["sandbox"] == {"host": workspace.host, "token": "token-1",
+                                          "auth_type": "pat"}
+        assert credentials["dev"] == credentials["sandbox"]
+        assert credentials["test"] is None
+
+    def test_main(self, workspace, tmp_path, capsys):
+        """Test the CLI reports targets that fail preflight"""
+        credentials = self._credentials(workspace)
+
+        class Loader:
+            def get_databricks_config(self, target):
+                if credentials[target] is None:
+                    return {"host": workspace.host, "client_secret": "SECRET_ERROR:client_secret"}
+                return credentials[target]
+
+        with pytest.raises(SystemExit):
+            main(["--target", "sandbox", "--target", "test",
+                  "--token-cache", str(tmp_path / "tokens.json")], loader=Loader())
+        assert capsys.readouterr().out.splitlines() == [
+            "PREFLIGHT ERRORS:", "  test: credentials could not be resolved"]